@@ -0,0 +1,88 @@
+"""Benchmark of the top-K selection of :mod:`streamsight.algorithms.utils`.
+
+Compares :func:`get_top_K_ranks` and :func:`get_top_K_values` with the
+previous implementation that selects the top K of every row in a Python loop
+with :func:`numpy.argpartition`, on random score matrices with rows of
+different lengths. Both implementations return the same matrices on these
+matrices, as their values are distinct.
+
+Run from the root of the repository::
+
+    python -m benchmarks.top_k
+"""
+import argparse
+import time
+from typing import Callable, Optional
+
+import numpy as np
+from scipy.sparse import csr_matrix, random
+
+from streamsight.algorithms.utils import get_top_K_ranks, get_top_K_values
+
+
+def get_top_K_ranks_loop(X: csr_matrix, K: Optional[int] = None) -> csr_matrix:
+    """Previous implementation of :func:`get_top_K_ranks` with a loop over the rows."""
+    U, I, V = [], [], []
+    for row_ix, (le, ri) in enumerate(zip(X.indptr[:-1], X.indptr[1:])):
+        K_row_pick = min(K, ri - le) if K is not None else ri - le
+
+        if K_row_pick != 0:
+
+            top_k_row = X.indices[le + np.argpartition(X.data[le:ri], list(range(-K_row_pick, 0)))[-K_row_pick:]]
+
+            for rank, col_ix in enumerate(reversed(top_k_row)):
+                U.append(row_ix)
+                I.append(col_ix)
+                V.append(rank + 1)
+    return csr_matrix((V, (U, I)), shape=X.shape)
+
+
+def get_top_K_values_loop(X: csr_matrix, K: Optional[int] = None) -> csr_matrix:
+    """Previous implementation of :func:`get_top_K_values` with a loop over the rows."""
+    top_K_ranks = get_top_K_ranks_loop(X, K)
+    top_K_ranks[top_K_ranks > 0] = 1
+    return top_K_ranks.multiply(X)
+
+
+def timeit(func: Callable, *args, repeat: int = 3) -> float:
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+CASES = {
+    "many short rows": (100000, 1000, 0.02),
+    "predictions": (200000, 2000, 0.05),
+    "similarities": (20000, 20000, 0.01),
+    "few long rows": (2000, 100000, 0.05),
+    "dense rows": (5000, 5000, 1.0),
+}
+"""Number of rows, number of columns and density of the benchmarked matrices."""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--K", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'matrix':<17}{'nnz':>10}{'function':>18}{'loop (s)':>10}{'vectorized (s)':>16}{'speedup':>9}")
+    for name, (n_rows, n_cols, density) in CASES.items():
+        X = random(n_rows, n_cols, density=density, format="csr", random_state=args.seed)
+        for label, loop, vectorized in [
+            ("get_top_K_ranks", get_top_K_ranks_loop, get_top_K_ranks),
+            ("get_top_K_values", get_top_K_values_loop, get_top_K_values),
+        ]:
+            assert (loop(X, args.K) != vectorized(X, args.K)).nnz == 0, f"{label} differs from the loop on {name}"
+            loop_time = timeit(loop, X, args.K, repeat=args.repeat)
+            vectorized_time = timeit(vectorized, X, args.K, repeat=args.repeat)
+            print(f"{name:<17}{X.nnz:>10}{label:>18}{loop_time:>10.3f}{vectorized_time:>16.3f}"
+                  f"{loop_time / vectorized_time:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
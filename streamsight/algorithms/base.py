@@ -209,10 +209,11 @@ class Algorithm(BaseEstimator,ABC):
         prev_interaction = X.get_interaction_data()
         prev_interaction = self._transform_predict_input(prev_interaction)
 
-        if to_predict_frame._df.empty:
+        if len(to_predict_frame) == 0:
             return csr_matrix(X.shape, dtype=int)
 
-        X_pred = self._predict(prev_interaction, to_predict_frame._df)
+        to_predict_df = to_predict_frame.to_dataframe()
+        X_pred = self._predict(prev_interaction, to_predict_df)
         # known_user_id, known_item_id = X_pred.shape
         logger.debug(f"Predictions by {self.name} completed")
 
@@ -224,4 +225,4 @@ class Algorithm(BaseEstimator,ABC):
             max(max_item_id, X.shape[1]),
         )
 
-        return self._pad_predict(X_pred, intended_shape, to_predict_frame._df)
+        return self._pad_predict(X_pred, intended_shape, to_predict_df)
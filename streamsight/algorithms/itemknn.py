@@ -1,11 +1,14 @@
 
 import logging
-from typing import Optional
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
 
 import numpy as np
 import pandas as pd
-from scipy.sparse import csr_matrix
+from scipy.sparse import csr_matrix, vstack
 from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
 
 from streamsight.algorithms.base import Algorithm
 from streamsight.algorithms.utils import get_top_K_values
@@ -33,6 +36,79 @@ def compute_cosine_similarity(X: csr_matrix) -> csr_matrix:
     return item_cosine_similarities
 
 
+def compute_top_K_cosine_similarity(X: csr_matrix,
+                                    K: Optional[int] = None,
+                                    block_size: int = 1024,
+                                    n_jobs: int = 1) -> csr_matrix:
+    """Compute the K most similar items of every item by cosine similarity.
+
+    Equal to :func:`compute_cosine_similarity` followed by
+    :func:`get_top_K_values`, but the similarities are computed for blocks of
+    `block_size` items at a time, of which only the K most similar items are
+    kept before the next block. The full item x item similarity matrix is
+    thus never materialized, and memory is bounded by the similarities of
+    `n_jobs` blocks and the top K of all items.
+
+    The blocks are independent and computed by `n_jobs` threads.
+
+    :param X: user x item matrix with scores per user, item pair.
+    :type X: csr_matrix
+    :param K: Number of most similar items to keep per item, defaults to None to keep all.
+    :type K: int, optional
+    :param block_size: Number of items of which the similarities are computed at once, defaults to 1024
+    :type block_size: int, optional
+    :param n_jobs: Number of threads computing blocks, -1 uses all CPUs. Defaults to 1
+    :type n_jobs: int, optional
+    :return: similarity matrix with at most K items per row
+    :rtype: csr_matrix
+    """
+    # normalized in the same way as cosine_similarity, such that the
+    # similarities of every block are identical to the full computation
+    item_vectors = normalize(csr_matrix(X.T), copy=True)
+    user_vectors = csr_matrix(item_vectors.T)
+    num_items = item_vectors.shape[0]
+
+    def top_K_block(start: int) -> csr_matrix:
+        block = item_vectors[start:start + block_size] @ user_vectors
+        # remove self similarity
+        items = np.repeat(np.arange(start, start + block.shape[0]), np.diff(block.indptr))
+        block.data[block.indices == items] = 0
+        block.eliminate_zeros()
+        return get_top_K_values(block, K=K)
+
+    logger.debug(f"Computing item similarities in blocks of {block_size} items")
+    blocks = _map_blocks(top_K_block, num_items, block_size, n_jobs)
+    if not blocks:
+        return csr_matrix((num_items, num_items))
+    return vstack(blocks, format="csr")
+
+
+def _map_blocks(function: Callable[[int], csr_matrix],
+                num_rows: int,
+                block_size: int,
+                n_jobs: int) -> List[csr_matrix]:
+    """Compute the blocks of `block_size` rows of a matrix.
+
+    :param function: Computes the block of rows starting at the given row.
+    :type function: Callable[[int], csr_matrix]
+    :param num_rows: Number of rows of the matrix.
+    :type num_rows: int
+    :param block_size: Number of rows per block.
+    :type block_size: int
+    :param n_jobs: Number of threads computing blocks, -1 uses all CPUs.
+    :type n_jobs: int
+    :return: Blocks in order of their rows.
+    :rtype: List[csr_matrix]
+    """
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    starts = range(0, num_rows, block_size)
+    if n_jobs > 1 and len(starts) > 1:
+        with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            return list(executor.map(function, starts))
+    return [function(start) for start in starts]
+
+
 class ItemKNN(Algorithm):
     """Item K Nearest Neighbours model.
 
@@ -48,26 +124,39 @@ class ItemKNN(Algorithm):
     .. math::
         sim(i,j) = \\frac{X_i X_j}{||X_i||_2 ||X_j||_2}
 
+    The similarities are computed for blocks of items at a time, keeping
+    only the K nearest neighbours of a block before computing the next, see
+    :func:`compute_top_K_cosine_similarity`.
+
     :param K: How many neigbours to use per item,
         make sure to pick a value below the number of columns of the matrix to fit on.
         Defaults to 200
     :type K: int, optional
+    :param block_size: Number of items of which the similarities are computed at once.
+        Defaults to 1024
+    :type block_size: int, optional
+    :param n_jobs: Number of threads computing blocks of similarities, -1 uses all CPUs. Defaults to 1
+    :type n_jobs: int, optional
     """
     ITEM_USER_BASED = ItemUserBasedEnum.ITEM
     
     def __init__(
         self,
-        K=10
+        K=10,
+        block_size=1024,
+        n_jobs=1
     ):
         super().__init__()
         self.K = K
+        self.block_size = block_size
+        self.n_jobs = n_jobs
 
     def _fit(self, X: csr_matrix) -> None:
         """Fit a cosine similarity matrix from item to item
         We assume that X is a binary matrix of shape (n_users, n_items)
         """
-        item_similarities = compute_cosine_similarity(X)
-        item_similarities = get_top_K_values(item_similarities, K=self.K)
+        item_similarities = compute_top_K_cosine_similarity(X, K=self.K, block_size=self.block_size,
+                                                            n_jobs=self.n_jobs)
 
         self.similarity_matrix_ = item_similarities
 
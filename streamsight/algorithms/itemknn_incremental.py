@@ -1,34 +1,348 @@
 import logging
-import time
-from streamsight.algorithms.base import Algorithm
-from streamsight.algorithms.itemknn import ItemKNN
-from streamsight.matrix import InteractionMatrix
+from typing import Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix, diags, vstack
+
+from streamsight.algorithms.itemknn import ItemKNN, _map_blocks
+from streamsight.algorithms.utils import get_top_K_values
+from streamsight.utils.util import (add_columns_to_csr_matrix,
+                                    add_rows_to_csr_matrix)
 
 logger = logging.getLogger(__name__)
 
 
+def _resize(X: csr_matrix, shape: tuple) -> csr_matrix:
+    """Pad a matrix with rows and columns of zeros up to `shape`.
+
+    :param X: Matrix to pad.
+    :type X: csr_matrix
+    :param shape: Shape of the padded matrix, at least the shape of `X`.
+    :type shape: tuple
+    :return: Padded matrix.
+    :rtype: csr_matrix
+    """
+    if X.shape == shape:
+        return X
+    X = add_rows_to_csr_matrix(X, shape[0] - X.shape[0])
+    return add_columns_to_csr_matrix(X, shape[1] - X.shape[1])
+
+
+def _positions(X: csr_matrix, rows: np.ndarray, columns: np.ndarray) -> np.ndarray:
+    """Positions in `X.data` of the values at the given rows and columns.
+
+    Unlike indexing `X` with the arrays, which scans the stored values of a
+    row for every position unless many positions are looked up, all
+    positions are found with a single binary search in their rows.
+
+    :param X: Matrix with sorted indices.
+    :type X: csr_matrix
+    :param rows: Rows of the values.
+    :type rows: np.ndarray
+    :param columns: Columns of the values.
+    :type columns: np.ndarray
+    :return: Position of every value, -1 if it is not stored.
+    :rtype: np.ndarray
+    """
+    low, high = X.indptr[rows].astype(np.int64), X.indptr[rows + 1].astype(np.int64)
+    searching = low < high
+    while np.any(searching):
+        middle = (low + high) // 2
+        right = searching & (X.indices[np.minimum(middle, X.nnz - 1)] < columns)
+        low = np.where(right, middle + 1, low)
+        high = np.where(searching & ~right, middle, high)
+        searching = low < high
+    found = low < X.indptr[rows + 1]
+    found[found] = X.indices[low[found]] == columns[found]
+    return np.where(found, low, -1)
+
+
+def _lowest_ranked(X: csr_matrix, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Lowest ranked value of the rows of `X` that hold exactly `n` values.
+
+    Values are ranked as in :func:`get_top_K_values`, of tied values the
+    value with the largest column ranks first.
+
+    :param X: Matrix with positive values.
+    :type X: csr_matrix
+    :param n: Number of values of the rows of which the lowest ranked value is taken.
+    :type n: int
+    :return: Value and column of the lowest ranked value of every row with
+        `n` values, 0 and -1 for the other rows.
+    :rtype: Tuple[np.ndarray, np.ndarray]
+    """
+    row_nnz = np.diff(X.indptr)
+    values = np.zeros(X.shape[0])
+    columns = np.full(X.shape[0], -1)
+    rows = np.flatnonzero(row_nnz == n)
+    if len(rows) and n:
+        # the values of rows of n values are consecutive, of the smallest
+        # values the smallest column ranks lowest
+        starts = X.indptr[rows]
+        positions = starts[:, None] + np.arange(n)
+        row_values = X.data[positions]
+        values[rows] = row_values.min(axis=1)
+        columns[rows] = np.where(row_values == values[rows, None], X.indices[positions], X.shape[1]).min(axis=1)
+    return values, columns
+
+
+def _ranks_above(values: np.ndarray, columns: np.ndarray, other_values: np.ndarray,
+                 other_columns: np.ndarray) -> np.ndarray:
+    """Whether values rank above other values, see :func:`_lowest_ranked`.
+
+    :param values: Values to compare.
+    :type values: np.ndarray
+    :param columns: Columns of the values.
+    :type columns: np.ndarray
+    :param other_values: Values to compare to.
+    :type other_values: np.ndarray
+    :param other_columns: Columns of the other values.
+    :type other_columns: np.ndarray
+    :return: True where the value ranks above the other value.
+    :rtype: np.ndarray
+    """
+    return (values > other_values) | ((values == other_values) & (columns > other_columns))
+
+
 class ItemKNNIncremental(ItemKNN):
     """Incremental version of ItemKNN algorithm.
 
     This class extends the ItemKNN algorithm to allow for incremental updates
-    to the model. The incremental updates are done by updating the historical
-    data with the new data by appending the new data to the historical data.
+    to the model. Instead of fitting on all historical data again, the model
+    keeps the binary user x item matrix of the historical data, the item
+    co-occurrence counts :math:`X^T X` and the number of users per item,
+    which is the squared norm of an item, as state.
+
+    Every call to :meth:`fit` adds only the user, item pairs that were not
+    seen before to the state. With :math:`\\Delta` the new pairs of the users
+    in the new data and :math:`X_u` the historical data of those users, the
+    co-occurrence counts are updated with
+
+    .. math::
+        X_u^T \\Delta + \\Delta^T X_u + \\Delta^T \\Delta
+
+    Besides the K nearest neighbours, the model keeps for every item the
+    highest ranked similarity outside its neighbours when its row was last
+    computed. The similarities outside the neighbours can only decrease,
+    unless their co-occurrence count changed, so this is a bound on all of
+    them. Only the rows of the items with changed co-occurrence counts, and
+    of the items that have an item of the new pairs among their neighbours,
+    are visited. The new neighbours of such an item are selected from its
+    current neighbours and its changed counts. The row is only computed in
+    full from the co-occurrence counts if the K-th of these does not rank
+    above the bound.
+
+    The cost of a fit therefore depends on the new data and the rows it
+    touches, not on the number of historical interactions. The touched rows
+    are all items that share a user with an item of the new pairs, which
+    grows with the length of the histories of the users in the new data.
+    Rows fail the bound more often when many similarities are tied, such as
+    for items with few users. The historical data is copied once per fit,
+    and the co-occurrence counts are copied whenever two items share a user
+    for the first time.
+
+    The similarities are equal to those of :class:`ItemKNN` fitted on all
+    historical data up to floating point rounding, which may break ties
+    between neighbours differently. The co-occurrence counts hold every pair
+    of items that share a user, which can take considerably more memory than
+    the K nearest neighbours.
     """
 
-    def __init__(self, K=10):
-        super().__init__(K)
-        self.historical_data: InteractionMatrix
-
-    def fit(self, X: InteractionMatrix) -> "Algorithm":
-        start = time.time()
-        if not hasattr(self, "historical_data"):
-            self.historical_data = X.copy()
-        else:
-            logger.debug(f"Updating historical data for {self.name}")
-            self.historical_data = self.historical_data + X
-        end = time.time()
-        logger.debug(
-            f"Updated historical data for {self.name} - Took {end - start :.3}s"
-        )
-        super().fit(self.historical_data)
-        return self
+    def __init__(self, K=10, block_size=1024, n_jobs=1):
+        super().__init__(K, block_size, n_jobs)
+        self.history_: csr_matrix
+        """Binary user x item matrix of the historical data."""
+        self.cooccurrence_: csr_matrix
+        """Number of users that interacted with both items of every item pair."""
+        self.item_counts_: np.ndarray
+        """Number of users that interacted with every item, the squared norm of the items."""
+        self.similarity_bounds_: Tuple[np.ndarray, np.ndarray]
+        """Value and column of the highest ranked similarity of every item
+        outside its K nearest neighbours when the row was last computed, an
+        upper bound on the similarities outside the neighbours."""
+
+    def _fit(self, X: csr_matrix) -> None:
+        """Update the co-occurrence counts and similarities with new interactions.
+
+        :param X: Binary user x item matrix of the new interactions.
+        :type X: csr_matrix
+        """
+        X = csr_matrix(X, dtype=np.float64)
+        if not hasattr(self, "history_"):
+            self.history_ = csr_matrix(X.shape)
+            self.cooccurrence_ = csr_matrix((X.shape[1], X.shape[1]))
+            self.item_counts_ = np.zeros(X.shape[1])
+            self.similarity_matrix_ = csr_matrix((X.shape[1], X.shape[1]))
+            self.similarity_bounds_ = (np.zeros(X.shape[1]), np.full(X.shape[1], -1))
+
+        shape = (max(X.shape[0], self.history_.shape[0]), max(X.shape[1], self.history_.shape[1]))
+        new_items = shape[1] - self.item_counts_.shape[0]
+        X = _resize(X, shape)
+        history = _resize(self.history_, shape)
+        cooccurrence = _resize(self.cooccurrence_, (shape[1], shape[1]))
+        similarity_matrix = _resize(self.similarity_matrix_, (shape[1], shape[1]))
+        bound_values = np.append(self.similarity_bounds_[0], np.zeros(new_items))
+        bound_columns = np.append(self.similarity_bounds_[1], np.full(new_items, -1))
+
+        users = np.flatnonzero(np.diff(X.indptr))
+        user_history = history[users]
+        delta = X[users] - X[users].multiply(user_history)
+        delta.eliminate_zeros()
+        cross = csr_matrix(user_history.T @ delta)
+        delta_cooccurrence = csr_matrix(cross + cross.T + csr_matrix(delta.T @ delta))
+        # sorted indices keep the sum with the counts sorted, such that
+        # counts are looked up with a binary search in their rows
+        delta_cooccurrence.sort_indices()
+        delta_counts = delta_cooccurrence.diagonal()
+
+        new_pairs = delta.tocoo()
+        self.history_ = history + csr_matrix((new_pairs.data, (users[new_pairs.row], new_pairs.col)), shape=shape)
+        self.cooccurrence_ = self._add_counts(cooccurrence, delta_cooccurrence)
+        self.item_counts_ = np.append(self.item_counts_, np.zeros(new_items)) + delta_counts
+
+        # the norms of the items of the new pairs increased, which lowers
+        # their similarity to items whose co-occurrence counts did not change.
+        # Only the rows with changed counts or a neighbour of which the norm
+        # increased can change.
+        changed_norms = delta_counts > 0
+        neighbour_rows = np.repeat(np.arange(shape[1]), np.diff(similarity_matrix.indptr))
+        rows = np.union1d(np.flatnonzero(np.diff(delta_cooccurrence.indptr)),
+                          neighbour_rows[changed_norms[similarity_matrix.indices]])
+
+        updated = []
+        if len(rows):
+            merged, (bound_values[rows], bound_columns[rows]), recompute = self._merge_similarities(
+                rows, similarity_matrix[rows], delta_cooccurrence[rows], (bound_values[rows], bound_columns[rows]))
+            logger.debug(f"{len(delta.data)} new user, item pairs change the neighbours of {len(rows)} items, "
+                         f"{len(recompute)} of which are computed in full")
+            accepted = np.ones(len(rows))
+            accepted[recompute] = 0
+            merged = (diags(accepted) @ merged).tocoo()
+            updated.append(csr_matrix((merged.data, (rows[merged.row], merged.col)), shape=similarity_matrix.shape))
+
+            if len(recompute):
+                recomputed, (bound_values[rows[recompute]], bound_columns[rows[recompute]]) = \
+                    self._compute_similarities(rows[recompute])
+                recomputed = recomputed.tocoo()
+                updated.append(csr_matrix((recomputed.data, (rows[recompute][recomputed.row], recomputed.col)),
+                                          shape=similarity_matrix.shape))
+
+        keep = np.ones(shape[1])
+        keep[rows] = 0
+        similarity_matrix = csr_matrix(sum(updated, diags(keep) @ similarity_matrix))
+        similarity_matrix.eliminate_zeros()
+        self.similarity_matrix_ = similarity_matrix
+        self.similarity_bounds_ = (bound_values, bound_columns)
+
+    def _add_counts(self, cooccurrence: csr_matrix, delta_cooccurrence: csr_matrix) -> csr_matrix:
+        """Add the change of the co-occurrence counts to the counts.
+
+        If all changed item pairs already co-occurred, the counts are updated
+        in place instead of building the sum of the matrices.
+
+        :param cooccurrence: Co-occurrence counts with sorted indices.
+        :type cooccurrence: csr_matrix
+        :param delta_cooccurrence: Change of the co-occurrence counts with sorted indices.
+        :type delta_cooccurrence: csr_matrix
+        :return: Updated co-occurrence counts with sorted indices.
+        :rtype: csr_matrix
+        """
+        delta_rows = np.repeat(np.arange(delta_cooccurrence.shape[0]), np.diff(delta_cooccurrence.indptr))
+        positions = _positions(cooccurrence, delta_rows, delta_cooccurrence.indices)
+        if np.all(positions >= 0):
+            cooccurrence.data[positions] += delta_cooccurrence.data
+            return cooccurrence
+        cooccurrence = csr_matrix(cooccurrence + delta_cooccurrence)
+        cooccurrence.sort_indices()
+        return cooccurrence
+
+    def _merge_similarities(self,
+                            items: np.ndarray,
+                            neighbours: csr_matrix,
+                            changed_counts: csr_matrix,
+                            bounds: Tuple[np.ndarray, np.ndarray]
+                            ) -> Tuple[csr_matrix, Tuple[np.ndarray, np.ndarray], np.ndarray]:
+        """Select the K nearest neighbours of items from their current neighbours and changed counts.
+
+        The similarities to the current neighbours and to the items of which
+        the co-occurrence counts changed are computed from the updated
+        co-occurrence counts. The similarities to the other items did not
+        increase and rank below the bound of the item, such that the K
+        highest ranked are the K nearest neighbours if the K-th ranks above
+        the bound.
+
+        :param items: Items of the rows of `neighbours`.
+        :type items: np.ndarray
+        :param neighbours: Current K nearest neighbours of the items.
+        :type neighbours: csr_matrix
+        :param changed_counts: Change of the co-occurrence counts of the items.
+        :type changed_counts: csr_matrix
+        :param bounds: Value and column of the highest ranked similarity of
+            the items outside their current neighbours.
+        :type bounds: Tuple[np.ndarray, np.ndarray]
+        :return: K nearest neighbours of the items, the updated bounds, and
+            the positions in `items` of the items that fail the bound and
+            need to be computed in full.
+        :rtype: Tuple[csr_matrix, Tuple[np.ndarray, np.ndarray], np.ndarray]
+        """
+        candidates = csr_matrix(neighbours + changed_counts).tocoo()
+        positions = _positions(self.cooccurrence_, items[candidates.row], candidates.col)
+        counts = np.where(positions >= 0, self.cooccurrence_.data[positions], 0)
+        counts = csr_matrix((counts, (candidates.row, candidates.col)), shape=candidates.shape)
+        similarities = self._similarities(items, counts, np.sqrt(self.item_counts_))
+        if self.K is None:
+            return similarities, bounds, np.array([], dtype=int)
+
+        top_K_1 = get_top_K_values(similarities, K=self.K + 1)
+        top_K = get_top_K_values(top_K_1, K=self.K)
+        # rows with less than K candidates only hold all similarities if
+        # nothing was left out of the neighbours before
+        accepted = _ranks_above(*_lowest_ranked(top_K, self.K), *bounds) \
+            | ((np.diff(top_K.indptr) < self.K) & (bounds[1] == -1))
+        candidate_bounds = _lowest_ranked(top_K_1, self.K + 1)
+        higher = _ranks_above(*candidate_bounds, *bounds)
+        bounds = (np.where(higher, candidate_bounds[0], bounds[0]), np.where(higher, candidate_bounds[1], bounds[1]))
+        return top_K, bounds, np.flatnonzero(~accepted)
+
+    def _similarities(self, items: np.ndarray, counts: csr_matrix, norms: np.ndarray) -> csr_matrix:
+        """Cosine similarities of the given items from their co-occurrence counts.
+
+        :param items: Items of the rows of `counts`.
+        :type items: np.ndarray
+        :param counts: Co-occurrence counts of the items with their candidate neighbours.
+        :type counts: csr_matrix
+        :param norms: Norm of every item.
+        :type norms: np.ndarray
+        :return: Similarities of shape `counts.shape`, without self similarity.
+        :rtype: csr_matrix
+        """
+        counts = counts.tocoo()
+        item_rows = items[counts.row]
+        data = counts.data / (norms[item_rows] * norms[counts.col])
+        # remove self similarity
+        data[item_rows == counts.col] = 0
+        similarities = csr_matrix((data, (counts.row, counts.col)), shape=counts.shape)
+        similarities.eliminate_zeros()
+        return similarities
+
+    def _compute_similarities(self, items: np.ndarray) -> Tuple[csr_matrix, Tuple[np.ndarray, np.ndarray]]:
+        """Compute the K nearest neighbours of the given items from all their co-occurrence counts.
+
+        :param items: Items of which the similarities are computed.
+        :type items: np.ndarray
+        :return: K nearest neighbours of the items, and the value and column
+            of their (K+1)-th highest ranked similarity.
+        :rtype: Tuple[csr_matrix, Tuple[np.ndarray, np.ndarray]]
+        """
+        norms = np.sqrt(self.item_counts_)
+        K = None if self.K is None else self.K + 1
+
+        def top_K_block(start: int) -> csr_matrix:
+            block_items = items[start:start + self.block_size]
+            counts = self.cooccurrence_[block_items]
+            return get_top_K_values(self._similarities(block_items, counts, norms), K=K)
+
+        top_K_1 = vstack(_map_blocks(top_K_block, len(items), self.block_size, self.n_jobs), format="csr")
+        if self.K is None:
+            return top_K_1, (np.zeros(len(items)), np.full(len(items), -1))
+        return get_top_K_values(top_K_1, K=self.K), _lowest_ranked(top_K_1, K)
@@ -12,5 +12,5 @@ class ItemKNNRolling(ItemKNN):
     all interactions that are older than the window size.
     """
 
-    def __init__(self, K=10):
-        super().__init__(K)
+    def __init__(self, K=10, block_size=1024, n_jobs=1):
+        super().__init__(K, block_size, n_jobs)
@@ -18,8 +18,8 @@ class ItemKNNStatic(ItemKNN):
     is to make the training data static and not update the model with new data.
     """
 
-    def __init__(self, K=10):
-        super().__init__(K)
+    def __init__(self, K=10, block_size=1024, n_jobs=1):
+        super().__init__(K, block_size, n_jobs)
         self.fit_complete = False
 
     def fit(self, X: InteractionMatrix) -> "Algorithm":
@@ -1,12 +1,147 @@
-from typing import Optional
+from typing import Optional, Tuple
 import numpy as np
 from scipy.sparse import csr_matrix
 
+_BLOCK_SIZE = 1 << 20
+"""Number of values of the rows that are ranked at once."""
+
+
+def _rank_rows(X: csr_matrix, rows: np.ndarray, width: int, fill: float, K: Optional[int]) -> np.ndarray:
+    """Positions in `X.data` of the K largest values of rows of equal padded length.
+
+    The values of the rows are gathered into a dense array of `width`
+    columns, right-aligned and padded on the left with `fill`. Consecutive
+    rows of equal length are a view on `X.data` instead.
+    The K largest values of every row are selected with a single
+    :func:`numpy.argpartition` along the rows, and ranked with a single
+    stable :func:`numpy.argsort`. Tied values are ranked by their column,
+    which is the order of the stored values as the indices of `X` are sorted,
+    such that the padding always ranks last.
+
+    :param X: Matrix with sorted indices.
+    :type X: csr_matrix
+    :param rows: Rows of `X` with at most `width` stored values.
+    :type rows: np.ndarray
+    :param width: Number of columns of the padded rows.
+    :type width: int
+    :param fill: Value of the padding, at most the smallest value of `X`.
+    :type fill: float
+    :param K: Amount of values to select.
+    :type K: int, optional
+    :return: Positions of the selected values of every row in order of rank,
+        with -1 for the padding selected in rows with fewer than K values.
+    :rtype: np.ndarray
+    """
+    row_nnz = X.indptr[rows + 1] - X.indptr[rows]
+    if rows[-1] - rows[0] == len(rows) - 1 and np.all(row_nnz == row_nnz[0]):
+        width = int(row_nnz[0])
+        first = X.indptr[rows, None]
+        dense = X.data[first[0, 0]: first[0, 0] + len(rows) * width].reshape(len(rows), width)
+    else:
+        first = X.indptr[rows, None] - (width - row_nnz)[:, None]
+        index = first + np.arange(width)
+        dense = X.data[np.maximum(index, 0)]
+        dense[index < X.indptr[rows, None]] = fill
+
+    k = width if K is None else min(K, width)
+    if k < width:
+        columns = np.argpartition(dense, width - k, axis=1)[:, width - k:]
+        threshold = np.take_along_axis(dense, columns[:, :1], axis=1)
+        # the partition selects any of the values equal to the threshold,
+        # the rows with such values left out select the rightmost ones instead
+        ties = (dense == threshold).sum(axis=1)
+        tied_rows = np.flatnonzero(ties > (np.take_along_axis(dense, columns, axis=1) == threshold).sum(axis=1))
+        if len(tied_rows):
+            tied, tied_threshold = dense[tied_rows], threshold[tied_rows]
+            selected = tied > tied_threshold
+            need = k - selected.sum(axis=1, keepdims=True)
+            equal = tied == tied_threshold
+            selected |= equal & (np.cumsum(equal[:, ::-1], axis=1)[:, ::-1] <= need)
+            columns[tied_rows] = np.nonzero(selected)[1].reshape(len(tied_rows), k)
+        columns.sort(axis=1)
+    else:
+        columns = np.broadcast_to(np.arange(width), (len(rows), width))
+
+    values = np.take_along_axis(dense, columns, axis=1)
+    ranked = np.take_along_axis(columns, np.argsort(values, axis=1, kind="stable")[:, ::-1], axis=1)
+    positions = first + ranked
+    positions[positions < X.indptr[rows, None]] = -1
+    return positions
+
+
+def _top_K_positions(X: csr_matrix, K: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Positions in `X.data` of the K largest values of every row, in order of rank.
+
+    The rows are grouped by their number of stored values, rounded up to at
+    most a quarter more, and blocks of rows of a group are ranked at once by
+    :func:`_rank_rows` instead of looping over the rows. Ties are broken by
+    the column index, the largest index ranking first.
+
+    :param X: Matrix with sorted indices from which we will select K values in every row.
+    :type X: csr_matrix
+    :param K: Amount of values to select.
+    :type K: int, optional
+    :return: Tuple of the positions of the selected values, their ranks
+        starting at 1, and the number of selected values of every row.
+    :rtype: Tuple[np.ndarray, np.ndarray, np.ndarray]
+    """
+    row_nnz = np.diff(X.indptr)
+    row_pick = row_nnz if K is None else np.minimum(row_nnz, K)
+    row_start = np.cumsum(row_pick) - row_pick
+    ranks = np.arange(row_pick.sum()) - np.repeat(row_start, row_pick) + 1
+    positions = np.empty(len(ranks), dtype=np.int64)
+
+    rows = np.flatnonzero(row_pick)
+    fill = X.data[: X.indptr[-1]].min() if len(rows) else None
+    # pad the rows to a multiple of a quarter of the largest power of two below their length
+    step = 1 << np.maximum(np.log2(row_nnz[rows]).astype(np.int64) - 2, 0)
+    widths = -(-row_nnz[rows] // step) * step
+    for width in np.unique(widths):
+        # blocks of rows bound the memory of the dense arrays, which are reused between blocks
+        group = rows[widths == width]
+        block_rows = max(1, _BLOCK_SIZE // int(width))
+        for block in np.array_split(group, -(-len(group) // block_rows)):
+            block_positions = _rank_rows(X, block, int(width), fill, K)
+            keep = np.arange(block_positions.shape[1]) < row_pick[block, None]
+            positions[(row_start[block, None] + np.arange(block_positions.shape[1]))[keep]] = block_positions[keep]
+    return positions, ranks, row_pick
+
+
+def _top_K_matrix(X: csr_matrix, data: np.ndarray, positions: np.ndarray, row_pick: np.ndarray) -> csr_matrix:
+    """Matrix of the selected values of every row with the given data.
+
+    :param X: Matrix from which the values were selected.
+    :type X: csr_matrix
+    :param data: Value of every selected entry.
+    :type data: np.ndarray
+    :param positions: Positions in `X.data` of the selected entries.
+    :type positions: np.ndarray
+    :param row_pick: Number of selected entries of every row.
+    :type row_pick: np.ndarray
+    :return: Matrix with the selected entries per row.
+    :rtype: csr_matrix
+    """
+    indptr = np.zeros(X.shape[0] + 1, dtype=np.int64)
+    np.cumsum(row_pick, out=indptr[1:])
+    X_top_K = csr_matrix((data, X.indices[positions], indptr), shape=X.shape)
+    X_top_K.sort_indices()
+    return X_top_K
+
+
+def _sorted_csr(X: csr_matrix) -> csr_matrix:
+    X = csr_matrix(X)
+    if not X.has_sorted_indices:
+        X = X.sorted_indices()
+    return X
+
 
 def get_top_K_ranks(X: csr_matrix, K: Optional[int] = None) -> csr_matrix:
     """Returns a matrix of ranks assigned to the largest K values in X.
 
     Selects K largest values for every row in X and assigns a rank to each.
+    The rows are ranked in groups without a loop over the rows, see
+    :func:`_top_K_positions`. In case of a tie, the item with the largest
+    index of the tied items is ranked first.
 
     :param X: Matrix from which we will select K values in every row.
     :type X: csr_matrix
@@ -15,22 +150,9 @@ def get_top_K_ranks(X: csr_matrix, K: Optional[int] = None) -> csr_matrix:
     :return: Matrix with K values per row.
     :rtype: csr_matrix
     """
-    U, I, V = [], [], []
-    for row_ix, (le, ri) in enumerate(zip(X.indptr[:-1], X.indptr[1:])):
-        K_row_pick = min(K, ri - le) if K is not None else ri - le
-
-        if K_row_pick != 0:
-
-            top_k_row = X.indices[le + np.argpartition(X.data[le:ri], list(range(-K_row_pick, 0)))[-K_row_pick:]]
-
-            for rank, col_ix in enumerate(reversed(top_k_row)):
-                U.append(row_ix)
-                I.append(col_ix)
-                V.append(rank + 1)
-    # data, (row, col) = (V, (U, I)
-    X_top_K = csr_matrix((V, (U, I)), shape=X.shape)
-
-    return X_top_K
+    X = _sorted_csr(X)
+    positions, ranks, row_pick = _top_K_positions(X, K)
+    return _top_K_matrix(X, ranks, positions, row_pick)
 
 
 def get_top_K_values(X: csr_matrix, K: Optional[int] = None) -> csr_matrix:
@@ -46,7 +168,8 @@ def get_top_K_values(X: csr_matrix, K: Optional[int] = None) -> csr_matrix:
     :return: Matrix with K values per row.
     :rtype: csr_matrix
     """
-    top_K_ranks = get_top_K_ranks(X, K)
-    top_K_ranks[top_K_ranks > 0] = 1  # ranks to binary
-
-    return top_K_ranks.multiply(X)  # elementwise multiplication
\ No newline at end of file
+    X = _sorted_csr(X)
+    positions, _, row_pick = _top_K_positions(X, K)
+    X_top_K = _top_K_matrix(X, X.data[positions], positions, row_pick)
+    X_top_K.eliminate_zeros()
+    return X_top_K
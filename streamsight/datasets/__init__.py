@@ -62,6 +62,26 @@ ids are incrementing in the order of time.
     data = dataset.load(apply_filters=False)
 
 For an overview of available filters see :mod:`streamsight.preprocessing`
+
+Stream
+-------------
+
+Interactions that are still being recorded are read with an
+:class:`InteractionStream`, which is the source of a
+:class:`streamsight.settings.StreamingSetting`. The stream maps the user and
+item IDs incrementally as the interactions arrive, and can tail a CSV or JSONL
+file that is appended to by another process.
+
+.. autosummary::
+    :toctree: generated/
+
+    InteractionStream
+
+.. code-block:: python
+
+    from streamsight.datasets import InteractionStream
+
+    source = InteractionStream.from_file("interactions.jsonl", "item", "user", "timestamp", timeout=60)
 """
 
 from streamsight.datasets.base import Dataset
@@ -75,3 +95,4 @@ from streamsight.datasets.amazon import (
 from streamsight.datasets.yelp import YelpDataset
 from streamsight.datasets.lastfm import LastFMDataset
 from streamsight.datasets.movielens import MovieLens100K
+from streamsight.datasets.stream import InteractionStream
@@ -0,0 +1,226 @@
+import io
+import logging
+import os
+import time
+from typing import Dict, Hashable, Iterable, Iterator, List, Literal, Optional
+
+import numpy as np
+import pandas as pd
+
+from streamsight.matrix import InteractionMatrix
+
+logger = logging.getLogger(__name__)
+
+
+def _tail_lines(path: str,
+                chunksize: int,
+                poll_interval: float,
+                timeout: Optional[float]) -> Iterator[List[str]]:
+    """Complete lines of a file that is appended to by another process.
+
+    The file is read up to its current end, after which it is polled for new
+    lines every `poll_interval` seconds. A last line without a line break is
+    only returned once it is complete or the file has stopped growing.
+
+    :param path: Path of the file.
+    :type path: str
+    :param chunksize: Maximum number of lines to return at once.
+    :type chunksize: int
+    :param poll_interval: Seconds between polls of the file at its end.
+    :type poll_interval: float
+    :param timeout: Seconds without new lines after which the file is
+        considered complete. None to wait forever.
+    :type timeout: Optional[float]
+    :yield: Lines of the file, including the line breaks.
+    :rtype: Iterator[List[str]]
+    """
+    with open(path, newline="") as f:
+        partial = ""
+        idle = 0.0
+        while True:
+            lines = []
+            for line in iter(f.readline, ""):
+                line, partial = partial + line, ""
+                if not line.endswith("\n"):
+                    partial = line
+                    break
+                lines.append(line)
+                if len(lines) >= chunksize:
+                    break
+            if lines:
+                idle = 0.0
+                yield lines
+                continue
+            if timeout is not None and idle >= timeout:
+                if partial:
+                    yield [partial]
+                logger.debug(f"No lines appended to {path} for {idle}s, stopped reading")
+                return
+            time.sleep(poll_interval)
+            idle += poll_interval
+
+
+class InteractionStream:
+    """Source of interactions that arrive over time.
+
+    Converts chunks of a DataFrame with the original user and item IDs into
+    :class:`InteractionMatrix` chunks, as :class:`StreamingSetting` reads
+    them. Like :class:`DataFramePreprocessor`, the user and item IDs are
+    mapped to internal IDs that increment in the order of time, but the
+    mappings are extended with every chunk instead of being computed over all
+    data. The interactions of every chunk are sorted by time and numbered
+    after the interactions of the previous chunks.
+
+    Example
+    ~~~~~~~~~
+
+    Reading a CSV file that is written by another process until no new
+    interactions are appended for a minute:
+
+    .. code-block:: python
+
+        source = InteractionStream.from_file("interactions.csv", "item", "user", "timestamp", timeout=60)
+        setting = StreamingSetting(background_t=1530000000, window_size=60 * 60 * 24)
+        setting.split(source)
+
+    :param chunks: DataFrames with the interactions in order of time.
+    :type chunks: Iterable[pd.DataFrame]
+    :param item_ix: Name of the column in which item identifiers are listed.
+    :type item_ix: str
+    :param user_ix: Name of the column in which user identifiers are listed.
+    :type user_ix: str
+    :param timestamp_ix: Name of the column in which timestamps are listed.
+    :type timestamp_ix: str
+    """
+
+    def __init__(self, chunks: Iterable[pd.DataFrame], item_ix: str, user_ix: str, timestamp_ix: str):
+        self._chunks = chunks
+        self.item_ix = item_ix
+        self.user_ix = user_ix
+        self.timestamp_ix = timestamp_ix
+
+        self._item_id_mapping: Dict[Hashable, int] = dict()
+        self._user_id_mapping: Dict[Hashable, int] = dict()
+        self._num_interactions = 0
+        """Number of interactions read so far."""
+
+    @classmethod
+    def from_file(cls,
+                  path: str,
+                  item_ix: str,
+                  user_ix: str,
+                  timestamp_ix: str,
+                  file_format: Optional[Literal["csv", "jsonl"]] = None,
+                  chunksize: int = 10000,
+                  poll_interval: float = 1.0,
+                  timeout: Optional[float] = None) -> "InteractionStream":
+        """Stream the interactions of a file that is appended to.
+
+        The file is either a CSV file with a header line, or a JSONL file
+        with an object per interaction.
+
+        :param path: Path of the file.
+        :type path: str
+        :param item_ix: Name of the column in which item identifiers are listed.
+        :type item_ix: str
+        :param user_ix: Name of the column in which user identifiers are listed.
+        :type user_ix: str
+        :param timestamp_ix: Name of the column in which timestamps are listed.
+        :type timestamp_ix: str
+        :param file_format: Format of the file, defaults to None to derive
+            it from the file extension.
+        :type file_format: Optional[Literal["csv", "jsonl"]], optional
+        :param chunksize: Maximum number of interactions per chunk, defaults to 10000
+        :type chunksize: int, optional
+        :param poll_interval: Seconds between polls of the file for new
+            interactions, defaults to 1.0
+        :type poll_interval: float, optional
+        :param timeout: Seconds without new interactions after which the
+            stream ends, defaults to None to wait forever.
+        :type timeout: Optional[float], optional
+        :raises ValueError: If the format of the file is not supported.
+        :return: Stream of the interactions in the file.
+        :rtype: InteractionStream
+        """
+        if file_format is None:
+            file_format = "jsonl" if os.path.splitext(path)[1] in (".jsonl", ".ndjson") else "csv"
+        if file_format not in ("csv", "jsonl"):
+            raise ValueError(f"Unsupported file format {file_format}")
+
+        def read_chunks() -> Iterator[pd.DataFrame]:
+            header = None
+            for lines in _tail_lines(path, chunksize, poll_interval, timeout):
+                if file_format == "jsonl":
+                    yield pd.read_json(io.StringIO("".join(lines)), lines=True)
+                    continue
+                if header is None:
+                    header, lines = lines[0], lines[1:]
+                if lines:
+                    yield pd.read_csv(io.StringIO(header + "".join(lines)))
+
+        return cls(read_chunks(), item_ix, user_ix, timestamp_ix)
+
+    @property
+    def item_id_mapping(self) -> pd.DataFrame:
+        """Map from original item IDs to internal item IDs of the interactions read so far.
+
+        :return: DataFrame containing the mapping from original item IDs to internal
+        :rtype: pd.DataFrame
+        """
+        return pd.DataFrame.from_records(
+            [(iid, item) for item, iid in self._item_id_mapping.items()],
+            columns=[InteractionMatrix.ITEM_IX, self.item_ix],
+        )
+
+    @property
+    def user_id_mapping(self) -> pd.DataFrame:
+        """Map from original user IDs to internal user IDs of the interactions read so far.
+
+        :return: DataFrame containing the mapping from original user IDs to internal
+        :rtype: pd.DataFrame
+        """
+        return pd.DataFrame.from_records(
+            [(uid, user) for user, uid in self._user_id_mapping.items()],
+            columns=[InteractionMatrix.USER_IX, self.user_ix],
+        )
+
+    @staticmethod
+    def _map_ids(values: pd.Series, mapping: Dict[Hashable, int]) -> np.ndarray:
+        """Map original IDs to internal IDs, adding unseen IDs to the mapping.
+
+        :param values: Original IDs in order of time.
+        :type values: pd.Series
+        :param mapping: Map from original IDs to internal IDs, extended in place.
+        :type mapping: Dict[Hashable, int]
+        :return: Internal IDs.
+        :rtype: np.ndarray
+        """
+        codes, uniques = pd.factorize(values)
+        ids = np.array([mapping.setdefault(value, len(mapping)) for value in uniques], dtype=np.int64)
+        return ids[codes]
+
+    def _to_matrix(self, df: pd.DataFrame) -> InteractionMatrix:
+        """Convert a chunk of interactions to an :class:`InteractionMatrix`.
+
+        :param df: Interactions with the original IDs.
+        :type df: pd.DataFrame
+        :return: Interactions with the internal IDs.
+        :rtype: InteractionMatrix
+        """
+        df = df.sort_values(by=[self.timestamp_ix], kind="stable", ignore_index=True)
+        interaction_m = InteractionMatrix.__new__(InteractionMatrix)
+        interaction_m._set_data({
+            InteractionMatrix.INTERACTION_IX: np.arange(self._num_interactions, self._num_interactions + len(df)),
+            InteractionMatrix.USER_IX: self._map_ids(df[self.user_ix], self._user_id_mapping),
+            InteractionMatrix.ITEM_IX: self._map_ids(df[self.item_ix], self._item_id_mapping),
+            InteractionMatrix.TIMESTAMP_IX: df[self.timestamp_ix].to_numpy(),
+        })
+        self._num_interactions += len(df)
+        return interaction_m
+
+    def __iter__(self) -> Iterator[InteractionMatrix]:
+        for df in self._chunks:
+            if len(df) == 0:
+                continue
+            logger.debug(f"Read {len(df)} interactions from stream")
+            yield self._to_matrix(df)
@@ -11,7 +11,7 @@ from streamsight.evaluators.util import MetricLevelEnum, UserItemBaseStatus
 from streamsight.matrix import InteractionMatrix
 from streamsight.registries import MetricEntry
 from streamsight.settings import Setting
-from streamsight.settings.base import EOWSetting
+from streamsight.settings.base import EOWSetting, SettingCursor
 
 logger = logging.getLogger(__name__)
 
@@ -61,6 +61,8 @@ class EvaluatorBase(object):
 
         self._run_step = 0
         self._current_timestamp: int
+        self._cursor: SettingCursor
+        """Position of the evaluator in the windows of :attr:`setting`."""
     
     def _get_evaluation_data(self) -> Tuple[InteractionMatrix, InteractionMatrix, int]:
         """Get the evaluation data for the current step.
@@ -79,9 +81,9 @@ class EvaluatorBase(object):
         :raises EOWSetting: If there is no more data to be processed
         """
         try:
-            unlabeled_data = self.setting.next_unlabeled_data()
-            ground_truth_data = self.setting.next_ground_truth_data()
-            current_timestamp = self.setting.next_t_window()
+            unlabeled_data = self._cursor.next_unlabeled_data()
+            ground_truth_data = self._cursor.next_ground_truth_data()
+            current_timestamp = self._cursor.next_t_window()
             self._current_timestamp = current_timestamp
         except EOWSetting:
             raise EOWSetting("There is no more data to be processed, EOW reached")
@@ -210,7 +212,7 @@ class EvaluatorBase(object):
         This method is used to restore the generators after loading the object
         from a pickle file.
         """
-        self.setting.restore_generators(self._run_step)
+        self._cursor = self.setting.cursor(self._run_step)
         logger.debug("Generators restored")
     
     def prepare_dump(self) -> None:
@@ -220,4 +222,4 @@ class EvaluatorBase(object):
         will destruct the generators to avoid pickling issues.
         """
         self.setting.destruct_generators()
-        logger.debug("Generators destructed")
\ No newline at end of file
+        logger.debug("Generators destructed")
@@ -102,7 +102,8 @@ class EvaluatorPipeline(EvaluatorBase):
         """
         if not hasattr(self, "algorithm"):
             raise ValueError("Algorithm not instantiated")
-        background_data = self.setting.background_data
+        self._cursor = self.setting.cursor()
+        background_data = self._cursor.background_data
         self.user_item_base._update_known_user_item_base(background_data)
         # TODO timeline is not respected, can use flag to indicate a override the known user and item
         background_data.mask_shape(self.user_item_base.known_shape)
@@ -140,7 +141,7 @@ class EvaluatorPipeline(EvaluatorBase):
         self._acc = MetricAccumulator()
         logger.debug(f"Metric accumulator instantiated...")
 
-        self.setting.reset_data_generators()
+        self._cursor.reset_data_generators()
         logger.debug(f"Setting data generators ready...")
 
     def _evaluate_step(self):
@@ -210,7 +211,7 @@ class EvaluatorPipeline(EvaluatorBase):
             return
         logger.info("Phase 3: Releasing the data...")
 
-        incremental_data = self.setting.next_incremental_data()
+        incremental_data = self._cursor.next_incremental_data()
         self.user_item_base._reset_unknown_user_item_base()
         self.user_item_base._update_known_user_item_base(incremental_data)
         incremental_data.mask_shape(self.user_item_base.known_shape)
@@ -244,6 +245,9 @@ class EvaluatorPipeline(EvaluatorBase):
             return
 
         if self._run_step > self.setting.num_split:
+            # the step is not counted, such that the evaluation continues
+            # with the windows appended by extending the setting
+            self._run_step -= 1
             logger.info(f"Finished running all steps, call `run_step(reset=True)` to run the evaluation again")
             warn(f"Running this method again will not have any effect.")
             return
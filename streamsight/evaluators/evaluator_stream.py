@@ -111,11 +111,11 @@ class EvaluatorStreamer(EvaluatorBase):
             raise ValueError("Cannot start the stream again")
 
         self.has_started = True
-        self.setting.reset_data_generators()
+        self._cursor = self.setting.cursor()
 
         logger.debug(f"Preparing evaluator for streaming")
         self._acc = MetricAccumulator()
-        background_data = self.setting.background_data
+        background_data = self._cursor.background_data
         self.user_item_base._update_known_user_item_base(background_data)
         background_data.mask_shape(self.user_item_base.known_shape)
         self._training_data_cache = background_data
@@ -251,7 +251,7 @@ class EvaluatorStreamer(EvaluatorBase):
             and self.status_registry.is_all_same_data_segment()
         ):
             self.user_item_base._reset_unknown_user_item_base()
-            incremental_data = self.setting.next_incremental_data()
+            incremental_data = self._cursor.next_incremental_data()
             self.user_item_base._update_known_user_item_base(incremental_data)
             incremental_data.mask_shape(self.user_item_base.known_shape)
             self._training_data_cache = incremental_data
@@ -334,7 +334,9 @@ class EvaluatorStreamer(EvaluatorBase):
         
         The method will also check for each call if the current step of evaluation
         is the final one, if it is the final step, the method will update the
-        state of the algorithm to COMPLETED.
+        state of the algorithm to COMPLETED. For a :class:`StreamingSetting`
+        the final step is only known when the source has ended, so the check
+        waits until the next window is closed.
         
         Specifics
         --------
@@ -373,7 +375,7 @@ class EvaluatorStreamer(EvaluatorBase):
         else:
             warn(AlgorithmStatusWarning(algo_id, status, "complete"))
 
-        if self._run_step == self.setting.num_split:
+        if not self.setting._window_available(self._run_step):
             self.status_registry.update(algo_id, AlgorithmStateEnum.COMPLETED)
             logger.info(f"Finished streaming")
             warn(AlgorithmStatusWarning(algo_id, status, "complete"))
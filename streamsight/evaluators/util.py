@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import logging
 from enum import StrEnum
 from typing import Tuple
@@ -37,10 +37,10 @@ class UserItemBaseStatus:
     methods to update the known and unknown user and item set.
     """
 
-    unknown_user = set()
-    known_user = set()
-    unknown_item = set()
-    known_item = set()
+    unknown_user: set = field(default_factory=set)
+    known_user: set = field(default_factory=set)
+    unknown_item: set = field(default_factory=set)
+    known_item: set = field(default_factory=set)
 
     @property
     def known_shape(self) -> Tuple[int, int]:
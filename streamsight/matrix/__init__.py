@@ -4,14 +4,19 @@
 Interaction Matrix
 -------------------
 The InteractionMatrix class is used to create an interaction matrix from the
-dataset loaded. The interaction matrix stores a dataframe under the hood and
-provides functionality to convert the dataframe to a CSR matrix and other 
-operations which are useful for building recommendation systems.
+dataset loaded. The interaction matrix stores the interactions in NumPy
+columns under the hood and provides functionality to convert them to a CSR
+matrix or a dataframe and other operations which are useful for building
+recommendation systems. Chained filters can be executed lazily in a single
+pass through an InteractionQuery. A history of interactions that grows every
+window is best kept in an AppendOnlyInteractionMatrix.
 
 .. autosummary::
     :toctree: generated/
 
     InteractionMatrix
+    InteractionQuery
+    AppendOnlyInteractionMatrix
 
 Utils
 -----
@@ -26,5 +31,7 @@ These provides functionality for the matrix module and for use cases in other mo
     TimestampAttributeMissingError
 """
 from streamsight.matrix.interaction_matrix import InteractionMatrix, ItemUserBasedEnum
+from streamsight.matrix.query import InteractionQuery
+from streamsight.matrix.append_only_matrix import AppendOnlyInteractionMatrix
 from streamsight.matrix.util import to_csr_matrix
 from streamsight.matrix.exception import TimestampAttributeMissingError
\ No newline at end of file
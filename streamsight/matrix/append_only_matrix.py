@@ -0,0 +1,143 @@
+import logging
+from typing import Dict, Optional
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from streamsight.matrix.interaction_matrix import InteractionMatrix
+
+logger = logging.getLogger(__name__)
+
+
+class AppendOnlyInteractionMatrix(InteractionMatrix):
+    """InteractionMatrix for a history of interactions that only grows.
+
+    Appending interactions to an :class:`InteractionMatrix` through
+    :meth:`InteractionMatrix.concat` or `+` copies all interactions, such that
+    a history that is extended every window costs quadratic time in the
+    number of windows. This matrix keeps its columns in buffers with spare
+    capacity that double in size when they are full. Appended interactions
+    are written behind the existing ones, which are never modified, so the
+    total cost of all appends is linear in the number of interactions.
+
+    The sparse count matrix :attr:`values`, if cached, is updated with the
+    appended interactions instead of being rebuilt.
+
+    Filters and copies of the matrix are regular :class:`InteractionMatrix`
+    objects on the interactions at the time they are created.
+
+    :param im: Initial interactions of the matrix.
+    :type im: InteractionMatrix
+    """
+
+    def __init__(self, im: InteractionMatrix):
+        self._rows = None
+        self._ts_index = None
+        self._cache = {}
+        self._buffers: Dict[str, np.ndarray] = {name: values.copy() for name, values in im._column_data().items()}
+        """Column buffers of which the first :attr:`_size` rows are in use."""
+        self._size = len(im)
+        """Number of interactions in the matrix."""
+        self._views: Optional[Dict[str, np.ndarray]] = None
+        """Views on the rows in use of :attr:`_buffers`, until the next append."""
+        if hasattr(im, "shape"):
+            self.shape = im.shape
+
+    @property
+    def _data(self) -> Dict[str, np.ndarray]:
+        # the same views are returned until the next append, such that the
+        # matrices derived in between share their data, as for a plain matrix
+        if self._views is None:
+            self._views = {name: buffer[:self._size] for name, buffer in self._buffers.items()}
+        return self._views
+
+    @_data.setter
+    def _data(self, data: Dict[str, np.ndarray]) -> None:
+        # interactions replaced through concat() or the _df setter, the
+        # interaction IDs are always stored since appended IDs are arbitrary
+        self._size = len(data[InteractionMatrix.USER_IX])
+        self._buffers = dict(data)
+        if InteractionMatrix.INTERACTION_IX not in data:
+            self._buffers[InteractionMatrix.INTERACTION_IX] = np.arange(self._size)
+        self._views = None
+
+    def __copy__(self) -> InteractionMatrix:
+        # derived matrices must not write into the shared buffers, they are
+        # plain matrices on the interactions appended so far
+        interaction_m = InteractionMatrix.__new__(InteractionMatrix)
+        interaction_m.__dict__.update(self.__dict__)
+        del interaction_m.__dict__["_buffers"]
+        del interaction_m.__dict__["_size"]
+        del interaction_m.__dict__["_views"]
+        interaction_m._data = self._data
+        return interaction_m
+
+    def __getstate__(self) -> dict:
+        # the spare capacity of the buffers is not pickled
+        state = super().__getstate__()
+        state["_buffers"] = state.pop("_data", None) or self._data
+        state["_size"] = len(state["_buffers"][InteractionMatrix.USER_IX])
+        state["_views"] = None
+        return state
+
+    def _grow(self, size: int) -> None:
+        """Reallocate the buffers such that at least `size` interactions fit.
+
+        :param size: Number of interactions that must fit in the buffers.
+        :type size: int
+        """
+        capacity = max(size, 2 * len(self._buffers[InteractionMatrix.USER_IX]))
+        logger.debug(f"Growing buffers of AppendOnlyInteractionMatrix to {capacity} interactions")
+        for name, buffer in self._buffers.items():
+            grown = np.empty(capacity, dtype=buffer.dtype)
+            grown[:self._size] = buffer[:self._size]
+            self._buffers[name] = grown
+
+    def append(self, im: InteractionMatrix) -> "AppendOnlyInteractionMatrix":
+        """Append the interactions of another matrix to this matrix.
+
+        .. note::
+            This is a inplace operation. and will modify the current object.
+
+        The shape of the matrix becomes the largest shape of both matrices,
+        and is left undefined if either of the matrices has no shape.
+
+        :param im: InteractionMatrix with the interactions to append.
+        :type im: InteractionMatrix
+        :return: This matrix with the appended interactions.
+        :rtype: AppendOnlyInteractionMatrix
+        """
+        if self._rows is not None:
+            # compact the interactions selected by an inplace filter
+            self._set_data(self._column_data())
+
+        delta = im._column_data()
+        size = self._size + len(im)
+
+        for name, values in delta.items():
+            dtype = np.result_type(self._buffers[name], values)
+            if dtype != self._buffers[name].dtype:
+                self._buffers[name] = self._buffers[name].astype(dtype)
+        if size > len(self._buffers[InteractionMatrix.USER_IX]):
+            self._grow(size)
+        for name, values in delta.items():
+            self._buffers[name][self._size:size] = values
+
+        values = self._cache.get("values")
+        self._size = size
+        self._views = None
+        self._invalidate_cache()
+
+        if hasattr(self, "shape") and hasattr(im, "shape"):
+            self.shape = (max(self.shape[0], im.shape[0]), max(self.shape[1], im.shape[1]))
+        elif hasattr(self, "shape"):
+            del self.shape
+            values = None
+
+        if values is not None:
+            # pad the cached counts to the new shape and add the new interactions
+            self._cache["values"] = values
+            delta_values = csr_matrix((np.ones(len(im)), (delta[InteractionMatrix.USER_IX], delta[InteractionMatrix.ITEM_IX])),
+                                      shape=self.shape, dtype=np.int32)
+            self._cache["values"] = self.values + delta_values
+        return self
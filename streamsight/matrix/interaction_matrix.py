@@ -1,20 +1,93 @@
+import hashlib
 import logging
 import operator
-from copy import deepcopy
+from copy import copy
 from enum import StrEnum
-from typing import (Callable, Iterator, List, Literal, Optional, Set, Tuple,
-                    Union, overload)
+from typing import (Any, Callable, Dict, FrozenSet, Iterator, List, Literal,
+                    Optional, Sequence, Set, Tuple, Union, overload)
 from warnings import warn
 
 import numpy as np
 import pandas as pd
+from deprecation import deprecated
 from scipy.sparse import csr_matrix
 
 from streamsight.matrix.exception import TimestampAttributeMissingError
-from streamsight.utils import to_binary
+from streamsight.matrix.query import InteractionQuery
+from streamsight.utils import (add_columns_to_csr_matrix, add_rows_to_csr_matrix,
+                               to_binary)
 
 logger = logging.getLogger(__name__)
-        
+
+_TIMESTAMP_CMP_RANGE = {
+    operator.lt: ("left", True),
+    operator.le: ("right", True),
+    operator.gt: ("right", False),
+    operator.ge: ("left", False),
+}
+"""Binary search side and whether the selection is the lower part of the
+timestamp-sorted index for the supported comparison operators."""
+
+
+_COLUMNS = ("interactionid", "uid", "iid", "ts")
+"""Columns of the interactions in the order they are exported to a dataframe."""
+
+
+def _downcast(values: np.ndarray) -> np.ndarray:
+    """Store integer IDs as int32 if all of them fit."""
+    if values.dtype.kind not in "iu" or values.dtype.itemsize <= 4:
+        return values
+    info = np.iinfo(np.int32)
+    if len(values) and (values.min() < info.min or values.max() > info.max):
+        return values
+    return values.astype(np.int32)
+
+
+def _to_int64(values: np.ndarray) -> np.ndarray:
+    """Upcast integer values to int64 for export."""
+    if values.dtype.kind in "iu":
+        return values.astype(np.int64)
+    return values
+
+
+IdCollection = Union[Set[int], FrozenSet[int], List[int], np.ndarray]
+"""User or item IDs given as a collection of IDs, or as a boolean mask indexed
+by ID where the IDs set to True are selected."""
+
+
+def _has_ids(ids: Optional[IdCollection]) -> bool:
+    """Whether an optional ID filter is given, an empty collection selects all IDs."""
+    return ids is not None and len(ids) > 0
+
+
+def _isin(values: np.ndarray, ids: IdCollection) -> np.ndarray:
+    """Boolean mask of the values that are contained in `ids`.
+
+    IDs are dense and start from 0, so membership is resolved with a lookup
+    table indexed by ID, which costs `O(n)` without hashing the values. A
+    boolean mask is used as the lookup table directly. Sparse IDs, for which
+    the table would be much larger than the data, fall back to a sort based
+    :func:`np.isin`.
+    """
+    if isinstance(ids, (set, frozenset)):
+        ids = np.fromiter(ids, dtype=np.int64, count=len(ids))
+    ids = np.asarray(ids)
+    if len(values) == 0 or len(ids) == 0:
+        return np.zeros(len(values), dtype=bool)
+
+    if ids.dtype == bool:
+        lo, hi = min(values.min(), 0), max(values.max(), len(ids) - 1)
+        table = np.zeros(hi - lo + 1, dtype=bool)
+        table[-lo:len(ids) - lo] = ids
+    else:
+        lo, hi = min(values.min(), ids.min()), max(values.max(), ids.max())
+        if hi - lo + 1 > 8 * (len(values) + len(ids)):
+            return np.isin(values, ids)
+        table = np.zeros(hi - lo + 1, dtype=bool)
+        table[ids - lo] = True
+    return table[values - lo] if lo else table[values]
+
+
 class ItemUserBasedEnum(StrEnum):
     """Enum class for item and user based properties.
     
@@ -91,6 +164,14 @@ class InteractionMatrix:
     ):
         self.shape: Tuple[int, int]
         """The shape of the interaction matrix, i.e. `|user| x |item|`."""
+        self._data: Dict[str, np.ndarray]
+        """Columns holding the interactions, possibly shared with other matrices."""
+        self._rows: Optional[Union[slice, np.ndarray]] = None
+        """Row positions in :attr:`_data` selected by this matrix. None selects all rows."""
+        self._ts_index: Optional[Tuple[np.ndarray, Optional[np.ndarray]]] = None
+        """Timestamp-sorted index of the interactions, see :meth:`_time_index`."""
+        self._cache: Dict[str, Any] = {}
+        """Statistics derived from the interactions, see :meth:`_cached`."""
         
         col_mapper = {
             item_ix: InteractionMatrix.ITEM_IX,
@@ -106,11 +187,365 @@ class InteractionMatrix:
             return
         
         df = df.rename(columns=col_mapper)
-        df = df[[InteractionMatrix.USER_IX, InteractionMatrix.ITEM_IX, InteractionMatrix.TIMESTAMP_IX]].copy()
-        df = df.reset_index(drop=True).reset_index().rename(columns={"index": InteractionMatrix.INTERACTION_IX})
+        self._set_data({
+            name: df[name].to_numpy()
+            for name in (InteractionMatrix.USER_IX, InteractionMatrix.ITEM_IX, InteractionMatrix.TIMESTAMP_IX)
+        })
 
-        self._df = df
-        
+    @property
+    @deprecated(
+        deprecated_in="1.0.0",
+        details="Use `to_dataframe` instead. The dataframe is built on every access "
+                "and changes to it are not written back to the matrix.",
+    )
+    def _df(self) -> pd.DataFrame:
+        """Dataframe of the interactions of the matrix.
+
+        Kept for compatibility with code written against the pandas backed
+        matrix, see :meth:`to_dataframe`. The interactions are stored in
+        NumPy columns, so a new dataframe is built on every access, which
+        costs `O(n)`. Changes made in place to the dataframe, such as
+        `m._df["x"] = ...` or `m._df.loc[...] = ...`, are made to that copy
+        and are not reflected in the matrix. Assigning a dataframe to
+        :attr:`_df` replaces the interactions of the matrix.
+
+        :return: Dataframe of the interactions.
+        :rtype: pd.DataFrame
+        """
+        return self.to_dataframe()
+
+    @_df.setter
+    def _df(self, df: pd.DataFrame) -> None:
+        self._set_data({name: df[name].to_numpy() for name in df.columns if name in _COLUMNS})
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Dataframe of the interactions of the matrix.
+
+        The matrix stores its interactions in compact NumPy columns. This
+        method exports them into a new dataframe with the columns
+        `interactionid`, `uid`, `iid` and `ts`, indexed by the interaction ID.
+        Integer columns are exported as int64.
+
+        :return: Dataframe of the interactions.
+        :rtype: pd.DataFrame
+        """
+        columns = {name: _to_int64(self._column(name)) for name in _COLUMNS if name in self._columns}
+        return pd.DataFrame(columns, index=pd.Index(columns[InteractionMatrix.INTERACTION_IX]))
+
+    def _set_data(self, columns: Dict[str, np.ndarray]) -> None:
+        """Replace the interactions of the matrix.
+
+        User and item IDs are stored as int32 when they fit. Interaction IDs
+        that are equal to the row numbers are not stored but derived from
+        the row positions, see :meth:`_column`.
+
+        :param columns: Arrays of equal length by column name. Interaction IDs
+            are taken to be the row numbers if absent.
+        :type columns: Dict[str, np.ndarray]
+        """
+        data = {}
+        for name, values in columns.items():
+            values = np.asarray(values)
+            if name == InteractionMatrix.INTERACTION_IX:
+                if np.array_equal(values, np.arange(len(values))):
+                    continue
+                values = values.astype(np.int64, copy=False)
+            elif name != InteractionMatrix.TIMESTAMP_IX:
+                values = _downcast(values)
+            data[name] = values
+        # any change to the underlying data invalidates the derived indices
+        self._data = data
+        self._rows = None
+        self._invalidate_cache()
+
+    @property
+    def _columns(self) -> List[str]:
+        """Names of the columns of the matrix, including the interaction IDs."""
+        return [InteractionMatrix.INTERACTION_IX] + [name for name in self._data if name != InteractionMatrix.INTERACTION_IX]
+
+    def _column_data(self) -> Dict[str, np.ndarray]:
+        """Arrays of all columns for the interactions in the matrix."""
+        return {name: self._column(name) for name in self._columns}
+
+    @classmethod
+    def _from_columns(cls,
+                      columns: Dict[str, np.ndarray],
+                      rows: Optional[Union[slice, np.ndarray]] = None,
+                      shape: Optional[Tuple[int, int]] = None) -> "InteractionMatrix":
+        """Create a matrix on existing columns without processing them.
+
+        The columns are used as they are, e.g. memory-mapped arrays, and must
+        be in the layout produced by :meth:`_set_data`.
+
+        :param columns: Arrays of equal length by column name.
+        :type columns: Dict[str, np.ndarray]
+        :param rows: Row positions in the columns selected by the matrix,
+            defaults to None to select all rows.
+        :type rows: Optional[Union[slice, np.ndarray]], optional
+        :param shape: Shape of the matrix, defaults to None
+        :type shape: Optional[Tuple[int, int]], optional
+        :return: Matrix on the columns.
+        :rtype: InteractionMatrix
+        """
+        interaction_m = InteractionMatrix.__new__(InteractionMatrix)
+        interaction_m._data = columns
+        interaction_m._rows = rows
+        interaction_m._ts_index = None
+        interaction_m._cache = {}
+        if shape:
+            interaction_m.shape = shape
+        return interaction_m
+
+    def fingerprint(self) -> str:
+        """Content fingerprint of the matrix.
+
+        The fingerprint is a hash of the names, types and values of the
+        columns of the interactions and of the shape of the matrix. Matrices
+        with equal interactions and shape have the same fingerprint.
+
+        :return: Hexadecimal digest of the contents of the matrix.
+        :rtype: str
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr(getattr(self, "shape", None)).encode())
+        for name, values in self._column_data().items():
+            values = np.ascontiguousarray(values)
+            digest.update(f"{name}:{values.dtype.str}:{len(values)}".encode())
+            digest.update(values.data)
+        return digest.hexdigest()
+
+    def __copy__(self) -> "InteractionMatrix":
+        interaction_m = self.__class__.__new__(self.__class__)
+        interaction_m.__dict__.update(self.__dict__)
+        return interaction_m
+
+    def __getstate__(self) -> dict:
+        # only the rows selected by a view are pickled, not the shared parent
+        # nor the indices and statistics that can be derived from the rows
+        state = self.__dict__.copy()
+        if self._rows is not None:
+            state["_data"] = self._column_data()
+            state["_rows"] = None
+        state["_ts_index"] = None
+        state["_cache"] = {}
+        return state
+
+    def _column(self, name: str) -> np.ndarray:
+        """Values of a column for the interactions in the matrix.
+
+        The values are read from the shared columns without copying the
+        interactions of a view. The returned array must not be modified.
+
+        Interaction IDs that are not stored are the row positions of the
+        interactions in the shared columns.
+
+        :param name: Name of the column.
+        :type name: str
+        :return: Values of the column.
+        :rtype: np.ndarray
+        """
+        if name == InteractionMatrix.INTERACTION_IX and name not in self._data:
+            return self._positions()
+        values = self._data[name]
+        if self._rows is None:
+            return values
+        return values[self._rows]
+
+    def _positions(self) -> np.ndarray:
+        """Row positions in :attr:`_data` of the interactions in the matrix.
+
+        :return: Row positions of the interactions.
+        :rtype: np.ndarray
+        """
+        if self._rows is None:
+            return np.arange(len(self._data[InteractionMatrix.USER_IX]))
+        if isinstance(self._rows, slice):
+            return np.arange(self._rows.start, self._rows.stop)
+        return self._rows
+
+    def _known_ids(self, name: str) -> np.ndarray:
+        """Values of a user or item ID column without the masked label.
+
+        :param name: Name of the ID column.
+        :type name: str
+        :return: IDs in the column that are not masked.
+        :rtype: np.ndarray
+        """
+        ids = self._column(name)
+        return ids[ids != InteractionMatrix.MASKED_LABEL]
+
+    def _view(self, rows: Union[slice, np.ndarray], inplace: bool = False) -> Optional["InteractionMatrix"]:
+        """Select rows of the matrix without copying the interactions.
+
+        The resulting matrix shares the columns of this matrix and only
+        stores the row positions of the selected interactions.
+
+        :param rows: Slice or sorted row positions relative to this matrix.
+        :type rows: Union[slice, np.ndarray]
+        :param inplace: Apply the selection in place if True, defaults to False
+        :type inplace: bool, optional
+        :return: None if `inplace`, otherwise returns a new InteractionMatrix object
+        :rtype: Union[InteractionMatrix, None]
+        """
+        if self._rows is None:
+            new_rows = rows
+        elif isinstance(self._rows, slice):
+            if isinstance(rows, slice):
+                new_rows = slice(self._rows.start + rows.start,
+                                 self._rows.start + rows.stop)
+            else:
+                new_rows = self._rows.start + rows
+        else:
+            new_rows = self._rows[rows]
+
+        interaction_m = self if inplace else copy(self)
+        interaction_m._rows = new_rows
+        interaction_m._invalidate_cache()
+        return None if inplace else interaction_m
+
+    def _invalidate_cache(self) -> None:
+        """Discard the indices and statistics derived from the interactions.
+
+        Must be called whenever the interactions of the matrix change, i.e.
+        on :meth:`concat` and on any inplace operation.
+        """
+        self._ts_index = None
+        self._cache = {}
+
+    def _cached(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Statistic of the interactions, computed once per version of the matrix.
+
+        :param key: Name of the statistic.
+        :type key: str
+        :param compute: Function computing the statistic on a cache miss.
+        :type compute: Callable[[], Any]
+        :return: Value of the statistic.
+        :rtype: Any
+        """
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def _unique_ids(self, name: str) -> np.ndarray:
+        """Sorted unique IDs of a user or item ID column without the masked label.
+
+        :param name: Name of the ID column.
+        :type name: str
+        :return: Sorted unique IDs in the column.
+        :rtype: np.ndarray
+        """
+        return self._cached(f"unique_{name}", lambda: np.unique(self._known_ids(name)))
+
+    def _time_index(self) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Timestamp-sorted index of the interactions.
+
+        The index is built once and reused by all timestamp comparisons on the
+        matrix. It is a tuple of the timestamps in ascending order and the
+        row positions that sort the interactions by timestamp. The row positions
+        are None when the interactions are already sorted by timestamp, which is
+        the case for data loaded through :class:`Dataset`. Contiguous slices
+        of a sorted matrix inherit the index, so chained timestamp filters do
+        not rebuild it.
+
+        :return: Tuple of sorted timestamps and the sorting row positions.
+        :rtype: Tuple[np.ndarray, Optional[np.ndarray]]
+        """
+        if self._ts_index is None:
+            timestamps = self._column(InteractionMatrix.TIMESTAMP_IX)
+            if len(timestamps) < 2 or bool(np.all(timestamps[:-1] <= timestamps[1:])):
+                self._ts_index = (timestamps, None)
+            else:
+                order = np.argsort(timestamps, kind="stable")
+                self._ts_index = (timestamps[order], order)
+        return self._ts_index
+
+    def _group_index(self, name: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """CSR-style index of the interactions grouped by user or item ID.
+
+        The interactions of the i-th ID in `ids` are the row positions
+        `order[indptr[i]:indptr[i + 1]]`, in ascending order. `keys` combines
+        the group and the row position of every entry of `order` into a
+        single ascending array, such that the entries of a group before a
+        given row position can be found with a binary search.
+
+        :param name: Name of the ID column.
+        :type name: str
+        :return: Tuple of the sorted IDs, group offsets, row positions and keys.
+        :rtype: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+        """
+        def build():
+            values = self._column(name)
+            order = np.argsort(values, kind="stable")
+            ids, starts = np.unique(values[order], return_index=True)
+            indptr = np.append(starts, len(values))
+            groups = np.repeat(np.arange(len(ids), dtype=np.int64), np.diff(indptr))
+            keys = groups * len(values) + order
+            return ids, indptr, order, keys
+        return self._cached(f"group_index_{name}", build)
+
+    def _n_per_group(self,
+                     name: str,
+                     n: int,
+                     boundary: int,
+                     first: bool,
+                     id_in: Optional[IdCollection] = None) -> np.ndarray:
+        """Row positions of the first or last n interactions of every ID.
+
+        Only the interactions at row positions from `boundary` onwards are
+        considered when selecting the first interactions, and only those
+        before `boundary` when selecting the last interactions. The cost is
+        proportional to the number of selected IDs and interactions.
+
+        :param name: Name of the ID column to group by.
+        :type name: str
+        :param n: Number of interactions to select per ID.
+        :type n: int
+        :param boundary: Row position bounding the considered interactions.
+        :type boundary: int
+        :param first: Select the first interactions if True, otherwise the last.
+        :type first: bool
+        :param id_in: IDs to select the interactions of, defaults to all IDs.
+        :type id_in: Optional[IdCollection], optional
+        :return: Ascending row positions of the selected interactions.
+        :rtype: np.ndarray
+        """
+        ids, indptr, order, keys = self._group_index(name)
+        groups = np.flatnonzero(_isin(ids, id_in)) if _has_ids(id_in) else np.arange(len(ids))
+        split = np.searchsorted(keys, groups * len(order) + boundary)
+        if first:
+            lo, hi = split, np.minimum(split + n, indptr[groups + 1])
+        else:
+            lo, hi = np.maximum(split - n, indptr[groups]), split
+        lengths = np.maximum(hi - lo, 0)
+        offsets = np.repeat(lo - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        return np.sort(order[offsets])
+
+    def _reverse_rank(self, name: str) -> np.ndarray:
+        """Number of later interactions with the same user or item ID.
+
+        The last interaction of every ID has rank 0, the interaction before
+        it rank 1, and so on. Interactions are ordered by row position, which
+        is the order of time for data loaded through :class:`Dataset`, same
+        as in :meth:`get_users_n_last_interaction`. The ranks are computed
+        with a single stable sort of the ID column, such that selecting the
+        last n interactions of every ID and the interactions before them are
+        complementary masks on the ranks.
+
+        :param name: Name of the ID column to rank within.
+        :type name: str
+        :return: Rank of every interaction in the matrix.
+        :rtype: np.ndarray
+        """
+        values = self._column(name)
+        n = len(values)
+        order = np.argsort(values, kind="stable")
+        sorted_values = values[order]
+        # exclusive end in `order` of the group of every entry
+        ends = np.append(np.flatnonzero(sorted_values[1:] != sorted_values[:-1]) + 1, n)
+        dtype = np.int32 if n <= np.iinfo(np.int32).max else np.int64
+        rank = np.empty(n, dtype=dtype)
+        rank[order] = np.repeat(ends.astype(dtype), np.diff(ends, prepend=0)) - 1 - np.arange(n, dtype=dtype)
+        return rank
 
     def mask_shape(self, shape: Optional[Tuple[int, int]] = None,
                 #    drop_unknown: bool = False,
@@ -173,22 +608,22 @@ class InteractionMatrix:
         if not shape:
             # infer shape from the data, it does not make sense for user to
             # drop unknown user and item if shape is not defined
-            known_user = self._df[self._df!=-1][InteractionMatrix.USER_IX].nunique()
-            known_item = self._df[self._df!=-1][InteractionMatrix.ITEM_IX].nunique()
+            known_user = self.num_users
+            known_item = self.num_items
             self.shape = (known_user,known_item)
             return
         
         logger.debug(f"(user x item) shape defined is {shape}")
-        logger.debug(f"Shape of dataframe stored in matrix was {self._df.shape} before masking")
+        logger.debug(f"Number of interactions stored in matrix was {len(self)} before masking")
         if drop_unknown_user:
-            self._df = self._df[self._df[InteractionMatrix.USER_IX]<shape[0]]
+            self._apply_mask(self._column(InteractionMatrix.USER_IX) < shape[0], inplace=True)
         if drop_unknown_item:
-            self._df = self._df[self._df[InteractionMatrix.ITEM_IX]<shape[1]]
-        logger.debug(f"Shape of dataframe stored in matrix is now {self._df.shape} after masking")
+            self._apply_mask(self._column(InteractionMatrix.ITEM_IX) < shape[1], inplace=True)
+        logger.debug(f"Number of interactions stored in matrix is now {len(self)} after masking")
         
         if shape and inherit_max_id:
-            max_user = self._df[InteractionMatrix.USER_IX].max()
-            max_item = self._df[InteractionMatrix.ITEM_IX].max()
+            max_user = self._column(InteractionMatrix.USER_IX).max(initial=-1)
+            max_item = self._column(InteractionMatrix.ITEM_IX).max(initial=-1)
             self.shape = (max(shape[0], max_user + 1), max(shape[1], max_item + 1))
         elif shape:
             self.shape = shape
@@ -201,20 +636,27 @@ class InteractionMatrix:
         if self.shape[0] is None or self.shape[1] is None:
             raise ValueError("Shape must be defined.")
         
-        if self.shape[0] < self._df[self._df!=-1][InteractionMatrix.USER_IX].nunique()\
-            or self.shape[1] < self._df[self._df!=-1][InteractionMatrix.ITEM_IX].nunique():
+        if self.shape[0] < self.num_users or self.shape[1] < self.num_items:
             warn("Provided shape does not match dataframe, can't have "
                  "fewer rows than maximal user identifier or columns than "
                  "maximal item identifier.\n Call mask_shape() with drop "
                  "drop_unknown=True to drop unknown users and items.")
                       
     def copy(self) -> "InteractionMatrix":
-        """Create a deep copy of this InteractionMatrix.
+        """Create a copy of this InteractionMatrix.
 
-        :return: Deep copy of this InteractionMatrix.
+        The copy shares the interactions with this matrix. The columns of
+        the interactions are never modified in place, operations on either
+        of the matrices replace them, such that modifications of one matrix
+        are never visible in the other.
+
+        :return: Copy of this InteractionMatrix.
         :rtype: InteractionMatrix
         """
-        return deepcopy(self)
+        interaction_m = self._view(slice(0, len(self)))
+        interaction_m._ts_index = self._ts_index
+        interaction_m._cache = dict(self._cache)
+        return interaction_m
     
     def copy_df(self, reset_index: bool = False) -> "pd.DataFrame":
         """Create a deep copy of the dataframe.
@@ -223,8 +665,8 @@ class InteractionMatrix:
         :rtype: pd.DataFrame
         """
         if reset_index:
-            return deepcopy(self._df.reset_index(drop=True))
-        return deepcopy(self._df)
+            return self.to_dataframe().reset_index(drop=True)
+        return self.to_dataframe()
 
     def concat(self,
                im: Union["InteractionMatrix", pd.DataFrame]) -> "InteractionMatrix":
@@ -239,9 +681,10 @@ class InteractionMatrix:
         :rtype: InteractionMatrix
         """
         if isinstance(im, pd.DataFrame):
-            self._df = pd.concat([self._df, im])
+            other = {name: im[name].to_numpy() for name in self._columns}
         else:
-            self._df = pd.concat([self._df, im._df])
+            other = im._column_data()
+        self._set_data({name: np.concatenate([self._column(name), other[name]]) for name in self._columns})
         
         return self
     
@@ -249,12 +692,16 @@ class InteractionMatrix:
     def union(self, im: "InteractionMatrix") -> "InteractionMatrix":
         """Combine events from this InteractionMatrix with another.
 
+        Interactions are identified by their interaction ID, interactions of
+        `im` that are already present in this InteractionMatrix are not added
+        a second time.
+
         :param im: InteractionMatrix to union with.
         :type im: InteractionMatrix
         :return: Union of interactions in this InteractionMatrix and the other.
         :rtype: InteractionMatrix
         """
-        return self + im
+        return self + im._apply_mask(~im._interactions_of(self))
 
     def difference(self, im: "InteractionMatrix") -> "InteractionMatrix":
         """Difference between this InteractionMatrix and another.
@@ -265,6 +712,46 @@ class InteractionMatrix:
         :rtype: InteractionMatrix
         """
         return self - im
+
+    def intersection(self, im: "InteractionMatrix") -> "InteractionMatrix":
+        """Interactions of this InteractionMatrix that are also in another.
+
+        Interactions are identified by their interaction ID. The result is a
+        view on the selected interactions of this InteractionMatrix.
+
+        :param im: InteractionMatrix to intersect with.
+        :type im: InteractionMatrix
+        :return: Intersection of this InteractionMatrix and the other.
+        :rtype: InteractionMatrix
+        """
+        return self._set_operation_result(im, self._interactions_of(im))
+
+    def _interactions_of(self, im: "InteractionMatrix") -> np.ndarray:
+        """Boolean mask of the interactions that are also present in `im`.
+
+        Every interaction carries a unique interaction ID, so set operations
+        between matrices reduce to membership tests on the integer IDs.
+
+        :param im: InteractionMatrix to look up the interactions in.
+        :type im: InteractionMatrix
+        :return: Boolean mask over the interactions of this matrix.
+        :rtype: np.ndarray
+        """
+        return np.isin(self._column(InteractionMatrix.INTERACTION_IX),
+                       im._column(InteractionMatrix.INTERACTION_IX))
+
+    def _set_operation_result(self, im: "InteractionMatrix", mask: np.ndarray) -> "InteractionMatrix":
+        """View on the interactions selected by a set operation with `im`.
+
+        The shape of the result is the largest shape of both matrices, and is
+        left undefined if either of the matrices has no shape.
+        """
+        result = self._apply_mask(mask)
+        if hasattr(self, "shape") and hasattr(im, "shape"):
+            result.shape = (max(self.shape[0], im.shape[0]), max(self.shape[1], im.shape[1]))
+        elif hasattr(result, "shape"):
+            del result.shape
+        return result
         
     @property
     def values(self) -> csr_matrix:
@@ -273,20 +760,59 @@ class InteractionMatrix:
         Each entry is the number of interactions between that user and item.
         If there are no interactions between a user and item, the entry is 0.
 
+        .. note::
+            The matrix is cached until the interactions change and is shared
+            between calls, it should be treated as read-only.
+
         :return: Interactions between users and items as a csr_matrix.
         :rtype: csr_matrix
         """
+        return self._csr("values", self._build_values)
+
+    def _build_values(self) -> csr_matrix:
+        """Build the count matrix of the interactions with shape :attr:`shape`."""
         # TODO issue with -1 labeling in the interaction matrix should i create prediction matrix
         if not hasattr(self, "shape"):
             raise AttributeError("InteractionMatrix has no shape attribute. Please call mask_shape() first.")
         
-        values = np.ones(self._df.shape[0])
-        indices = self._df[[InteractionMatrix.USER_IX, InteractionMatrix.ITEM_IX]].values
-        indices = (indices[:, 0], indices[:, 1])
+        values = np.ones(len(self))
+        indices = (self._column(InteractionMatrix.USER_IX), self._column(InteractionMatrix.ITEM_IX))
 
         matrix = csr_matrix((values, indices), shape=self.shape, dtype=np.int32)
         return matrix
-    
+
+    def _csr(self, key: str, build: Callable[[], csr_matrix]) -> csr_matrix:
+        """Cached sparse representation of the interactions.
+
+        The cached matrix is only valid for the current version of the
+        interactions. When :attr:`shape` grew since the matrix was cached, e.g.
+        through :meth:`mask_shape`, the cached matrix is padded with empty rows
+        and columns instead of being rebuilt. The matrix is rebuilt if the shape
+        shrunk.
+
+        :param key: Name of the representation in the cache.
+        :type key: str
+        :param build: Function building the matrix with shape :attr:`shape`.
+        :type build: Callable[[], csr_matrix]
+        :return: Sparse matrix of shape :attr:`shape`.
+        :rtype: csr_matrix
+        """
+        matrix = self._cache.get(key)
+        if matrix is not None and matrix.shape != self.shape:
+            n_rows = self.shape[0] - matrix.shape[0]
+            n_cols = self.shape[1] - matrix.shape[1]
+            if n_rows < 0 or n_cols < 0:
+                matrix = None
+            else:
+                if n_rows:
+                    matrix = add_rows_to_csr_matrix(matrix, n_rows)
+                if n_cols:
+                    matrix = add_columns_to_csr_matrix(matrix, n_cols)
+        if matrix is None:
+            matrix = build()
+        self._cache[key] = matrix
+        return matrix
+
     @property
     def indices(self) -> Tuple[List[int], List[int]]:
         """Returns a tuple of lists of user IDs and item IDs corresponding to interactions.
@@ -294,20 +820,23 @@ class InteractionMatrix:
         :return: Tuple of lists of user IDs and item IDs that correspond to at least one interaction.
         :rtype: Tuple[List[int], List[int]]
         """
-        return self.values.nonzero()
+        return self.nonzero()
 
     def nonzero(self) -> Tuple[List[int], List[int]]:
-        return self.values.nonzero()
+        # the nonzero entries do not depend on the shape, so they survive
+        # the growth of the matrix in mask_shape
+        return self._cached("nonzero", lambda: self.values.nonzero())
     
     @overload
-    def users_in(self, U: Set[int], inplace=False) -> "InteractionMatrix": ...
+    def users_in(self, U: IdCollection, inplace=False) -> "InteractionMatrix": ...
     @overload
-    def users_in(self, U: Set[int], inplace=True) -> None: ...
-    def users_in(self, U: Set[int], inplace=False) -> Optional["InteractionMatrix"]:
+    def users_in(self, U: IdCollection, inplace=True) -> None: ...
+    def users_in(self, U: IdCollection, inplace=False) -> Optional["InteractionMatrix"]:
         """Keep only interactions by one of the specified users.
 
-        :param U: A Set or List of users to select the interactions from.
-        :type U: Union[Set[int]
+        :param U: A Set, List or array of users to select the interactions
+            from, or a boolean mask indexed by user ID.
+        :type U: IdCollection
         :param inplace: Apply the selection in place or not, defaults to False
         :type inplace: bool, optional
         :return: None if `inplace`, otherwise returns a new InteractionMatrix object
@@ -315,7 +844,7 @@ class InteractionMatrix:
         """
         logger.debug("Performing users_in comparison")
 
-        mask = self._df[InteractionMatrix.USER_IX].isin(U)
+        mask = _isin(self._column(InteractionMatrix.USER_IX), U)
 
         return self._apply_mask(mask, inplace=inplace)
     
@@ -323,18 +852,31 @@ class InteractionMatrix:
     def _apply_mask(self, mask: pd.Series, inplace=True) -> "InteractionMatrix": ...
     @overload
     def _apply_mask(self, mask: pd.Series, inplace=False) -> None: ...
-    def _apply_mask(self, mask: pd.Series, inplace=False) -> Optional["InteractionMatrix"]:
-        interaction_m = self if inplace else self.copy()
+    def _apply_mask(self, mask: Union[pd.Series, np.ndarray], inplace=False) -> Optional["InteractionMatrix"]:
+        """Keep only the interactions for which the mask is True.
 
-        c_df = interaction_m._df[mask]
+        The interactions are not copied, the resulting matrix is a view on
+        the selected rows of this matrix.
 
-        interaction_m._df = c_df
-        return None if inplace else interaction_m
+        :param mask: Boolean mask over the interactions of the matrix.
+        :type mask: Union[pd.Series, np.ndarray]
+        :param inplace: Apply the selection in place if True, defaults to False
+        :type inplace: bool, optional
+        :return: None if `inplace`, otherwise returns a new InteractionMatrix object
+        :rtype: Union[InteractionMatrix, None]
+        """
+        return self._view(np.flatnonzero(np.asarray(mask)), inplace=inplace)
     
     def _timestamps_cmp(self, op: Callable, timestamp: float, inplace: bool = False) -> Optional["InteractionMatrix"]:
         """Filter interactions based on timestamp.
         Keep only interactions for which op(t, timestamp) is True.
 
+        The comparison is resolved with a binary search on the timestamp-sorted
+        index of the matrix, see :meth:`_time_index`. The interactions that
+        satisfy the comparison form a contiguous range of the index, such that
+        the query costs `O(log n + k)` for `k` selected interactions instead of
+        a scan over all interactions.
+
         :param op: Comparison operator.
         :type op: Callable
         :param timestamp: Timestamp to compare against in seconds from epoch.
@@ -344,8 +886,116 @@ class InteractionMatrix:
         """
         logger.debug(f"Performing {op.__name__}(t, {timestamp})")
 
-        mask = op(self._df[InteractionMatrix.TIMESTAMP_IX], timestamp)
-        return self._apply_mask(mask, inplace=inplace)
+        if op not in _TIMESTAMP_CMP_RANGE:
+            mask = op(self._column(InteractionMatrix.TIMESTAMP_IX), timestamp)
+            return self._apply_mask(mask, inplace=inplace)
+
+        sorted_ts, _ = self._time_index()
+        side, upper = _TIMESTAMP_CMP_RANGE[op]
+        split = int(np.searchsorted(sorted_ts, timestamp, side=side))
+        if upper:
+            return self._apply_time_slice(0, split, inplace=inplace)
+        return self._apply_time_slice(split, len(sorted_ts), inplace=inplace)
+
+    def _apply_time_slice(self, start: int, stop: int, inplace: bool = False) -> Optional["InteractionMatrix"]:
+        """Keep only the interactions in `[start, stop)` of the timestamp-sorted index.
+
+        Interactions retain their original order in the matrix. If the
+        matrix is sorted by timestamp, the selection is a contiguous slice
+        and the resulting matrix inherits the sorted index.
+
+        :param start: Start position in the timestamp-sorted index.
+        :type start: int
+        :param stop: End position (exclusive) in the timestamp-sorted index.
+        :type stop: int
+        :param inplace: Apply the selection in place if True, defaults to False
+        :type inplace: bool, optional
+        :return: None if `inplace`, otherwise returns a new InteractionMatrix object
+        :rtype: Union[InteractionMatrix, None]
+        """
+        sorted_ts, order = self._time_index()
+
+        if order is not None:
+            return self._view(np.sort(order[start:stop]), inplace=inplace)
+
+        interaction_m = self._view(slice(start, stop), inplace=inplace)
+        if interaction_m is None:
+            interaction_m = self
+        interaction_m._ts_index = (sorted_ts[start:stop], None)
+        return None if inplace else interaction_m
+
+    def query(self) -> InteractionQuery:
+        """Start a lazy chain of filters on this InteractionMatrix.
+
+        The filters are executed together in a single pass when the query is
+        collected, see :class:`InteractionQuery`.
+
+        :return: Empty query on this matrix.
+        :rtype: InteractionQuery
+        """
+        return InteractionQuery(self)
+
+    def _select(self,
+                time_filters: List[Tuple[Callable, float]],
+                id_filters: List[Tuple[str, IdCollection, bool]],
+                inplace: bool = False) -> Optional["InteractionMatrix"]:
+        """Keep only the interactions that satisfy all filters of a query.
+
+        The timestamp comparisons are intersected into a single range of the
+        timestamp-sorted index. The ID filters are then only evaluated on the
+        interactions in that range, and the resulting selection is applied
+        as one view.
+
+        :param time_filters: Timestamp comparisons as (operator, timestamp).
+        :type time_filters: List[Tuple[Callable, float]]
+        :param id_filters: ID filters as (column, IDs, keep IDs if True or
+            drop them if False).
+        :type id_filters: List[Tuple[str, IdCollection, bool]]
+        :param inplace: Apply the selection in place if True, defaults to False
+        :type inplace: bool, optional
+        :return: None if `inplace`, otherwise returns a new InteractionMatrix object
+        :rtype: Union[InteractionMatrix, None]
+        """
+        start, stop = 0, len(self)
+        sorted_ts, order = self._time_index() if time_filters else (None, None)
+        for op, timestamp in time_filters:
+            side, upper = _TIMESTAMP_CMP_RANGE[op]
+            split = int(np.searchsorted(sorted_ts, timestamp, side=side))
+            if upper:
+                stop = min(stop, split)
+            else:
+                start = max(start, split)
+        stop = max(start, stop)
+
+        if not id_filters:
+            return self._apply_time_slice(start, stop, inplace=inplace)
+
+        rows = np.arange(start, stop) if order is None else np.sort(order[start:stop])
+        mask = np.ones(len(rows), dtype=bool)
+        for name, ids, keep in id_filters:
+            values = self._column(name)[rows]
+            mask &= _isin(values, ids) if keep else ~_isin(values, ids)
+        return self._view(rows[mask], inplace=inplace)
+
+    def time_windows(self, t_lower: Sequence[float], t_upper: Sequence[float]) -> List["InteractionMatrix"]:
+        """Select the interactions of several time windows at once.
+
+        The i-th resulting matrix contains the interactions with a timestamp
+        in `[t_lower[i], t_upper[i])`. The boundaries of all windows are
+        resolved with a single vectorized binary search on the
+        timestamp-sorted index, and every window is a view on this matrix.
+
+        :param t_lower: Inclusive lower timestamp of every window.
+        :type t_lower: Sequence[float]
+        :param t_upper: Exclusive upper timestamp of every window.
+        :type t_upper: Sequence[float]
+        :return: InteractionMatrix of every window.
+        :rtype: List[InteractionMatrix]
+        """
+        sorted_ts, _ = self._time_index()
+        starts = np.searchsorted(sorted_ts, t_lower, side="left")
+        stops = np.maximum(np.searchsorted(sorted_ts, t_upper, side="left"), starts)
+        return [self._apply_time_slice(int(start), int(stop)) for start, stop in zip(starts, stops)]
 
     @overload
     def timestamps_gt(self, timestamp: float) -> "InteractionMatrix": ...
@@ -423,48 +1073,40 @@ class InteractionMatrix:
         :return: Union of interactions in this InteractionMatrix and the other.
         :rtype: InteractionMatrix
         """
-        df = pd.concat([self._df, im._df], copy=False)
+        interaction_m = copy(self).concat(im)
         
-        shape = None
         if hasattr(self, "shape") and hasattr(im, "shape"):
             shape = (max(self.shape[0], im.shape[0]), max(self.shape[1], im.shape[1]))
             self.shape = shape
+            interaction_m.shape = shape
+        elif hasattr(interaction_m, "shape"):
+            del interaction_m.shape
             
-        return InteractionMatrix(
-            df,
-            InteractionMatrix.ITEM_IX,
-            InteractionMatrix.USER_IX,
-            InteractionMatrix.TIMESTAMP_IX,
-            shape,
-            True
-        )
+        return interaction_m
     
     def __sub__(self, im: "InteractionMatrix") -> "InteractionMatrix":
-        full_data = pd.MultiIndex.from_frame(self._df)
-        data_part_2 = pd.MultiIndex.from_frame(im._df)
-        data_part_1 = full_data.difference(data_part_2).to_frame().reset_index(drop=True)
-        
-        shape = None
-        if hasattr(self, "shape") and hasattr(im, "shape"):
-            shape = (max(self.shape[0], im.shape[0]), max(self.shape[1], im.shape[1]))
-        
-        return InteractionMatrix(
-            data_part_1,
-            InteractionMatrix.ITEM_IX,
-            InteractionMatrix.USER_IX,
-            InteractionMatrix.TIMESTAMP_IX,
-            shape,
-            True
-        )
+        """Interactions of this InteractionMatrix that are not in another.
+
+        Interactions are identified by their interaction ID. The result is a
+        view on the remaining interactions of this InteractionMatrix.
+
+        :param im: InteractionMatrix to subtract from this.
+        :type im: InteractionMatrix
+        :return: Difference between this InteractionMatrix and the other.
+        :rtype: InteractionMatrix
+        """
+        return self._set_operation_result(im, ~self._interactions_of(im))
     
     def __repr__(self) -> str:
-        return repr(self._df)
+        return repr(self.to_dataframe())
     
     def __eq__(self, value: object) -> bool:
         if not isinstance(value, InteractionMatrix):
             logger.debug(f"Comparing {type(value)} with InteractionMatrix is not supported")
             return False
-        return self._df.equals(value._df)
+        if self._columns != value._columns:
+            return False
+        return all(np.array_equal(self._column(name), value._column(name)) for name in self._columns)
     
     def __len__(self) -> int:
         """Return the number of interactions in the matrix.
@@ -477,17 +1119,22 @@ class InteractionMatrix:
         :return: Number of interactions in the matrix.
         :rtype: int
         """
-        return len(self._df)
+        if self._rows is None:
+            return len(self._data[InteractionMatrix.USER_IX])
+        if isinstance(self._rows, slice):
+            return self._rows.stop - self._rows.start
+        return len(self._rows)
     
     @overload
-    def items_in(self, I: Set[int], inplace=False) -> "InteractionMatrix": ...
+    def items_in(self, I: IdCollection, inplace=False) -> "InteractionMatrix": ...
     @overload
-    def items_in(self, I: Set[int], inplace=True) -> None: ...
-    def items_in(self, I: Set[int], inplace=False) -> Optional["InteractionMatrix"]:
+    def items_in(self, I: IdCollection, inplace=True) -> None: ...
+    def items_in(self, I: IdCollection, inplace=False) -> Optional["InteractionMatrix"]:
         """Keep only interactions with the specified items.
 
-        :param I: A Set or List of items to select the interactions.
-        :type I: Set[int]
+        :param I: A Set, List or array of items to select the interactions,
+            or a boolean mask indexed by item ID.
+        :type I: IdCollection
         :param inplace: Apply the selection in place or not, defaults to False
         :type inplace: bool, optional
         :return: None if `inplace`, otherwise returns a new InteractionMatrix object
@@ -495,15 +1142,16 @@ class InteractionMatrix:
         """
         logger.debug("Performing items_in comparison")
 
-        mask = self._df[InteractionMatrix.ITEM_IX].isin(I)
+        mask = _isin(self._column(InteractionMatrix.ITEM_IX), I)
 
         return self._apply_mask(mask, inplace=inplace)
     
-    def items_not_in(self, I: Set[int], inplace=False) -> Optional["InteractionMatrix"]:
+    def items_not_in(self, I: IdCollection, inplace=False) -> Optional["InteractionMatrix"]:
         """Keep only interactions not with the specified items.
 
-        :param I: A Set or List of items to exclude from the interactions.
-        :type I: Set[int]
+        :param I: A Set, List or array of items to exclude from the
+            interactions, or a boolean mask indexed by item ID.
+        :type I: IdCollection
         :param inplace: Apply the selection in place or not, defaults to False
         :type inplace: bool, optional
         :return: None if `inplace`, otherwise returns a new InteractionMatrix object
@@ -511,15 +1159,16 @@ class InteractionMatrix:
         """
         logger.debug("Performing items_not_in comparison")
 
-        mask = ~self._df[InteractionMatrix.ITEM_IX].isin(I)
+        mask = ~_isin(self._column(InteractionMatrix.ITEM_IX), I)
 
         return self._apply_mask(mask, inplace=inplace)
     
-    def users_not_in(self, U:Set[int], inplace=False) -> Optional["InteractionMatrix"]:
+    def users_not_in(self, U: IdCollection, inplace=False) -> Optional["InteractionMatrix"]:
         """Keep only interactions not by the specified users.
 
-        :param U: A Set or List of users to exclude from the interactions.
-        :type U: Set[int]
+        :param U: A Set, List or array of users to exclude from the
+            interactions, or a boolean mask indexed by user ID.
+        :type U: IdCollection
         :param inplace: Apply the selection in place or not, defaults to False
         :type inplace: bool, optional
         :return: None if `inplace`, otherwise returns a new InteractionMatrix object
@@ -527,7 +1176,7 @@ class InteractionMatrix:
         """
         logger.debug("Performing users_not_in comparison")
 
-        mask = ~self._df[InteractionMatrix.USER_IX].isin(U)
+        mask = ~_isin(self._column(InteractionMatrix.USER_IX), U)
 
         return self._apply_mask(mask, inplace=inplace)
 
@@ -545,9 +1194,10 @@ class InteractionMatrix:
         """
         logger.debug("Performing interactions_in comparison")
 
-        mask = self._df[InteractionMatrix.INTERACTION_IX].isin(interaction_ids)
+        ids = self._column(InteractionMatrix.INTERACTION_IX)
+        mask = _isin(ids, interaction_ids)
 
-        unknown_interaction_ids = set(interaction_ids).difference(self._df[InteractionMatrix.INTERACTION_IX].unique())
+        unknown_interaction_ids = set(interaction_ids).difference(np.unique(ids))
 
         if unknown_interaction_ids:
             warn(f"IDs {unknown_interaction_ids} not present in data")
@@ -560,30 +1210,32 @@ class InteractionMatrix:
                                  by: ItemUserBasedEnum,
                                  n_seq_data: int,
                                  t_upper: Optional[int] = None,
-                                 id_in: Optional[Set[int]] = None,
+                                 id_in: Optional[IdCollection] = None,
                                  inplace = False) -> "InteractionMatrix":
         if not self.has_timestamps:
             raise TimestampAttributeMissingError()
         if t_upper is None:
             t_upper = self.max_timestamp + 1 # to include the last timestamp
 
-        interaction_m = self if inplace else self.copy()
+        by_ix = InteractionMatrix.USER_IX if by == ItemUserBasedEnum.USER else InteractionMatrix.ITEM_IX
 
-        mask = interaction_m._df[InteractionMatrix.TIMESTAMP_IX] < t_upper
-        if id_in and by == ItemUserBasedEnum.USER:
-            mask = mask & interaction_m._df[InteractionMatrix.USER_IX].isin(id_in)
-        elif id_in and by == ItemUserBasedEnum.ITEM:
-            mask = mask & interaction_m._df[InteractionMatrix.ITEM_IX].isin(id_in)
-            
-        if by == ItemUserBasedEnum.USER:
-            c_df = interaction_m._df[mask].groupby(
-                InteractionMatrix.USER_IX).tail(n_seq_data)
+        sorted_ts, order = self._time_index()
+        if order is None:
+            # interactions before t_upper are a prefix of the sorted matrix
+            boundary = np.searchsorted(sorted_ts, t_upper, side="left")
+            positions = self._n_per_group(by_ix, n_seq_data, boundary, first=False, id_in=id_in)
         else:
-            c_df = interaction_m._df[mask].groupby(
-                InteractionMatrix.ITEM_IX).tail(n_seq_data)
-        interaction_m._df = c_df
-        
-        return interaction_m
+            by_values = self._column(by_ix)
+            mask = self._column(InteractionMatrix.TIMESTAMP_IX) < t_upper
+            if _has_ids(id_in):
+                mask = mask & _isin(by_values, id_in)
+
+            positions = np.flatnonzero(mask)
+            groups = pd.Series(by_values[positions])
+            positions = positions[groups.groupby(groups.to_numpy()).tail(n_seq_data).index.to_numpy()]
+
+        interaction_m = self._view(positions, inplace=inplace)
+        return self if inplace else interaction_m
     
     def _get_first_n_interactions(self,
                                  by: ItemUserBasedEnum,
@@ -595,22 +1247,25 @@ class InteractionMatrix:
         if t_lower is None:
             t_lower = self.min_timestamp
 
-        interaction_m = self if inplace else self.copy()
-        
-        mask = interaction_m._df[InteractionMatrix.TIMESTAMP_IX] >= t_lower
-        if by == ItemUserBasedEnum.USER:
-            c_df = interaction_m._df[mask].groupby(
-                InteractionMatrix.USER_IX).head(n_seq_data)
+        by_ix = InteractionMatrix.USER_IX if by == ItemUserBasedEnum.USER else InteractionMatrix.ITEM_IX
+
+        sorted_ts, order = self._time_index()
+        if order is None:
+            # interactions from t_lower onwards are a suffix of the sorted matrix
+            boundary = np.searchsorted(sorted_ts, t_lower, side="left")
+            positions = self._n_per_group(by_ix, n_seq_data, boundary, first=True)
         else:
-            c_df = interaction_m._df[mask].groupby(
-                InteractionMatrix.ITEM_IX).head(n_seq_data)
-        interaction_m._df = c_df
-        return interaction_m
+            positions = np.flatnonzero(self._column(InteractionMatrix.TIMESTAMP_IX) >= t_lower)
+            groups = pd.Series(self._column(by_ix)[positions])
+            positions = positions[groups.groupby(groups.to_numpy()).head(n_seq_data).index.to_numpy()]
+
+        interaction_m = self._view(positions, inplace=inplace)
+        return self if inplace else interaction_m
     
     def get_users_n_last_interaction(self,
                                      n_seq_data: int = 1,
                                      t_upper: Optional[int] = None,
-                                     user_in: Optional[Set[int]] = None,
+                                     user_in: Optional[IdCollection] = None,
                                      inplace: bool = False) -> "InteractionMatrix":
         """Select the last n interactions for each user.
 
@@ -621,7 +1276,7 @@ class InteractionMatrix:
         :type t_upper: Optional[int], optional
         :param user_in: Set of user IDs to select the interactions from,
             defaults to None
-        :type user_in: Optional[Set[int]], optional
+        :type user_in: Optional[IdCollection], optional
         :param inplace: If operation is inplace, defaults to False
         :type inplace: bool, optional
         :return: Resulting interaction matrix
@@ -630,10 +1285,67 @@ class InteractionMatrix:
         logger.debug("Performing get_user_n_last_interaction comparison")
         return self._get_last_n_interactions(ItemUserBasedEnum.USER, n_seq_data, t_upper, user_in, inplace)
 
+    def get_users_n_last_interaction_windows(self,
+                                             n_seq_data: int,
+                                             t_upper: Sequence[float],
+                                             user_in: Sequence[np.ndarray]) -> List["InteractionMatrix"]:
+        """Select the last n interactions of the users of several windows at once.
+
+        The i-th resulting matrix is equal to
+        `get_users_n_last_interaction(n_seq_data, t_upper[i], user_in[i])`.
+        For a matrix sorted by timestamp, the interactions before every
+        `t_upper[i]` are a prefix of the matrix. The (window, user) pairs of
+        all windows are then resolved with a single binary search on the
+        per-user group index, which is built once, instead of a lookup of
+        the users of every window over all users of the matrix.
+
+        :param n_seq_data: Number of interactions to select per user.
+        :type n_seq_data: int
+        :param t_upper: Exclusive upper timestamp of every window.
+        :type t_upper: Sequence[float]
+        :param user_in: User IDs of every window, which may contain duplicates.
+            An empty array selects all users.
+        :type user_in: Sequence[np.ndarray]
+        :return: InteractionMatrix of every window.
+        :rtype: List[InteractionMatrix]
+        """
+        if not self.has_timestamps:
+            raise TimestampAttributeMissingError()
+        sorted_ts, order = self._time_index()
+        if order is not None:
+            # the last interactions are taken in order of the rows, which
+            # are not a prefix per window if the rows are not sorted by time
+            return [self.get_users_n_last_interaction(n_seq_data, t, np.unique(users))
+                    for t, users in zip(t_upper, user_in)]
+
+        ids, indptr, group_order, keys = self._group_index(InteractionMatrix.USER_IX)
+        num_windows = len(user_in)
+        # an empty collection selects all users, as in get_users_n_last_interaction
+        user_in = [users if len(users) else ids for users in user_in]
+        windows = np.repeat(np.arange(num_windows, dtype=np.int64), [len(users) for users in user_in])
+        users = np.concatenate([np.asarray(users, dtype=np.int64) for users in user_in] + [np.empty(0, dtype=np.int64)])
+        groups = np.searchsorted(ids, users)
+        # users without interactions in the matrix have no last interactions
+        known = groups < len(ids)
+        known[known] = ids[groups[known]] == users[known]
+        # unique (window, user) pairs, sorted by window
+        windows, groups = np.divmod(np.unique(windows[known] * (len(ids) + 1) + groups[known]), len(ids) + 1)
+
+        boundaries = np.searchsorted(sorted_ts, np.asarray(t_upper, dtype=np.float64), side="left")
+        split = np.searchsorted(keys, groups * len(group_order) + boundaries[windows])
+        lo, hi = np.maximum(split - n_seq_data, indptr[groups]), split
+        lengths = np.maximum(hi - lo, 0)
+        offsets = np.repeat(lo - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        positions = group_order[offsets]
+        window_ends = np.zeros(num_windows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(windows, weights=lengths, minlength=num_windows).astype(np.int64), out=window_ends[1:])
+        return [self._view(np.sort(positions[window_ends[idx]:window_ends[idx + 1]]))
+                for idx in range(num_windows)]
+
     def get_items_n_last_interaction(self,
                                      n_seq_data: int = 1,
                                      t_upper: Optional[int] = None,
-                                     item_in: Optional[Set[int]] = None,
+                                     item_in: Optional[IdCollection] = None,
                                      inplace: bool = False) -> "InteractionMatrix":
         """Select the last n interactions for each item.
         
@@ -644,7 +1356,7 @@ class InteractionMatrix:
         :type t_upper: Optional[int], optional
         :param item_in: Set of item IDs to select the interactions from,
             defaults to None
-        :type item_in: Optional[Set[int]], optional
+        :type item_in: Optional[IdCollection], optional
         :param inplace: If operation is inplace, defaults to False
         :type inplace: bool, optional
         :return: Resulting interaction matrix
@@ -696,10 +1408,12 @@ class InteractionMatrix:
         An entry is 1 if there is at least one interaction between that user and item.
         In all other cases the entry is 0.
 
+        The matrix is cached and shared in the same way as :attr:`values`.
+
         :return: Binary csr_matrix of interactions.
         :rtype: csr_matrix
         """
-        return to_binary(self.values)
+        return self._csr("binary_values", lambda: to_binary(self.values))
     
     def get_prediction_data(self) -> "InteractionMatrix":
         """Get the data to be predicted.
@@ -718,26 +1432,50 @@ class InteractionMatrix:
         :return: InteractionMatrix with only the known data.
         :rtype: InteractionMatrix
         """
-        mask = (self._df[InteractionMatrix.USER_IX]!=-1) & (self._df[InteractionMatrix.ITEM_IX]!=-1)
+        mask = (self._column(InteractionMatrix.USER_IX) != -1) & (self._column(InteractionMatrix.ITEM_IX) != -1)
         return self._apply_mask(mask)
         
     @property
-    def user_ids(self) -> Set[int]:
+    def user_ids(self) -> FrozenSet[int]:
         """The set of all user IDs.
 
+        The set is computed once and shared between accesses, it is therefore
+        immutable.
+
         :return: Set of all user IDs.
-        :rtype: Set[int]
+        :rtype: FrozenSet[int]
         """
-        return set(self._df[self._df!=-1][InteractionMatrix.USER_IX].dropna().unique())
+        return self._cached("user_ids", lambda: frozenset(self._unique_ids(InteractionMatrix.USER_IX).tolist()))
     
     @property
-    def item_ids(self) -> Set[int]:
+    def item_ids(self) -> FrozenSet[int]:
         """The set of all item IDs.
 
+        The set is computed once and shared between accesses, it is therefore
+        immutable.
+
         :return: Set of all item IDs.
-        :rtype: Set[int]
+        :rtype: FrozenSet[int]
+        """
+        return self._cached("item_ids", lambda: frozenset(self._unique_ids(InteractionMatrix.ITEM_IX).tolist()))
+
+    @property
+    def num_users(self) -> int:
+        """The number of unique user IDs.
+
+        :return: Number of unique user IDs.
+        :rtype: int
+        """
+        return len(self._unique_ids(InteractionMatrix.USER_IX))
+
+    @property
+    def num_items(self) -> int:
+        """The number of unique item IDs.
+
+        :return: Number of unique item IDs.
+        :rtype: int
         """
-        return set(self._df[self._df!=-1][InteractionMatrix.ITEM_IX].dropna().unique())
+        return len(self._unique_ids(InteractionMatrix.ITEM_IX))
     
     @property
     def num_interactions(self) -> int:
@@ -746,7 +1484,7 @@ class InteractionMatrix:
         :return: Total interaction count.
         :rtype: int
         """
-        return len(self._df)
+        return len(self)
     
     @property
     def has_timestamps(self) -> bool:
@@ -755,7 +1493,7 @@ class InteractionMatrix:
         :return: True if timestamps information is available, False otherwise.
         :rtype: bool
         """
-        return self.TIMESTAMP_IX in self._df
+        return self.TIMESTAMP_IX in self._data
     
     @property
     def min_timestamp(self) -> int:
@@ -766,7 +1504,8 @@ class InteractionMatrix:
         """
         if not self.has_timestamps:
             raise TimestampAttributeMissingError()
-        return self._df[self.TIMESTAMP_IX].min()
+        sorted_ts, _ = self._time_index()
+        return sorted_ts[0] if len(sorted_ts) else np.nan
     
     @property
     def max_timestamp(self) -> int:
@@ -777,7 +1516,8 @@ class InteractionMatrix:
         """
         if not self.has_timestamps:
             raise TimestampAttributeMissingError()
-        return self._df[self.TIMESTAMP_IX].max()
+        sorted_ts, _ = self._time_index()
+        return sorted_ts[-1] if len(sorted_ts) else np.nan
 
     @property
     def max_user_id(self) -> int:
@@ -786,10 +1526,8 @@ class InteractionMatrix:
         :return: The highest user ID.
         :rtype: int
         """
-        max_val = self._df[self._df!=-1][InteractionMatrix.USER_IX].max()
-        if np.isnan(max_val):
-            return -1
-        return max_val
+        user_ids = self._unique_ids(InteractionMatrix.USER_IX)
+        return user_ids[-1] if len(user_ids) else -1
     
     @property
     def max_item_id(self) -> int:
@@ -803,7 +1541,5 @@ class InteractionMatrix:
         :return: The highest item ID.
         :rtype: int
         """
-        max_val = self._df[self._df!=-1][InteractionMatrix.ITEM_IX].max()
-        if np.isnan(max_val):
-            return -1
-        return max_val
\ No newline at end of file
+        item_ids = self._unique_ids(InteractionMatrix.ITEM_IX)
+        return item_ids[-1] if len(item_ids) else -1
\ No newline at end of file
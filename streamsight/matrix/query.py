@@ -0,0 +1,159 @@
+import logging
+import operator
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from streamsight.matrix.interaction_matrix import IdCollection, InteractionMatrix
+
+logger = logging.getLogger(__name__)
+
+
+class InteractionQuery:
+    """Lazy chain of filters on an :class:`InteractionMatrix`.
+
+    Filters added to the query are only recorded. When the query is
+    collected, all timestamp filters are resolved together into a single
+    range of the timestamp-sorted index of the matrix, and all ID filters are
+    evaluated in one pass over the interactions in that range. The selected
+    interactions are materialized once, as a view on the matrix, instead of
+    once per filter.
+
+    Example
+    ~~~~~~~~~
+
+    .. code-block:: python
+
+        future_interaction = (
+            data.query()
+            .timestamps_gte(t)
+            .timestamps_lt(t + t_upper)
+            .users_in(users)
+            .collect()
+        )
+
+    :param matrix: Matrix to select the interactions from.
+    :type matrix: InteractionMatrix
+    """
+
+    def __init__(self, matrix: "InteractionMatrix"):
+        self._matrix = matrix
+        self._time_filters: List[Tuple[Callable, float]] = []
+        """Timestamp comparisons as (operator, timestamp)."""
+        self._id_filters: List[Tuple[str, "IdCollection", bool]] = []
+        """ID filters as (column, IDs, keep IDs if True or drop them if False)."""
+
+    def timestamps_gt(self, timestamp: float) -> "InteractionQuery":
+        """Select interactions after a given timestamp.
+
+        :param timestamp: The timestamp with which
+            the interactions timestamp is compared.
+        :type timestamp: float
+        :return: This query.
+        :rtype: InteractionQuery
+        """
+        self._time_filters.append((operator.gt, timestamp))
+        return self
+
+    def timestamps_gte(self, timestamp: float) -> "InteractionQuery":
+        """Select interactions after and including a given timestamp.
+
+        :param timestamp: The timestamp with which
+            the interactions timestamp is compared.
+        :type timestamp: float
+        :return: This query.
+        :rtype: InteractionQuery
+        """
+        self._time_filters.append((operator.ge, timestamp))
+        return self
+
+    def timestamps_lt(self, timestamp: float) -> "InteractionQuery":
+        """Select interactions up to a given timestamp.
+
+        :param timestamp: The timestamp with which
+            the interactions timestamp is compared.
+        :type timestamp: float
+        :return: This query.
+        :rtype: InteractionQuery
+        """
+        self._time_filters.append((operator.lt, timestamp))
+        return self
+
+    def timestamps_lte(self, timestamp: float) -> "InteractionQuery":
+        """Select interactions up to and including a given timestamp.
+
+        :param timestamp: The timestamp with which
+            the interactions timestamp is compared.
+        :type timestamp: float
+        :return: This query.
+        :rtype: InteractionQuery
+        """
+        self._time_filters.append((operator.le, timestamp))
+        return self
+
+    def users_in(self, U: "IdCollection") -> "InteractionQuery":
+        """Keep only interactions by one of the specified users.
+
+        :param U: A Set, List or array of users, or a boolean mask indexed by user ID.
+        :type U: IdCollection
+        :return: This query.
+        :rtype: InteractionQuery
+        """
+        self._id_filters.append((self._matrix.USER_IX, U, True))
+        return self
+
+    def users_not_in(self, U: "IdCollection") -> "InteractionQuery":
+        """Keep only interactions not by the specified users.
+
+        :param U: A Set, List or array of users to exclude, or a boolean mask indexed by user ID.
+        :type U: IdCollection
+        :return: This query.
+        :rtype: InteractionQuery
+        """
+        self._id_filters.append((self._matrix.USER_IX, U, False))
+        return self
+
+    def items_in(self, I: "IdCollection") -> "InteractionQuery":
+        """Keep only interactions with the specified items.
+
+        :param I: A Set, List or array of items, or a boolean mask indexed by item ID.
+        :type I: IdCollection
+        :return: This query.
+        :rtype: InteractionQuery
+        """
+        self._id_filters.append((self._matrix.ITEM_IX, I, True))
+        return self
+
+    def items_not_in(self, I: "IdCollection") -> "InteractionQuery":
+        """Keep only interactions not with the specified items.
+
+        :param I: A Set, List or array of items to exclude, or a boolean mask indexed by item ID.
+        :type I: IdCollection
+        :return: This query.
+        :rtype: InteractionQuery
+        """
+        self._id_filters.append((self._matrix.ITEM_IX, I, False))
+        return self
+
+    def exclude_masked(self) -> "InteractionQuery":
+        """Drop the interactions with a masked user or item ID.
+
+        :return: This query.
+        :rtype: InteractionQuery
+        """
+        masked = {self._matrix.MASKED_LABEL}
+        self._id_filters.append((self._matrix.USER_IX, masked, False))
+        self._id_filters.append((self._matrix.ITEM_IX, masked, False))
+        return self
+
+    def collect(self, inplace: bool = False) -> Optional["InteractionMatrix"]:
+        """Execute the query on the matrix.
+
+        :param inplace: Apply the selection to the matrix in place if True,
+            defaults to False
+        :type inplace: bool, optional
+        :return: None if `inplace`, otherwise returns a new InteractionMatrix object
+        :rtype: Union[InteractionMatrix, None]
+        """
+        logger.debug(f"Executing query with {len(self._time_filters)} timestamp"
+                     f" and {len(self._id_filters)} ID filters")
+        return self._matrix._select(self._time_filters, self._id_filters, inplace=inplace)
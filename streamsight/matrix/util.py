@@ -24,7 +24,7 @@ def to_csr_matrix(
     if isinstance(X, csr_matrix):
         res = X
     elif isinstance(X, InteractionMatrix):
-        res = X.values
+        return X.binary_values if binary else X.values
     else:
         raise AttributeError("Not supported Matrix conversion")
     return to_binary(res) if binary else res
\ No newline at end of file
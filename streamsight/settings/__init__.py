@@ -51,8 +51,13 @@ to provide this data, we have included the option to provide the last n interact
     :toctree: generated/
 
     Setting
+    SettingWindow
+    SettingCursor
     SingleTimePointSetting
     SlidingWindowSetting
+    OverlappingWindowSetting
+    CountWindowSetting
+    StreamingSetting
 
 A setting is stateful. Thus, the initialization of the setting object only stores
 the parameters that are passed. Calling of :attr:`Setting.split` is necessary
@@ -81,6 +86,32 @@ and will be obtained from the file in the directory.
     )
     setting_sliding.split(data)
 
+Windows that overlap, e.g. a window of 7 days that moves by a day, are defined
+with :class:`OverlappingWindowSetting`. The ground truth of a window spans the
+whole window while the model is updated with the interactions of every step.
+Windows with a fixed number of interactions instead of a fixed duration, such
+that every window takes a similar time to evaluate, are defined with
+:class:`CountWindowSetting`.
+
+Interactions that are still being recorded, e.g. appended to a file by another
+process, are evaluated with :class:`StreamingSetting`. The windows of the
+setting are closed and released to :class:`EvaluatorStreamer` as soon as their
+time boundary passes, see :class:`streamsight.datasets.InteractionStream`.
+
+.. code-block:: python
+
+    from streamsight.datasets import InteractionStream
+    from streamsight.settings import StreamingSetting
+
+    source = InteractionStream.from_file("interactions.csv", "item", "user", "timestamp")
+    setting_streaming = StreamingSetting(
+        background_t=1530000000,
+        window_size=60 * 60 * 24,
+        n_seq_data=1,
+        top_K=k
+    )
+    setting_streaming.split(source)
+
 Splitters
 ------------
 
@@ -104,6 +135,7 @@ splitter and reuse the existing setting.
 
     TimestampSplitter
     NPastInteractionTimestampSplitter
+    SlidingWindowSplitter
 
 Processor
 ------------
@@ -118,6 +150,23 @@ the data created in the setting.
 
     Processor
     PredictionDataProcessor
+
+Split cache
+------------
+Splitting a large dataset can take a long time. The split of a setting can be
+stored on disk by passing a directory to :meth:`Setting.split`. The split is
+stored under a key of the contents of the data and the identifier of the
+setting, such that the next split of the same data with the same setting is
+loaded from disk.
+
+.. code-block:: python
+
+    setting_sliding.split(data, cache_dir="cache/splits")
+
+.. autosummary::
+    :toctree: generated/
+
+    SplitCache
     
 Exception
 ------------
@@ -130,15 +179,21 @@ end of window is reached. Note that this exception is declared the base file.
     EOWSetting
 """
 
-from streamsight.settings.base import Setting, EOWSetting
+from streamsight.settings.base import Setting, SettingCursor, SettingWindow, EOWSetting
 from streamsight.settings.single_time_point_setting import (
     SingleTimePointSetting,
 )
 from streamsight.settings.sliding_window_setting import SlidingWindowSetting
+from streamsight.settings.overlapping_window_setting import OverlappingWindowSetting
+from streamsight.settings.count_window_setting import CountWindowSetting
+from streamsight.settings.streaming_setting import StreamingSetting
 from streamsight.settings.leave_n_out_setting import LeaveNOutSetting
 from streamsight.settings.processor import Processor, PredictionDataProcessor
+from streamsight.settings.cache import SplitCache
 from streamsight.settings.splitters import (
     TimestampSplitter,
     NPastInteractionTimestampSplitter,
-    NLastInteractionSplitter
+    NLastInteractionSplitter,
+    SlidingWindowSplitter,
+    CountWindowSplitter
 )
@@ -1,12 +1,13 @@
 import logging
 import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Generator, List, Optional, Union
+from typing import Any, Dict, Generator, List, NamedTuple, Optional, Union
 from warnings import warn
 
 import numpy as np
 
 from streamsight.matrix import InteractionMatrix
+from streamsight.settings.cache import SplitCache
 from streamsight.settings.processor import PredictionDataProcessor
 
 logger = logging.getLogger(__name__)
@@ -17,6 +18,25 @@ class EOWSetting(Exception):
         self.message = message
         super().__init__(self.message)
 
+class SettingWindow(NamedTuple):
+    """Data of a single window of a setting.
+
+    :param unlabeled_data: Unlabeled data for the model to make predictions on.
+    :type unlabeled_data: InteractionMatrix
+    :param ground_truth_data: Ground truth data to evaluate the predictions on.
+    :type ground_truth_data: InteractionMatrix
+    :param incremental_data: Data released to the model after the window.
+        None if the setting is not a :class:`SlidingWindowSetting`.
+    :type incremental_data: Optional[InteractionMatrix]
+    :param t_window: Upper timestamp of the window in the split.
+    :type t_window: Optional[int]
+    """
+    unlabeled_data: InteractionMatrix
+    ground_truth_data: InteractionMatrix
+    incremental_data: Optional[InteractionMatrix]
+    t_window: Optional[int]
+
+
 class Setting(ABC):
     """Base class for defining an evaluation setting.
     
@@ -104,7 +124,7 @@ class Setting(ABC):
         :type data: InteractionMatrix
         """
 
-    def split(self, data: InteractionMatrix) -> None:
+    def split(self, data: InteractionMatrix, cache_dir: Optional[str] = None) -> None:
         """Splits :param:`data` according to the setting.
 
         Calling this method will change the state of the setting object to be ready
@@ -114,17 +134,35 @@ class Setting(ABC):
         This method will perform a basic check on the split to ensure that the
         split did not result in any empty or unusually small datasets.
         
+        If :param:`cache_dir` is provided, the split is stored in a
+        :class:`SplitCache` in that directory. Splitting the same data with a
+        setting of the same :attr:`identifier` again loads the stored split
+        instead of computing it.
+        
         .. note::
             :class:`SlidingWindowSetting` will have additional attribute
             :attr:`incremental_data`.
 
         :param data: Interaction matrix that should be split.
         :type data: InteractionMatrix
+        :param cache_dir: Directory of the split cache, defaults to None
+            to always compute the split.
+        :type cache_dir: str, optional
         """
         logger.debug("Splitting data...")
         self._num_full_interactions = data.num_interactions
         start = time.time()
-        self._split(data)
+        cache, key = None, None
+        if cache_dir is not None and getattr(self, "lazy", False):
+            logger.info("Split cache is not used by a lazy setting.")
+        elif cache_dir is not None:
+            cache = SplitCache(cache_dir)
+            key = cache.key(self, data)
+
+        if cache is None or not cache.load(self, key):
+            self._split(data)
+            if cache is not None:
+                cache.save(self, key)
         end = time.time()
         logger.info(f"{self.name} data split - Took {end - start:.3}s")
 
@@ -254,6 +292,60 @@ class Setting(ABC):
                 "Incremental data is only available for sliding window setting.")
         return self._incremental_data
 
+    def window(self, idx: int) -> SettingWindow:
+        """Data of the window at index :param:`idx`.
+
+        Gives random access to the windows without iterating over the
+        windows before it, as opposed to the `next_*` methods. Settings that
+        are not a :class:`SlidingWindowSetting` have a single window at
+        index 0.
+
+        :param idx: Index of the window, negative indices count from the last window.
+        :type idx: int
+        :raises IndexError: If there is no window at index :param:`idx`.
+        :return: Unlabeled data, ground truth data, incremental data and
+            upper timestamp of the window.
+        :rtype: SettingWindow
+        """
+        self._check_split_complete()
+
+        if idx < 0:
+            idx += self._num_split_set
+        if idx < 0 or not self._window_available(idx):
+            raise IndexError(f"Window index {idx} out of range for {self._num_split_set} windows")
+        if not self._sliding_window_setting:
+            return SettingWindow(self._unlabeled_data, self._ground_truth_data, None, self._t_window)
+        return SettingWindow(self._unlabeled_data[idx],
+                             self._ground_truth_data[idx],
+                             self._incremental_data[idx],
+                             self._t_window[idx])
+
+    def _window_available(self, idx: int) -> bool:
+        """Check if the window at index :param:`idx` exists.
+
+        Settings of which the windows become available over time, such as
+        :class:`StreamingSetting`, wait until the window is complete.
+
+        :param idx: Non-negative index of the window.
+        :type idx: int
+        :return: True if the window exists, False if the windows have ended before it.
+        :rtype: bool
+        """
+        return idx < self._num_split_set
+
+    def cursor(self, start: int = 0) -> "SettingCursor":
+        """Create an independent cursor over the windows of the split.
+
+        See :class:`SettingCursor`.
+
+        :param start: Iteration number the cursor starts at, defaults to 0
+        :type start: int, optional
+        :return: Cursor over the windows of the setting.
+        :rtype: SettingCursor
+        """
+        self._check_split_complete()
+        return SettingCursor(self, start)
+
     def _check_split(self):
         """Checks that the splits have been done properly.
 
@@ -311,6 +403,10 @@ class Setting(ABC):
             # check_empty("Ground truth data", n_ground_truth)
             check_ratio("Ground truth data", n_ground_truth, n_unlabel, 0.05)
 
+        elif getattr(self, "lazy", False):
+            # windows of a lazy setting are only built when they are accessed
+            logger.debug("Size of lazily built windows is not checked.")
+
         else:
             for dataset_idx in range(self._num_split_set):
                 n_unlabel = self._unlabeled_data[dataset_idx].num_interactions
@@ -320,21 +416,29 @@ class Setting(ABC):
                 check_empty(f"Ground truth data[{dataset_idx}]", n_ground_truth)
         logger.debug("Size of split sets are checked.")
 
-    def _create_generator(self, attribute: str) -> Any:
+    def _create_generator(self, attribute: str, start: int = 0) -> Any:
         """Creates generator for provided attribute name
 
         :param attribute: the attribute name to be used to create the generator
         :type attribute: str
+        :param start: Index of the first window to generate, defaults to 0
+        :type start: int, optional
         :yield: Data return from the attribute
         :rtype: Any
         """
         if not self._sliding_window_setting:
-            yield getattr(self, attribute)
+            if start == 0:
+                yield getattr(self, attribute)
         else:
-            for data in getattr(self, attribute):
-                yield data
-
-    def _unlabeled_data_generator(self):
+            # windows are indexed instead of iterated, such that the generator
+            # can start at any window without building the windows before it,
+            # and continues with windows appended by extending the split
+            idx = start
+            while self._window_available(idx):
+                yield getattr(self, attribute)[idx]
+                idx += 1
+
+    def _unlabeled_data_generator(self, start: int = 0):
         """Generates unlabeled data.
         
         Allow for iteration over the unlabeled data. If the setting is a
@@ -344,11 +448,14 @@ class Setting(ABC):
         .. note::
             A private method is specifically created to abstract the creation of
             the generator and to allow for easy resetting when needed.
+
+        :param start: Index of the first window to generate, defaults to 0
+        :type start: int, optional
         """
         self.unlabeled_data_iter: Generator[InteractionMatrix] = self._create_generator(
-            "_unlabeled_data")
+            "_unlabeled_data", start)
 
-    def _incremental_data_generator(self):
+    def _incremental_data_generator(self, start: int = 0):
         """Generates incremental data.
         
         Allow for iteration over the incremental data. If the setting is a
@@ -358,11 +465,14 @@ class Setting(ABC):
         .. note::
             A private method is specifically created to abstract the creation of
             the generator and to allow for easy resetting when needed.
+
+        :param start: Index of the first window to generate, defaults to 0
+        :type start: int, optional
         """
         self.incremental_data_iter: Generator[InteractionMatrix] = self._create_generator(
-            "_incremental_data")
+            "_incremental_data", start)
 
-    def _ground_truth_data_generator(self):
+    def _ground_truth_data_generator(self, start: int = 0):
         """Generates ground truth data.
         
         Allow for iteration over the ground truth data. If the setting is a
@@ -372,11 +482,14 @@ class Setting(ABC):
         .. note::
             A private method is specifically created to abstract the creation of
             the generator and to allow for easy resetting when needed.
+
+        :param start: Index of the first window to generate, defaults to 0
+        :type start: int, optional
         """
         self.ground_truth_data_iter: Generator[InteractionMatrix] = self._create_generator(
-            "_ground_truth_data")
+            "_ground_truth_data", start)
 
-    def _next_t_window_generator(self):
+    def _next_t_window_generator(self, start: int = 0):
         """Generates t_window data.
         
         Allow for iteration over the t_window data. If the setting is a
@@ -386,9 +499,12 @@ class Setting(ABC):
         .. note::
             A private method is specifically created to abstract the creation of
             the generator and to allow for easy resetting when needed.
+
+        :param start: Index of the first window to generate, defaults to 0
+        :type start: int, optional
         """
         self.t_window_iter: Generator[int] = self._create_generator(
-            "_t_window")
+            "_t_window", start)
 
     def next_unlabeled_data(self, reset=False) -> InteractionMatrix:
         """Get the next unlabeled data.
@@ -518,6 +634,9 @@ class Setting(ABC):
         number :param:`n`. If :param:`n` is not provided, then it will restore
         the data generators to the beginning of the data series.
 
+        The generators start directly at the window of iteration :param:`n`,
+        the windows before it are not generated.
+
         :param n: iteration number to restore generator to, defaults to int
         :type n: int, optional
         """
@@ -525,17 +644,145 @@ class Setting(ABC):
             n = 0
 
         logger.debug("Restoring data generators.")
-        self.reset_data_generators()
-        if n > 0:
-            # the incremental data is always 1 window behind the other windows
-            # as it is supposed to release historical data
-            self.unlabeled_data_iter.__next__()
-            self.ground_truth_data_iter.__next__()
-            self.t_window_iter.__next__()
-            for _ in range(n-1):
-                self.unlabeled_data_iter.__next__()
-                self.ground_truth_data_iter.__next__()
-                self.incremental_data_iter.__next__()
-                self.t_window_iter.__next__()
+        self._unlabeled_data_generator(n)
+        self._ground_truth_data_generator(n)
+        self._next_t_window_generator(n)
+        # the incremental data is always 1 window behind the other windows
+        # as it is supposed to release historical data
+        self._incremental_data_generator(max(n - 1, 0))
         logger.debug(f"Data generators are restored to iter={n}.")
 
+
+class SettingCursor:
+    """Independent position in the windows of a split setting.
+
+    The `next_*` methods of a :class:`Setting` iterate over the windows with
+    generators stored on the setting itself, such that only a single
+    iteration over a setting can be in progress. A cursor provides the same
+    methods with its own position, while sharing the split data of the
+    setting. Several evaluators can therefore iterate over the same setting,
+    sequentially or from different threads.
+
+    The matrices returned by a cursor are copies of the matrices of the
+    setting, see :meth:`InteractionMatrix.copy`. They share the interactions
+    with the setting without copying them, while modifications such as
+    :meth:`InteractionMatrix.mask_shape` are not visible to other cursors.
+
+    :param setting: Setting that has been split.
+    :type setting: Setting
+    :param start: Iteration number the cursor starts at, defaults to 0
+    :type start: int, optional
+    """
+
+    def __init__(self, setting: Setting, start: int = 0):
+        self.setting = setting
+        self._positions: Dict[str, int]
+        """Index of the next window of every attribute of the setting."""
+        self.restore_generators(start)
+
+    @property
+    def background_data(self) -> InteractionMatrix:
+        """Copy of the background data of the setting.
+
+        :return: Interaction Matrix of training interactions.
+        :rtype: InteractionMatrix
+        """
+        return self.setting.background_data.copy()
+
+    def window(self, idx: int) -> SettingWindow:
+        """Copy of the data of the window at index :param:`idx`.
+
+        See :meth:`Setting.window`.
+
+        :param idx: Index of the window.
+        :type idx: int
+        :return: Unlabeled data, ground truth data, incremental data and
+            upper timestamp of the window.
+        :rtype: SettingWindow
+        """
+        window = self.setting.window(idx)
+        return window._replace(
+            unlabeled_data=window.unlabeled_data.copy(),
+            ground_truth_data=window.ground_truth_data.copy(),
+            incremental_data=None if window.incremental_data is None else window.incremental_data.copy(),
+        )
+
+    def _next(self, attribute: str) -> Any:
+        """Get the next window of an attribute of the setting.
+
+        :param attribute: Name of the attribute of the setting.
+        :type attribute: str
+        :raises EOWSetting: If there is no more data to iterate over.
+        :return: Copy of the data of the next window.
+        :rtype: Any
+        """
+        idx = self._positions[attribute]
+        if not self.setting._window_available(idx):
+            raise EOWSetting()
+        data = getattr(self.setting, attribute)
+        if self.setting.is_sliding_window_setting:
+            data = data[idx]
+        self._positions[attribute] = idx + 1
+        return data.copy() if isinstance(data, InteractionMatrix) else data
+
+    def next_unlabeled_data(self) -> InteractionMatrix:
+        """Get the next unlabeled data.
+
+        :raises EOWSetting: If there is no more unlabeled data to iterate over.
+        :return: The next unlabeled data for the corresponding split.
+        :rtype: InteractionMatrix
+        """
+        return self._next("_unlabeled_data")
+
+    def next_ground_truth_data(self) -> InteractionMatrix:
+        """Get the next ground truth data.
+
+        :raises EOWSetting: If there is no more ground truth data to iterate over.
+        :return: The next ground truth data for the corresponding split.
+        :rtype: InteractionMatrix
+        """
+        return self._next("_ground_truth_data")
+
+    def next_incremental_data(self) -> InteractionMatrix:
+        """Get the next incremental data.
+
+        :raises AttributeError: If the setting is not a sliding window setting.
+        :raises EOWSetting: If there is no more incremental data to iterate over.
+        :return: The next incremental data for the corresponding split.
+        :rtype: InteractionMatrix
+        """
+        if not self.setting.is_sliding_window_setting:
+            raise AttributeError(
+                "Incremental data is only available for sliding window setting.")
+        return self._next("_incremental_data")
+
+    def next_t_window(self) -> int:
+        """Get the next data timestamp limit.
+
+        :raises EOWSetting: If there is no more data timestamp limit to iterate over.
+        :return: The next t_window for the corresponding split.
+        :rtype: int
+        """
+        return self._next("_t_window")
+
+    def reset_data_generators(self) -> None:
+        """Move the cursor to the beginning of the data series."""
+        self.restore_generators(0)
+
+    def restore_generators(self, n: Optional[int] = None) -> None:
+        """Move the cursor to iteration number :param:`n`.
+
+        Same as :meth:`Setting.restore_generators`, the incremental data is
+        one window behind the other data.
+
+        :param n: iteration number to move the cursor to, defaults to 0
+        :type n: int, optional
+        """
+        if n is None:
+            n = 0
+        self._positions = {
+            "_unlabeled_data": n,
+            "_ground_truth_data": n,
+            "_t_window": n,
+            "_incremental_data": max(n - 1, 0),
+        }
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+from tempfile import mkdtemp
+from typing import TYPE_CHECKING, List, Optional, Union
+
+import numpy as np
+
+from streamsight.matrix import InteractionMatrix
+
+if TYPE_CHECKING:
+    from streamsight.settings.base import Setting
+
+logger = logging.getLogger(__name__)
+
+_SPLIT_ATTRIBUTES = ("_background_data", "_unlabeled_data", "_ground_truth_data", "_incremental_data")
+"""Attributes of a setting holding the split data."""
+
+
+def _save_matrices(directory: str, matrices: List[InteractionMatrix]) -> dict:
+    """Write matrices as concatenated columns into a directory.
+
+    Each column of all matrices is written to one `.npy` file, together with
+    the offsets of the interactions of every matrix in the columns.
+
+    :param directory: Directory to write the columns to.
+    :type directory: str
+    :param matrices: Matrices to write.
+    :type matrices: List[InteractionMatrix]
+    :return: Metadata of the matrices needed by :func:`_load_matrices`.
+    :rtype: dict
+    """
+    os.makedirs(directory)
+    columns = [matrix._column_data() for matrix in matrices]
+    names = list(columns[0]) if columns else []
+    for name in names:
+        np.save(os.path.join(directory, f"{name}.npy"), np.concatenate([column[name] for column in columns]))
+    offsets = np.cumsum([0] + [len(matrix) for matrix in matrices])
+    np.save(os.path.join(directory, "offsets.npy"), offsets)
+    return {
+        "columns": names,
+        "shapes": [list(matrix.shape) if hasattr(matrix, "shape") else None for matrix in matrices],
+    }
+
+
+def _load_matrices(directory: str, meta: dict) -> List[InteractionMatrix]:
+    """Load matrices written by :func:`_save_matrices`.
+
+    The columns are memory-mapped and every matrix is a view on its rows.
+
+    :param directory: Directory with the columns.
+    :type directory: str
+    :param meta: Metadata returned by :func:`_save_matrices`.
+    :type meta: dict
+    :return: Loaded matrices.
+    :rtype: List[InteractionMatrix]
+    """
+    columns = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r") for name in meta["columns"]}
+    offsets = np.load(os.path.join(directory, "offsets.npy")).tolist()
+    return [
+        InteractionMatrix._from_columns(columns, slice(start, stop), tuple(shape) if shape else None)
+        for start, stop, shape in zip(offsets[:-1], offsets[1:], meta["shapes"])
+    ]
+
+
+class SplitCache:
+    """On-disk cache of the data split by a setting.
+
+    The data split by a setting is stored under a key derived from the
+    content fingerprint of the input :class:`InteractionMatrix`, see
+    :meth:`InteractionMatrix.fingerprint`, and :attr:`Setting.identifier`.
+    Splitting the same data with a setting with the same parameters loads the
+    split from disk instead of computing it again.
+
+    Every split is a directory with the columns of the background, unlabeled,
+    ground truth and incremental data in `.npy` files and the window
+    timestamps in a JSON file. The columns are memory-mapped on loading, such
+    that a cache hit only reads the interactions that are accessed.
+
+    Example
+    ~~~~~~~~~
+
+    .. code-block:: python
+
+        setting = SlidingWindowSetting(background_t=1530000000, window_size=60 * 60 * 24 * 30)
+        setting.split(data, cache_dir="cache/splits")
+
+    :param directory: Directory in which the splits are stored.
+    :type directory: str
+    """
+
+    VERSION = 1
+    """Version of the layout of a cached split. Splits of other versions are not loaded."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def key(self, setting: "Setting", data: InteractionMatrix) -> str:
+        """Key of the split of `data` by `setting`.
+
+        :param setting: Setting that splits the data.
+        :type setting: Setting
+        :param data: Interaction matrix that is split.
+        :type data: InteractionMatrix
+        :return: Key of the split.
+        :rtype: str
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{self.VERSION}:{setting.identifier}:{data.fingerprint()}".encode())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def load(self, setting: "Setting", key: str) -> bool:
+        """Load a cached split into `setting`.
+
+        :param setting: Setting to load the split into.
+        :type setting: Setting
+        :param key: Key of the split, see :meth:`key`.
+        :type key: str
+        :return: True if the split was cached and loaded, False otherwise.
+        :rtype: bool
+        """
+        meta_path = os.path.join(self._path(key), "meta.json")
+        if not os.path.exists(meta_path):
+            logger.debug(f"Split {key} is not cached in {self.directory}")
+            return False
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get("version") != self.VERSION:
+            logger.info(f"Ignoring cached split {key} of version {meta.get('version')}")
+            return False
+
+        for attribute, matrices_meta in meta["data"].items():
+            matrices = _load_matrices(os.path.join(self._path(key), attribute.lstrip("_")), matrices_meta)
+            setattr(setting, attribute, matrices if matrices_meta["is_list"] else matrices[0])
+        setting._t_window = meta["t_window"]
+        setting._num_split_set = meta["num_split"]
+        logger.info(f"Loaded split {key} from {self.directory}")
+        return True
+
+    def save(self, setting: "Setting", key: str) -> None:
+        """Store the split of `setting`.
+
+        The split is written to a temporary directory that is renamed once it
+        is complete, such that an interrupted write is never loaded.
+
+        :param setting: Setting that has split the data.
+        :type setting: Setting
+        :param key: Key of the split, see :meth:`key`.
+        :type key: str
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_dir = mkdtemp(prefix=f".{key}-", dir=self.directory)
+        try:
+            meta = {
+                "version": self.VERSION,
+                "identifier": setting.identifier,
+                "t_window": setting._t_window,
+                "num_split": setting._num_split_set,
+                "data": {},
+            }
+            for attribute in _SPLIT_ATTRIBUTES:
+                data: Optional[Union[InteractionMatrix, List[InteractionMatrix]]] = getattr(setting, attribute, None)
+                if data is None:
+                    continue
+                is_list = not isinstance(data, InteractionMatrix)
+                matrices = list(data) if is_list else [data]
+                meta["data"][attribute] = _save_matrices(os.path.join(tmp_dir, attribute.lstrip("_")), matrices)
+                meta["data"][attribute]["is_list"] = is_list
+            with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+                json.dump(meta, f, default=int)
+            os.replace(tmp_dir, self._path(key))
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if os.path.exists(os.path.join(self._path(key), "meta.json")):
+                # the same split was stored concurrently by another process
+                logger.debug(f"Split {key} is already stored in {self.directory}")
+                return
+            raise
+        logger.info(f"Stored split {key} in {self.directory}")
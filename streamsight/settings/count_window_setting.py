@@ -0,0 +1,86 @@
+import logging
+from typing import Optional
+
+import numpy as np
+
+from streamsight.settings.sliding_window_setting import SlidingWindowSetting
+from streamsight.settings.splitters import CountWindowSplitter
+
+logger = logging.getLogger(__name__)
+
+
+class CountWindowSetting(SlidingWindowSetting):
+    """Sliding window setting of which the windows contain a fixed number of interactions.
+
+    The windows of a :class:`SlidingWindowSetting` span a fixed time, such
+    that their size follows the traffic of the data and the largest window
+    dominates the time and memory of the evaluation. The windows of this
+    setting instead contain :attr:`window_interactions` interactions each,
+    with boundaries at the quantiles of the sorted timestamps after
+    :attr:`background_t`, see :class:`CountWindowSplitter`. The ground truth
+    and incremental data of a window span the time up to the start of the
+    next window.
+
+    As the windows are of equal size, the chunks of windows built by the
+    processes of :attr:`n_jobs` are balanced as well.
+
+    :param background_t: Time point to split the data into background and evaluation data. Split will be from `[0, t)`
+    :type background_t: int
+    :param window_interactions: Number of interactions per window.
+    :type window_interactions: int
+    :param n_seq_data: Number of last sequential interactions to provide as
+         data for model to make prediction.
+    :type n_seq_data: int, optional
+    :param top_K: Number of interaction per user that should be selected for evaluation purposes.
+    :type top_K: int, optional
+    :param t_upper: Upper bound on the timestamp of interactions.
+        Defaults to maximal integer value (acting as infinity).
+    :type t_upper: int, optional
+    :param seed: Seed for random number generator.
+    :type seed: int, optional
+    :param lazy: Build the data of a window only when it is accessed, see
+        :class:`SlidingWindowSetting`. Defaults to False.
+    :type lazy: bool, optional
+    :param prefetch: Number of windows to build ahead of the accessed window
+        in lazy mode. Defaults to 0.
+    :type prefetch: int, optional
+    :param n_jobs: Number of processes that build the windows. Defaults to 1.
+    :type n_jobs: int, optional
+    """
+
+    def __init__(
+        self,
+        background_t: int,
+        window_interactions: int,
+        n_seq_data: int = 10,
+        top_K: int = 10,
+        t_upper: int = np.iinfo(np.int32).max,
+        seed: Optional[int] = None,
+        lazy: bool = False,
+        prefetch: int = 0,
+        n_jobs: int = 1,
+    ):
+        super().__init__(
+            background_t,
+            n_seq_data=n_seq_data,
+            top_K=top_K,
+            t_upper=t_upper,
+            seed=seed,
+            lazy=lazy,
+            prefetch=prefetch,
+            n_jobs=n_jobs,
+        )
+        self.window_interactions = window_interactions
+        """Number of interactions per window."""
+        self._window_splitter = CountWindowSplitter(background_t, window_interactions, n_seq_data)
+
+    @property
+    def params(self):
+        """Parameters of the setting."""
+        return {
+            "background_t": self.t,
+            "window_interactions": self.window_interactions,
+            "n_seq_data": self.n_seq_data,
+            "top_K": self.top_K,
+            "t_upper": self.t_upper,
+        }
@@ -0,0 +1,99 @@
+import logging
+from typing import Optional
+
+import numpy as np
+
+from streamsight.settings.sliding_window_setting import SlidingWindowSetting
+
+logger = logging.getLogger(__name__)
+
+
+class OverlappingWindowSetting(SlidingWindowSetting):
+    """Sliding window setting of which the windows overlap.
+
+    A window of :attr:`window_size` seconds starts every :attr:`stride`
+    seconds, e.g. a window of 7 days that moves by a day. The ground truth
+    data of a window spans the whole window, while the incremental data
+    released to the model after a window spans the stride up to the start of
+    the next window, such that every interaction is released once.
+
+    Overlapping windows do not multiply the cost or memory of the split. The
+    boundaries of all windows are resolved at once on the timestamp-sorted
+    index of the data, and the ground truth and incremental data of every
+    window are views on the data. The unlabeled data of all windows store
+    every past and masked interaction once, see
+    :meth:`PredictionDataProcessor.process_windows`.
+
+    Equivalent to a :class:`SlidingWindowSetting` with `window_size=stride`
+    and `t_ground_truth_window=window_size`.
+
+    :param background_t: Time point to split the data into background and evaluation data. Split will be from `[0, t)`
+    :type background_t: int
+    :param window_size: Length of every window in seconds.
+    :type window_size: int
+    :param stride: Seconds between the start of consecutive windows. At most
+        :param:`window_size`.
+    :type stride: int
+    :param n_seq_data: Number of last sequential interactions to provide as
+         data for model to make prediction.
+    :type n_seq_data: int, optional
+    :param top_K: Number of interaction per user that should be selected for evaluation purposes.
+    :type top_K: int, optional
+    :param t_upper: Upper bound on the timestamp of interactions.
+        Defaults to maximal integer value (acting as infinity).
+    :type t_upper: int, optional
+    :param seed: Seed for random number generator.
+    :type seed: int, optional
+    :param lazy: Build the data of a window only when it is accessed, see
+        :class:`SlidingWindowSetting`. Defaults to False.
+    :type lazy: bool, optional
+    :param prefetch: Number of windows to build ahead of the accessed window
+        in lazy mode. Defaults to 0.
+    :type prefetch: int, optional
+    :param n_jobs: Number of processes that build the windows. Defaults to 1.
+    :type n_jobs: int, optional
+    """
+
+    def __init__(
+        self,
+        background_t: int,
+        window_size: int,
+        stride: int,
+        n_seq_data: int = 10,
+        top_K: int = 10,
+        t_upper: int = np.iinfo(np.int32).max,
+        seed: Optional[int] = None,
+        lazy: bool = False,
+        prefetch: int = 0,
+        n_jobs: int = 1,
+    ):
+        if not 0 < stride <= window_size:
+            raise ValueError("stride must be positive and at most window_size")
+        super().__init__(
+            background_t,
+            window_size=stride,
+            n_seq_data=n_seq_data,
+            top_K=top_K,
+            t_upper=t_upper,
+            t_ground_truth_window=window_size,
+            seed=seed,
+            lazy=lazy,
+            prefetch=prefetch,
+            n_jobs=n_jobs,
+        )
+        self.window_size = window_size
+        """Length of every window in seconds."""
+        self.stride = stride
+        """Seconds between the start of consecutive windows."""
+
+    @property
+    def params(self):
+        """Parameters of the setting."""
+        return {
+            "background_t": self.t,
+            "window_size": self.window_size,
+            "stride": self.stride,
+            "n_seq_data": self.n_seq_data,
+            "top_K": self.top_K,
+            "t_upper": self.t_upper,
+        }
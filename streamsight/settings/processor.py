@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Tuple
+from typing import List, Tuple
 
+import numpy as np
 from deprecation import deprecated
 
 from streamsight.matrix import InteractionMatrix
@@ -42,6 +43,33 @@ class Processor(ABC):
         """
         pass
 
+    def process_windows(
+        self,
+        past_interactions: List[InteractionMatrix],
+        future_interactions: List[InteractionMatrix],
+        top_K: int = 1,
+    ) -> Tuple[List[InteractionMatrix], List[InteractionMatrix]]:
+        """Process the past and future interactions of several windows.
+
+        Calls :meth:`process` for every window. Subclasses can override this
+        method to share data between the windows.
+
+        :param past_interactions: Matrices of past interactions per window.
+        :type past_interactions: List[InteractionMatrix]
+        :param future_interactions: Matrices of future interactions per window.
+        :type future_interactions: List[InteractionMatrix]
+        :param top_K: Number of interactions per user to select for evaluation.
+        :type top_K: int, optional
+        :return: Tuple of the unlabeled data and the ground truth data per window.
+        :rtype: Tuple[List[InteractionMatrix], List[InteractionMatrix]]
+        """
+        unlabeled_data, ground_truth_data = [], []
+        for past_interaction, future_interaction in zip(past_interactions, future_interactions):
+            unlabeled_set, ground_truth = self.process(past_interaction, future_interaction, top_K)
+            unlabeled_data.append(unlabeled_set)
+            ground_truth_data.append(ground_truth)
+        return unlabeled_data, ground_truth_data
+
 
 class PredictionDataProcessor(Processor):
     """Injects the user ID to indicate ID for prediction.
@@ -130,3 +158,77 @@ class PredictionDataProcessor(Processor):
         return self._inject_user_id(past_interaction,
                                     future_interaction,
                                     top_K)
+
+    def process_windows(
+        self,
+        past_interactions: List[InteractionMatrix],
+        future_interactions: List[InteractionMatrix],
+        top_K: int = 1,
+    ) -> Tuple[List[InteractionMatrix], List[InteractionMatrix]]:
+        """Process the past and future interactions of several windows.
+
+        The result is equal to calling :meth:`process` for every window, but
+        the unlabeled data of the windows is stored once. The ground truth of
+        a window is a view on its future interactions. The unlabeled data of
+        all windows are views on one shared set of columns, holding the
+        interactions of any of the past interactions followed by the masked
+        interactions of any of the ground truths. An interaction that occurs
+        in the past interactions or in the ground truth of several windows,
+        as in overlapping windows, is therefore stored only once.
+
+        If the past and future interactions are not views on the same data,
+        the windows are processed one by one.
+
+        :param past_interactions: Matrices of past interactions per window.
+        :type past_interactions: List[InteractionMatrix]
+        :param future_interactions: Matrices of future interactions per window.
+        :type future_interactions: List[InteractionMatrix]
+        :param top_K: Number of interactions per user to select for evaluation.
+        :type top_K: int, optional
+        :return: Tuple of the unlabeled data and the ground truth data per window.
+        :rtype: Tuple[List[InteractionMatrix], List[InteractionMatrix]]
+        """
+        if not past_interactions or any(matrix._data is not past_interactions[0]._data
+                                        for matrix in past_interactions + future_interactions):
+            return super().process_windows(past_interactions, future_interactions, top_K)
+
+        ground_truth_data = [future.get_users_n_first_interaction(top_K) for future in future_interactions]
+
+        # rows of the shared data that are in the past interactions or the
+        # ground truth of any window, and the position of every such row in
+        # the unlabeled columns
+        base = past_interactions[0]
+        n_base = len(base._data[InteractionMatrix.USER_IX])
+        past_rows = [past._positions() for past in past_interactions]
+        masked_rows = [ground_truth._positions() for ground_truth in ground_truth_data]
+        past_used = np.zeros(n_base, dtype=bool)
+        for rows in past_rows:
+            past_used[rows] = True
+        masked_used = np.zeros(n_base, dtype=bool)
+        for rows in masked_rows:
+            masked_used[rows] = True
+        shared_rows = np.flatnonzero(past_used)
+        shared_masked_rows = np.flatnonzero(masked_used)
+        n_rows = len(shared_rows) + len(shared_masked_rows)
+        row_dtype = np.int32 if n_rows <= np.iinfo(np.int32).max else np.int64
+        past_position = np.cumsum(past_used, dtype=row_dtype) - 1
+        masked_position = np.cumsum(masked_used, dtype=row_dtype) - 1 + len(shared_rows)
+
+        columns = {}
+        for name in base._columns:
+            if name == InteractionMatrix.INTERACTION_IX and name not in base._data:
+                past_values, masked_values = shared_rows, shared_masked_rows
+            else:
+                past_values, masked_values = base._data[name][shared_rows], base._data[name][shared_masked_rows]
+            if name == InteractionMatrix.ITEM_IX:
+                masked_values = np.full(len(shared_masked_rows), InteractionMatrix.MASKED_LABEL,
+                                        dtype=past_values.dtype)
+            columns[name] = np.concatenate([past_values, masked_values])
+
+        unlabeled_data = []
+        for past_interaction, past, masked in zip(past_interactions, past_rows, masked_rows):
+            rows = np.concatenate([past_position[past], masked_position[masked]])
+            unlabeled_data.append(
+                InteractionMatrix._from_columns(columns, rows, getattr(past_interaction, "shape", None))
+            )
+        return unlabeled_data, ground_truth_data
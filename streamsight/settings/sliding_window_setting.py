@@ -1,17 +1,187 @@
 import logging
-from typing import Optional
+import os
+from collections import OrderedDict
+from collections.abc import Sequence
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from copy import copy
+from tempfile import TemporaryDirectory
+from threading import Lock
+from typing import Dict, List, Optional, Tuple, Union
+from weakref import WeakSet
 from warnings import warn
 
 import numpy as np
 from tqdm import tqdm
-from streamsight.matrix import (InteractionMatrix,
+from streamsight.matrix import (AppendOnlyInteractionMatrix,
+                                InteractionMatrix,
                                 TimestampAttributeMissingError)
-from streamsight.settings import Setting
-from streamsight.settings.splitters import (NPastInteractionTimestampSplitter,
+from streamsight.settings import Setting, SettingCursor
+from streamsight.settings.processor import PredictionDataProcessor
+from streamsight.settings.splitters import (SlidingWindowSplitter,
                                            TimestampSplitter)
 
 logger = logging.getLogger(__name__)
 
+Window = Tuple[InteractionMatrix, InteractionMatrix, InteractionMatrix]
+"""Unlabeled data, ground truth data and incremental data of a window."""
+
+
+def _build_windows(data: InteractionMatrix,
+                   window_splitter: SlidingWindowSplitter,
+                   processor: PredictionDataProcessor,
+                   top_K: int,
+                   t_windows: List[int]) -> List[Window]:
+    """Build the windows starting at the timestamps `t_windows`.
+
+    The windows are views on `data`, and the unlabeled data of the windows
+    are views on columns shared between them, see
+    :meth:`PredictionDataProcessor.process_windows`.
+
+    :param data: Interactions to split.
+    :type data: InteractionMatrix
+    :param window_splitter: Splitter of the past and future interactions of the windows.
+    :type window_splitter: SlidingWindowSplitter
+    :param processor: Processor that creates the unlabeled and ground truth data.
+    :type processor: PredictionDataProcessor
+    :param top_K: Number of interactions per user to select for evaluation.
+    :type top_K: int
+    :param t_windows: Timestamps at which the windows start.
+    :type t_windows: List[int]
+    :return: Unlabeled data, ground truth data and incremental data per window.
+    :rtype: List[Window]
+    """
+    past_interactions, future_interactions = window_splitter.split_windows(data, t_windows)
+    for sub_time, past_interaction, future_interaction in zip(t_windows, past_interactions, future_interactions):
+        # if past_interaction, future_interaction is empty, log an info message
+        if len(past_interaction) == 0:
+            logger.info(f"Split at time {sub_time} resulted in empty unlabelled testing samples.")
+        if len(future_interaction) == 0:
+            logger.info(f"Split at time {sub_time} resulted in empty incremental data.")
+
+    unlabeled_data, ground_truth_data = processor.process_windows(past_interactions, future_interactions, top_K)
+    # the incremental data spans the step to the next window, such that every
+    # interaction is released once even if the ground truth windows overlap
+    incremental_data = data.time_windows(t_windows, window_splitter.step_ends(data, t_windows))
+    return list(zip(unlabeled_data, ground_truth_data, incremental_data))
+
+
+PackedMatrix = Tuple[int, Optional[Union[slice, np.ndarray]], Optional[Tuple[int, int]]]
+"""Index of the columns, row positions and shape of a matrix sent from a worker process.
+Index -1 refers to the columns of the data that is split."""
+
+
+def _pack_windows(data: InteractionMatrix,
+                  windows: List[Window]) -> Tuple[List[Dict[str, np.ndarray]], List[List[PackedMatrix]]]:
+    """Pack windows to send them from a worker process.
+
+    Pickling the matrices of the windows would copy the interactions of
+    every view. Instead, every set of columns shared by the views is sent
+    once, except for the columns of `data` which the parent process holds.
+
+    :param data: Interactions that are split by the worker.
+    :type data: InteractionMatrix
+    :param windows: Windows built by the worker.
+    :type windows: List[Window]
+    :return: Shared columns and the packed matrices of every window.
+    :rtype: Tuple[List[Dict[str, np.ndarray]], List[List[PackedMatrix]]]
+    """
+    columns: List[Dict[str, np.ndarray]] = []
+    packed = []
+    for window in windows:
+        packed_window = []
+        for matrix in window:
+            if matrix._data is data._data:
+                idx = -1
+            else:
+                idx = next((i for i, shared in enumerate(columns) if shared is matrix._data), len(columns))
+                if idx == len(columns):
+                    columns.append(matrix._data)
+            packed_window.append((idx, matrix._rows, getattr(matrix, "shape", None)))
+        packed.append(packed_window)
+    return columns, packed
+
+
+def _unpack_windows(data: InteractionMatrix,
+                    columns: List[Dict[str, np.ndarray]],
+                    packed: List[List[PackedMatrix]]) -> List[Window]:
+    """Restore windows packed by :func:`_pack_windows` in the parent process.
+
+    :param data: Interactions that are split.
+    :type data: InteractionMatrix
+    :param columns: Shared columns of the windows.
+    :type columns: List[Dict[str, np.ndarray]]
+    :param packed: Packed matrices of every window.
+    :type packed: List[List[PackedMatrix]]
+    :return: Unlabeled data, ground truth data and incremental data per window.
+    :rtype: List[Window]
+    """
+    # the workers split the compacted rows of the data
+    positions = data._positions()
+    windows = []
+    for packed_window in packed:
+        window = []
+        for idx, rows, shape in packed_window:
+            if idx == -1:
+                window.append(InteractionMatrix._from_columns(data._data,
+                                                              positions if rows is None else positions[rows], shape))
+            else:
+                window.append(InteractionMatrix._from_columns(columns[idx], rows, shape))
+        windows.append(tuple(window))
+    return windows
+
+
+_worker_args: tuple
+"""Arguments of :func:`_build_windows` shared by the windows built in a worker process."""
+
+
+def _init_window_worker(columns: Dict[str, str], shape: Optional[Tuple[int, int]], *args) -> None:
+    """Initialize a worker process of the parallel split.
+
+    The columns of the data are memory-mapped from the files written by
+    the parent process, such that the pages are shared between the workers
+    instead of pickling the data to each of them.
+
+    :param columns: Path of the `.npy` file of every column of the data.
+    :type columns: Dict[str, str]
+    :param shape: Shape of the data.
+    :type shape: Optional[Tuple[int, int]]
+    :param args: Window splitter, processor and top K passed to :func:`_build_windows`.
+    """
+    global _worker_args
+    data = InteractionMatrix._from_columns({name: np.load(path, mmap_mode="r") for name, path in columns.items()},
+                                           shape=shape)
+    _worker_args = (data, *args)
+
+
+def _build_windows_in_worker(t_windows: List[int]) -> Tuple[List[Dict[str, np.ndarray]], List[List[PackedMatrix]]]:
+    return _pack_windows(_worker_args[0], _build_windows(*_worker_args, t_windows))
+
+
+class _LazyWindows(Sequence):
+    """Read-only list of one part of the windows of a lazy or streaming setting.
+
+    Windows are only built when an element is accessed, see
+    :meth:`SlidingWindowSetting._window`.
+
+    :param setting: Setting that builds the windows.
+    :type setting: Union[SlidingWindowSetting, StreamingSetting]
+    :param part: Index of the part in the tuple
+        `(unlabeled data, ground truth data, incremental data)` of a window.
+    :type part: int
+    """
+
+    def __init__(self, setting: Setting, part: int):
+        self._setting = setting
+        self._part = part
+
+    def __len__(self) -> int:
+        return self._setting.num_split
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        return self._setting._window(idx)[self._part]
+
 
 class SlidingWindowSetting(Setting):
     """Sliding window setting for splitting data.
@@ -51,6 +221,19 @@ class SlidingWindowSetting(Setting):
     :type t_ground_truth_window: int, optional
     :param seed: Seed for random number generator.
     :type seed: int, optional
+    :param lazy: If True, :meth:`split` only records the window timestamps and
+        the data of a window is built when it is first accessed, such that
+        memory is bounded to the windows in use instead of growing with the
+        number of windows. The setting and every live cursor keep up to
+        `prefetch + 2` windows in memory. Defaults to False.
+    :type lazy: bool, optional
+    :param prefetch: Number of windows after the accessed window that are built
+        in a background thread in lazy mode. Defaults to 0.
+    :type prefetch: int, optional
+    :param n_jobs: Number of processes that build the windows in :meth:`split`.
+        -1 uses all CPUs. The windows are identical to a serial split.
+        Not used in lazy mode. Defaults to 1.
+    :type n_jobs: int, optional
     """
 
     def __init__(
@@ -61,7 +244,10 @@ class SlidingWindowSetting(Setting):
         top_K: int = 10,
         t_upper: int = np.iinfo(np.int32).max,
         t_ground_truth_window: Optional[int] = None,
-        seed: Optional[int] = None
+        seed: Optional[int] = None,
+        lazy: bool = False,
+        prefetch: int = 0,
+        n_jobs: int = 1,
     ):
         super().__init__(seed=seed)
         self._sliding_window_setting = True
@@ -80,10 +266,27 @@ class SlidingWindowSetting(Setting):
             t_ground_truth_window = window_size
 
         self.t_ground_truth_window = t_ground_truth_window
+        self.lazy = lazy
+        """Build the data of a window only when it is accessed."""
+        self.prefetch = prefetch
+        """Number of windows to build ahead of the accessed window in lazy mode."""
+
+        self.n_jobs = (os.cpu_count() or 1) if n_jobs == -1 else n_jobs
+        """Number of processes that build the windows."""
+
+        if prefetch < 0:
+            raise ValueError("prefetch must be a non-negative integer")
+        if self.n_jobs < 1:
+            raise ValueError("n_jobs must be a positive integer or -1")
+
+        self._window_lock = Lock()
+        """Lock of the window cache of a lazy setting, which cursors may access from several threads."""
+        self._cursors: WeakSet[SettingCursor] = WeakSet()
+        """Live cursors of the setting, the window cache of a lazy setting grows with their number."""
 
         self._background_splitter = TimestampSplitter(background_t, None, None)
-        self._window_splitter = NPastInteractionTimestampSplitter(
-            background_t, t_ground_truth_window, n_seq_data
+        self._window_splitter = SlidingWindowSplitter(
+            background_t, window_size, t_ground_truth_window, n_seq_data
         )
 
     def _split(self, data: InteractionMatrix):
@@ -102,46 +305,299 @@ class SlidingWindowSetting(Setting):
             data = data.timestamps_lt(self.t_upper)
 
         self._background_data, _ = self._background_splitter.split(data)
-        self._ground_truth_data, self._unlabeled_data, self._t_window, self._incremental_data = [], [], [], []
-
-        # sub_time is the subjugate time point that the splitter will slide over the data
-        sub_time = self.t
-        max_timestamp = data.max_timestamp
-
-        pbar = tqdm(total=int((max_timestamp - sub_time) / self.window_size))
-        while sub_time <= max_timestamp:
-            self._t_window.append(sub_time)
-            # the set used for eval will always have a timestamp greater than
-            # data released such that it is unknown to the model
-            self._window_splitter.update_split_point(sub_time)
-            past_interaction, future_interaction = self._window_splitter.split(
-                data
-            )
 
-            # if past_interaction, future_interaction is empty, log an info message
-            if len(past_interaction) == 0:
-                logger.info(f"Split at time {sub_time} resulted in empty unlabelled testing samples.")
-            if len(future_interaction) == 0:
-                logger.info(f"Split at time {sub_time} resulted in empty incremental data.")
+        # the windows are split in a single sweep over the data, the split
+        # points are the timestamps that the splitter slides over the data
+        self._t_window = self._window_splitter.window_timestamps(data)
+        self._num_split_set = len(self._t_window)
+        self._split_data = data
 
-            unlabeled_set, ground_truth = self.prediction_data_processor.process(past_interaction,
-                                                                                 future_interaction,
-                                                                                 self.top_K)
-            self._unlabeled_data.append(unlabeled_set)
-            self._ground_truth_data.append(ground_truth)
+        if self.lazy:
+            self._shutdown_prefetch()
+            self._window_cache: OrderedDict[int, Future] = OrderedDict()
+            self._unlabeled_data = _LazyWindows(self, 0)
+            self._ground_truth_data = _LazyWindows(self, 1)
+            self._incremental_data = _LazyWindows(self, 2)
+            logger.info(
+                f"Finished lazy split with window size {self.window_size} seconds. "
+                f"Number of splits: {self._num_split_set} in total."
+            )
+            return
 
-            self._incremental_data.append(future_interaction)
+        if self.n_jobs > 1 and self._num_split_set > 1:
+            windows = self._build_windows_parallel(data)
+        else:
+            windows = self._build_windows(data, self._t_window)
 
-            sub_time += self.window_size
-            pbar.update(1)
-        pbar.close()
+        self._unlabeled_data = [unlabeled_set for unlabeled_set, _, _ in windows]
+        self._ground_truth_data = [ground_truth for _, ground_truth, _ in windows]
+        self._incremental_data = [future_interaction for _, _, future_interaction in windows]
 
-        self._num_split_set = len(self._unlabeled_data)
         logger.info(
             f"Finished split with window size {self.window_size} seconds. "
             f"Number of splits: {self._num_split_set} in total."
         )
 
+    def extend(self, new_data: InteractionMatrix) -> int:
+        """Extend the split with interactions that arrived after the split.
+
+        The interactions of `new_data` are appended to the data that was
+        split, and the windows are updated such that the setting is identical
+        to a setting that split all data at once. Only the windows that
+        contain new interactions are built: the windows that ended before the
+        first new interaction are kept, the trailing windows that gain
+        interactions are rebuilt and the windows after the last split data
+        are appended. The background data is kept unless the new interactions
+        fall before :attr:`background_t`.
+
+        The windows are indexed as before, such that cursors and evaluators
+        of the setting continue with the appended windows once they reached
+        the end of the windows that existed before the call.
+
+        .. note::
+            The last window of a split is incomplete if its ground truth
+            window extends beyond the last interaction. A cursor that already
+            passed this window is not moved back when it is rebuilt.
+
+        :param new_data: Interactions to append. Must contain timestamps that
+            are not earlier than the last interaction of the split data.
+        :type new_data: InteractionMatrix
+        :raises TimestampAttributeMissingError: If `new_data` has no timestamps.
+        :raises ValueError: If `new_data` contains interactions earlier than
+            the last interaction of the split data.
+        :return: Index of the first window that was rebuilt or appended.
+        :rtype: int
+        """
+        self._check_split_complete()
+        if not new_data.has_timestamps:
+            raise TimestampAttributeMissingError()
+        if not hasattr(self, "_split_data"):
+            raise ValueError("The split data is not available, a split loaded from a SplitCache cannot be extended.")
+        if len(new_data) > 0 and len(self._split_data) > 0 and new_data.min_timestamp < self._split_data.max_timestamp:
+            raise ValueError("Interactions can only be appended after the last interaction of the split data.")
+        if self.t_upper:
+            new_data = new_data.timestamps_lt(self.t_upper)
+        if len(new_data) == 0:
+            return self._num_split_set
+
+        # windows of which the ground truth and incremental data ended before
+        # the first new interaction are complete and do not change
+        min_timestamp = new_data.min_timestamp
+        t_window_ends = np.maximum(self._window_splitter.window_ends(self._split_data, self._t_window),
+                                   self._window_splitter.step_ends(self._split_data, self._t_window))
+        first = next((idx for idx, t_end in enumerate(t_window_ends) if t_end > min_timestamp),
+                     self._num_split_set)
+
+        # the split data is grown in place instead of concatenated on every
+        # call, the windows are views on a snapshot of the appended data
+        if not isinstance(getattr(self, "_history", None), AppendOnlyInteractionMatrix):
+            self._history = AppendOnlyInteractionMatrix(self._split_data)
+        self._history.append(new_data)
+        data = copy(self._history)
+        self._split_data = data
+
+        if min_timestamp < self.t:
+            self._background_data, _ = self._background_splitter.split(data)
+
+        self._t_window = self._window_splitter.window_timestamps(data)
+        self._num_split_set = len(self._t_window)
+        self._num_full_interactions += new_data.num_interactions
+
+        if self.lazy:
+            self._shutdown_prefetch()
+            with self._window_lock:
+                for cached_idx in list(self._window_cache):
+                    if cached_idx >= first:
+                        del self._window_cache[cached_idx]
+        else:
+            # the lists are updated in place, such that generators over them
+            # continue with the appended windows
+            windows = self._build_windows(data, self._t_window[first:])
+            self._unlabeled_data[first:] = [unlabeled_set for unlabeled_set, _, _ in windows]
+            self._ground_truth_data[first:] = [ground_truth for _, ground_truth, _ in windows]
+            self._incremental_data[first:] = [future_interaction for _, _, future_interaction in windows]
+
+        logger.info(
+            f"Extended split with {new_data.num_interactions} interactions, rebuilt windows from index {first}. "
+            f"Number of splits: {self._num_split_set} in total."
+        )
+        return first
+
+    def _build_windows(self, data: InteractionMatrix, t_windows: List[int]) -> List[Window]:
+        """Build the windows of the setting starting at the timestamps `t_windows`.
+
+        :param data: Interactions to split.
+        :type data: InteractionMatrix
+        :param t_windows: Timestamps at which the windows start.
+        :type t_windows: List[int]
+        :return: Unlabeled data, ground truth data and incremental data per window.
+        :rtype: List[Window]
+        """
+        return _build_windows(data, self._window_splitter, self.prediction_data_processor,
+                              self.top_K, t_windows)
+
+    def _build_windows_parallel(self, data: InteractionMatrix) -> List[Window]:
+        """Build all windows in a pool of :attr:`n_jobs` processes.
+
+        The columns of `data` are written once to temporary `.npy` files that
+        the workers memory-map. Every worker builds a contiguous chunk of
+        windows, and the chunks are collected in order. The windows are sent
+        back as row positions into `data` and into the columns shared by the
+        unlabeled data of a chunk, see :func:`_pack_windows`.
+
+        :param data: Interactions to split.
+        :type data: InteractionMatrix
+        :return: Unlabeled data, ground truth data and incremental data per window.
+        :rtype: List[Window]
+        """
+        n_chunks = min(self.n_jobs, self._num_split_set)
+        chunks = [chunk.tolist() for chunk in np.array_split(np.asarray(self._t_window), n_chunks)]
+
+        with TemporaryDirectory(prefix="streamsight-") as tmp_dir:
+            columns = {}
+            for name, values in data._column_data().items():
+                columns[name] = os.path.join(tmp_dir, f"{name}.npy")
+                np.save(columns[name], values)
+
+            logger.debug(f"Building {self._num_split_set} windows in {n_chunks} processes")
+            with ProcessPoolExecutor(
+                max_workers=n_chunks,
+                initializer=_init_window_worker,
+                initargs=(columns, getattr(data, "shape", None), self._window_splitter, self.prediction_data_processor, self.top_K),
+            ) as executor:
+                windows = []
+                for chunk_columns, chunk_windows in tqdm(executor.map(_build_windows_in_worker, chunks), total=n_chunks):
+                    windows.extend(_unpack_windows(data, chunk_columns, chunk_windows))
+        return windows
+
+    def _build_window(self, idx: int) -> Window:
+        """Build the unlabeled, ground truth and incremental data of window `idx`.
+
+        :param idx: Index of the window.
+        :type idx: int
+        :return: Tuple of unlabeled data, ground truth data and incremental data.
+        :rtype: Window
+        """
+        logger.debug(f"Building window {idx} at time {self._t_window[idx]}")
+        return self._build_windows(self._split_data, [self._t_window[idx]])[0]
+
+    def _window(self, idx: int) -> Window:
+        """Get the data of window `idx` in lazy mode.
+
+        The window and the :attr:`prefetch` windows after it are built if they
+        are not cached. The cache is shared by the setting and all its cursors
+        and holds a future per window, such that the lock is only held to look
+        up the windows and a window is built once while other threads wait for
+        it. The least recently used windows are released once the cache holds
+        more than `prefetch + 2` windows for the setting and for every live
+        cursor, which covers the window before `idx`, of which the incremental
+        data is released after the evaluation of window `idx`.
+
+        :param idx: Index of the window.
+        :type idx: int
+        :raises IndexError: If there is no window `idx`.
+        :return: Tuple of unlabeled data, ground truth data and incremental data.
+        :rtype: Window
+        """
+        if idx < 0:
+            idx += self._num_split_set
+        if not 0 <= idx < self._num_split_set:
+            raise IndexError(f"Window index {idx} out of range for {self._num_split_set} windows")
+
+        prefetched = []
+        with self._window_lock:
+            future = self._window_cache.get(idx)
+            build = future is None
+            if build:
+                future = self._window_cache[idx] = Future()
+
+            # the window before idx, idx and the prefetched windows are the most recently used
+            for used_idx in range(idx - 1, min(idx + 1 + self.prefetch, self._num_split_set)):
+                if used_idx in self._window_cache:
+                    self._window_cache.move_to_end(used_idx)
+                elif used_idx > idx:
+                    if getattr(self, "_executor", None) is None:
+                        self._executor = ThreadPoolExecutor(max_workers=1)
+                    self._window_cache[used_idx] = self._executor.submit(self._build_window, used_idx)
+                    prefetched.append(self._window_cache[used_idx])
+            max_windows = (self.prefetch + 2) * (1 + len(self._cursors))
+            while len(self._window_cache) > max_windows:
+                self._window_cache.popitem(last=False)
+
+        # the callbacks take the lock, a prefetch that already finished
+        # runs its callback immediately in this thread
+        for prefetch_future in prefetched:
+            prefetch_future.add_done_callback(self._release_failed_window)
+
+        if build:
+            try:
+                future.set_result(self._build_window(idx))
+            except BaseException as e:
+                with self._window_lock:
+                    if self._window_cache.get(idx) is future:
+                        del self._window_cache[idx]
+                future.set_exception(e)
+        return future.result()
+
+    def _release_failed_window(self, future: Future) -> None:
+        """Remove a prefetched window that failed or was cancelled from the cache.
+
+        The window is built again when it is accessed, instead of raising the
+        error of the prefetch on every access.
+
+        :param future: Finished prefetch of a window.
+        :type future: Future
+        """
+        if not future.cancelled() and future.exception() is None:
+            return
+        with self._window_lock:
+            for cached_idx, cached_future in list(self._window_cache.items()):
+                if cached_future is future:
+                    logger.debug(f"Prefetch of window {cached_idx} failed, it is built again on access")
+                    del self._window_cache[cached_idx]
+
+    def _shutdown_prefetch(self) -> None:
+        """Shut down the prefetch thread of a lazy setting.
+
+        Prefetches that are running finish in the background, a new thread is
+        started by the next access of a window.
+        """
+        with self._window_lock:
+            executor = self.__dict__.pop("_executor", None)
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def cursor(self, start: int = 0) -> SettingCursor:
+        """Create an independent cursor over the windows of the split.
+
+        See :meth:`Setting.cursor`. The cursor is counted in the size of the
+        window cache of a lazy setting as long as it is referenced.
+
+        :param start: Iteration number the cursor starts at, defaults to 0
+        :type start: int, optional
+        :return: Cursor over the windows of the setting.
+        :rtype: SettingCursor
+        """
+        cursor = super().cursor(start)
+        with self._window_lock:
+            self._cursors.add(cursor)
+        return cursor
+
+    def __getstate__(self) -> dict:
+        # built windows, the prefetch thread and the lock are not pickled
+        state = self.__dict__.copy()
+        state.pop("_executor", None)
+        state.pop("_window_lock", None)
+        state.pop("_cursors", None)
+        if "_window_cache" in state:
+            state["_window_cache"] = OrderedDict()
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._window_lock = Lock()
+        self._cursors = WeakSet()
+
     @property
     def params(self):
         """Parameters of the setting."""
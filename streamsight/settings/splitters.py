@@ -1,6 +1,8 @@
 import logging
 from abc import ABC, abstractmethod
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
+
+import numpy as np
 
 from streamsight.matrix import InteractionMatrix
 
@@ -40,6 +42,11 @@ class NLastInteractionSplitter(Splitter):
     """Splits the n most recent interactions of a user into the second return value,
     and earlier interactions into the first.
 
+    The first return value only contains the `n_seq_data` interactions of a
+    user before its n most recent ones. Both are selected in a single pass
+    from the rank of every interaction counted from the last interaction of
+    its user, without grouping the data for each part.
+
     :param n: Number of most recent actions to assign to the second return value.
     :type n: int
     :param n_seq_data: Number of last interactions to provide as unlabeled data
@@ -60,11 +67,11 @@ class NLastInteractionSplitter(Splitter):
     def split(
         self, data: InteractionMatrix
     ) -> Tuple[InteractionMatrix, InteractionMatrix]:
-        future_interaction = data.get_users_n_last_interaction(self.n)
-        past_interaction = data - future_interaction
-        past_interaction = past_interaction.get_users_n_last_interaction(
-            self.n_seq_data
-        )
+        # both parts are ranges of the rank of every interaction counted
+        # from the last interaction of its user
+        rank = data._reverse_rank(InteractionMatrix.USER_IX)
+        future_interaction = data._apply_mask(rank < self.n)
+        past_interaction = data._apply_mask((rank >= self.n) & (rank < self.n + self.n_seq_data))
         logger.debug(f"{self.identifier} has complete split")
 
         return past_interaction, future_interaction
@@ -121,8 +128,11 @@ class TimestampSplitter(Splitter):
             past_interaction = data.timestamps_lt(self.t)
         else:
             # t-t_lower =< timestamp < t
-            past_interaction = data.timestamps_lt(self.t).timestamps_gte(
-                self.t - self.t_lower
+            past_interaction = (
+                data.query()
+                .timestamps_lt(self.t)
+                .timestamps_gte(self.t - self.t_lower)
+                .collect()
             )
 
         if self.t_upper is None:
@@ -130,8 +140,11 @@ class TimestampSplitter(Splitter):
             future_interaction = data.timestamps_gte(self.t)
         else:
             # t =< timestamp < t + t_upper
-            future_interaction = data.timestamps_gte(self.t).timestamps_lt(
-                self.t + self.t_upper
+            future_interaction = (
+                data.query()
+                .timestamps_gte(self.t)
+                .timestamps_lt(self.t + self.t_upper)
+                .collect()
             )
 
         logger.debug(f"{self.identifier} has complete split")
@@ -200,9 +213,12 @@ class NPastInteractionTimestampSplitter(TimestampSplitter):
         if self.t_upper is None:
             future_interaction = data.timestamps_gte(self.t)
         else:
-            future_interaction = data.timestamps_lt(
-                self.t + self.t_upper
-            ).timestamps_gte(self.t)
+            future_interaction = (
+                data.query()
+                .timestamps_gte(self.t)
+                .timestamps_lt(self.t + self.t_upper)
+                .collect()
+            )
         
         if self.include_all_past_data:
             past_interaction = data.timestamps_lt(self.t)
@@ -213,3 +229,218 @@ class NPastInteractionTimestampSplitter(TimestampSplitter):
             
         logger.debug(f"{self.identifier} has complete split")
         return past_interaction, future_interaction
+
+
+class SlidingWindowSplitter(Splitter):
+    """Splits data into consecutive windows with n past interactions each.
+
+    Equivalent to applying :class:`NPastInteractionTimestampSplitter` at the
+    timestamps `t, t + window_size, t + 2 * window_size, ...` up to the last
+    timestamp in the data, but without a pass over the data per window. The
+    boundaries of all windows are resolved at once on the timestamp-sorted
+    index of the data, and the past interactions of every window are
+    gathered from the per-user index of the data, which is built once.
+
+
+    Attribute definition
+    ====================
+    
+    - :attr:`past_interaction`: List of the last `n_seq_data` interactions
+      before the start of each window of the users in that window.
+    - :attr:`future_interaction`: List of the interactions in each window.
+      Interval is `[t_i, t_i+t_upper)` or `[t_i,inf]`.
+
+    :param t: Timestamp of the start of the first window in seconds since epoch.
+    :type t: int
+    :param window_size: Seconds between the start of consecutive windows.
+    :type window_size: int
+    :param t_upper: Seconds past the start of a window. Upper bound on the
+        timestamp of interactions in the window. Defaults to None (infinity).
+    :type t_upper: int, optional
+    :param n_seq_data: Number of last interactions to provide as data
+        for model to make prediction.
+    :type n_seq_data: int, optional
+    """
+
+    def __init__(
+        self,
+        t: int,
+        window_size: int,
+        t_upper: Optional[int] = None,
+        n_seq_data: int = 1,
+    ):
+        super().__init__()
+        self.t = t
+        self.window_size = window_size
+        self.t_upper = t_upper
+        self.n_seq_data = n_seq_data
+
+    def window_timestamps(self, data: InteractionMatrix) -> List[int]:
+        """Start timestamps of the windows that contain data.
+
+        :param data: Interaction matrix to be split. Must contain timestamps.
+        :type data: InteractionMatrix
+        :return: Start timestamp of every window.
+        :rtype: List[int]
+        """
+        t_windows = []
+        sub_time = self.t
+        max_timestamp = data.max_timestamp
+        while sub_time <= max_timestamp:
+            t_windows.append(sub_time)
+            sub_time += self.window_size
+        return t_windows
+
+    def window_ends(self, data: InteractionMatrix, t_windows: List[int]) -> List[float]:
+        """Exclusive end timestamp of the future interactions of every window.
+
+        :param data: Interaction matrix to be split. Must contain timestamps.
+        :type data: InteractionMatrix
+        :param t_windows: Start timestamp of every window.
+        :type t_windows: List[int]
+        :return: End timestamp of every window.
+        :rtype: List[float]
+        """
+        if self.t_upper is None:
+            return [np.inf] * len(t_windows)
+        return [t + self.t_upper for t in t_windows]
+
+    def step_ends(self, data: InteractionMatrix, t_windows: List[int]) -> List[float]:
+        """Exclusive end timestamp of the step from every window to the next.
+
+        The interactions of a step are the interactions that are released
+        to a model as incremental data after the window.
+
+        :param data: Interaction matrix to be split. Must contain timestamps.
+        :type data: InteractionMatrix
+        :param t_windows: Start timestamp of every window.
+        :type t_windows: List[int]
+        :return: End timestamp of the step of every window.
+        :rtype: List[float]
+        """
+        return [t + self.window_size for t in t_windows]
+
+    def split_windows(
+        self, data: InteractionMatrix, t_windows: List[int]
+    ) -> Tuple[List[InteractionMatrix], List[InteractionMatrix]]:
+        """Splits data into the windows starting at the given timestamps.
+
+        :param data: Interaction matrix to be split. Must contain timestamps.
+        :type data: InteractionMatrix
+        :param t_windows: Start timestamp of every window.
+        :type t_windows: List[int]
+        :return: A 2-tuple containing the lists of `past_interaction` and
+            `future_interaction` matrices of every window.
+        :rtype: Tuple[List[InteractionMatrix], List[InteractionMatrix]]
+        """
+        future_interactions = data.time_windows(t_windows, self.window_ends(data, t_windows))
+        past_interactions = data.get_users_n_last_interaction_windows(
+            self.n_seq_data, t_windows,
+            [future_interaction._known_ids(InteractionMatrix.USER_IX) for future_interaction in future_interactions],
+        )
+        return past_interactions, future_interactions
+
+    def split(
+        self, data: InteractionMatrix
+    ) -> Tuple[List[InteractionMatrix], List[InteractionMatrix]]:
+        """Splits data into all windows of the data.
+
+        :param data: Interaction matrix to be split. Must contain timestamps.
+        :type data: InteractionMatrix
+        :return: A 2-tuple containing the lists of `past_interaction` and
+            `future_interaction` matrices of every window.
+        :rtype: Tuple[List[InteractionMatrix], List[InteractionMatrix]]
+        """
+        past_interactions, future_interactions = self.split_windows(data, self.window_timestamps(data))
+        logger.debug(f"{self.identifier} has complete split")
+        return past_interactions, future_interactions
+
+
+class CountWindowSplitter(SlidingWindowSplitter):
+    """Splits data into consecutive windows with a fixed number of interactions each.
+
+    The first window starts at `t`, and every next window starts at the
+    timestamp of the `window_interactions`-th interaction after the start
+    of the previous window. The boundaries are thus quantiles of the sorted
+    timestamps instead of fixed time steps, such that busy and quiet periods
+    yield windows of equal size. The last window contains the remaining
+    interactions.
+
+    Interactions with the same timestamp are never split over two windows.
+    A window therefore contains at most `window_interactions` interactions,
+    unless more than `window_interactions` interactions share the timestamp
+    at its start, in which case the window contains all of them.
+
+    :param t: Timestamp of the start of the first window in seconds since epoch.
+    :type t: int
+    :param window_interactions: Number of interactions per window.
+    :type window_interactions: int
+    :param n_seq_data: Number of last interactions to provide as data
+        for model to make prediction.
+    :type n_seq_data: int, optional
+    """
+
+    def __init__(self, t: int, window_interactions: int, n_seq_data: int = 1):
+        Splitter.__init__(self)
+        if window_interactions < 1:
+            raise ValueError(
+                f"window_interactions must be a positive integer, got {window_interactions}"
+            )
+        self.t = t
+        self.window_interactions = window_interactions
+        self.n_seq_data = n_seq_data
+
+    def _window_end(self, sorted_ts: np.ndarray, t: float) -> float:
+        """End timestamp of the window starting at `t`.
+
+        :param sorted_ts: Timestamps of the data in ascending order.
+        :type sorted_ts: np.ndarray
+        :param t: Start timestamp of the window.
+        :type t: float
+        :return: End timestamp of the window, infinity for the last window.
+        :rtype: float
+        """
+        start = np.searchsorted(sorted_ts, t, side="left")
+        stop = start + self.window_interactions
+        if stop >= len(sorted_ts):
+            return np.inf
+        if sorted_ts[stop] == sorted_ts[start]:
+            # the window cannot end inside a run of equal timestamps
+            stop = np.searchsorted(sorted_ts, sorted_ts[start], side="right")
+            if stop >= len(sorted_ts):
+                return np.inf
+        return sorted_ts[stop].item()
+
+    def window_timestamps(self, data: InteractionMatrix) -> List[int]:
+        """Start timestamps of the windows that contain data.
+
+        :param data: Interaction matrix to be split. Must contain timestamps.
+        :type data: InteractionMatrix
+        :return: Start timestamp of every window.
+        :rtype: List[int]
+        """
+        sorted_ts, _ = data._time_index()
+        t_windows = []
+        sub_time = self.t
+        max_timestamp = data.max_timestamp
+        while sub_time <= max_timestamp:
+            t_windows.append(sub_time)
+            sub_time = self._window_end(sorted_ts, sub_time)
+        return t_windows
+
+    def window_ends(self, data: InteractionMatrix, t_windows: List[int]) -> List[float]:
+        """Start timestamp of the next window of every window.
+
+        :param data: Interaction matrix to be split. Must contain timestamps.
+        :type data: InteractionMatrix
+        :param t_windows: Start timestamp of every window.
+        :type t_windows: List[int]
+        :return: End timestamp of every window.
+        :rtype: List[float]
+        """
+        sorted_ts, _ = data._time_index()
+        return [self._window_end(sorted_ts, t) for t in t_windows]
+
+    def step_ends(self, data: InteractionMatrix, t_windows: List[int]) -> List[float]:
+        """Start timestamp of the next window of every window, see :meth:`window_ends`."""
+        return self.window_ends(data, t_windows)
@@ -0,0 +1,289 @@
+import logging
+from collections import OrderedDict
+from copy import copy
+from threading import Lock
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+from streamsight.matrix import (AppendOnlyInteractionMatrix,
+                                InteractionMatrix,
+                                TimestampAttributeMissingError)
+from streamsight.settings import Setting
+from streamsight.settings.sliding_window_setting import (Window, _build_windows,
+                                                         _LazyWindows)
+from streamsight.settings.splitters import (SlidingWindowSplitter,
+                                           TimestampSplitter)
+
+logger = logging.getLogger(__name__)
+
+
+class StreamingSetting(Setting):
+    """Sliding window setting on interactions that arrive during the evaluation.
+
+    :class:`SlidingWindowSetting` splits an :class:`InteractionMatrix` that
+    is available up front. This setting instead reads the interactions from
+    a source that yields them in chunks over time, such as an
+    :class:`InteractionStream` that tails a file written by another process.
+    The windows are the same as the windows of a :class:`SlidingWindowSetting`
+    with the same parameters on all interactions of the source.
+
+    :meth:`split` reads the source until the background data is complete.
+    A window is closed, and released to the cursors and evaluators of the
+    setting, as soon as an interaction at or after the end of its ground
+    truth and incremental data is read, or when the source ends. Reading a window that is
+    not closed yet waits on the source, so :attr:`num_split` is the number of
+    windows closed so far until the source ends.
+
+    Only the interactions of the windows that are not closed yet and the
+    last :attr:`n_seq_data` interactions of every user before them are kept
+    to build the next windows. A closed window is released once a window
+    after the next one is read, such that the memory of the setting is
+    bounded by the open windows instead of the length of the stream. All
+    cursors on the setting must therefore move forward together, as the
+    :class:`EvaluatorStreamer` does.
+
+    Example
+    ~~~~~~~~~
+
+    .. code-block:: python
+
+        source = InteractionStream.from_file("interactions.csv", "item", "user", "timestamp")
+        setting = StreamingSetting(background_t=1530000000, window_size=60 * 60 * 24)
+        setting.split(source)
+
+        evaluator = EvaluatorStreamer(metric_entries, setting, metric_k=10)
+
+    :param background_t: Time point to split the data into background and evaluation data. Split will be from `[0, t)`
+    :type background_t: int
+    :param window_size: Size of the window in seconds to slide over the data.
+    :type window_size: int, optional
+    :param n_seq_data: Number of last sequential interactions to provide as
+         data for model to make prediction.
+    :type n_seq_data: int, optional
+    :param top_K: Number of interaction per user that should be selected for evaluation purposes.
+    :type top_K: int, optional
+    :param t_ground_truth_window: Size of the window in seconds to slide over the data for ground truth data.
+        If not provided, defaults to window_size during computation.
+    :type t_ground_truth_window: int, optional
+    :param seed: Seed for random number generator.
+    :type seed: int, optional
+    """
+
+    def __init__(
+        self,
+        background_t: int,
+        window_size: int = np.iinfo(np.int32).max,  # in seconds
+        n_seq_data: int = 10,
+        top_K: int = 10,
+        t_ground_truth_window: Optional[int] = None,
+        seed: Optional[int] = None,
+    ):
+        super().__init__(seed=seed)
+        self._sliding_window_setting = True
+        self.t = background_t
+        self.window_size = window_size
+        """Window size in seconds for splitter to slide over the data."""
+        self.n_seq_data = n_seq_data
+        self.top_K = top_K
+
+        if t_ground_truth_window is None:
+            t_ground_truth_window = window_size
+        self.t_ground_truth_window = t_ground_truth_window
+
+        self._num_split_set = 0
+        self._source_lock = Lock()
+        """Lock of the source and the open windows, which cursors may access from several threads."""
+
+        self._background_splitter = TimestampSplitter(background_t, None, None)
+        self._window_splitter = SlidingWindowSplitter(
+            background_t, window_size, t_ground_truth_window, n_seq_data
+        )
+
+    def split(self, source: Iterable[InteractionMatrix]) -> None:
+        """Start reading the interactions from a source.
+
+        The source is read until the first interaction at or after
+        :attr:`background_t`, such that :attr:`background_data` is complete.
+        The windows are read from the source when they are accessed.
+
+        :param source: Chunks of interactions in order of time. The interaction
+            IDs of the chunks are kept and should be unique over the source.
+        :type source: Iterable[InteractionMatrix]
+        """
+        logger.debug("Reading background data from source...")
+        self._num_full_interactions = 0
+        self._split(source)
+        self._check_split()
+        self._split_complete = True
+        logger.info(f"{self.name} background data complete, windows are read from the source.")
+
+    def _split(self, source: Iterable[InteractionMatrix]) -> None:
+        """Read the background data from the source.
+
+        :param source: Chunks of interactions in order of time.
+        :type source: Iterable[InteractionMatrix]
+        """
+        self._source: Optional[Iterator[InteractionMatrix]] = iter(source)
+        self._exhausted = False
+        self._buffer: Optional[AppendOnlyInteractionMatrix] = None
+        """Interactions needed to build the windows that are not closed yet."""
+        self._max_timestamp = -np.inf
+        self._t_window = []
+        self._num_split_set = 0
+        self._window_cache: OrderedDict[int, Window] = OrderedDict()
+        self._unlabeled_data = _LazyWindows(self, 0)
+        self._ground_truth_data = _LazyWindows(self, 1)
+        self._incremental_data = _LazyWindows(self, 2)
+
+        while self._max_timestamp < self.t and self._read():
+            pass
+        if self._buffer is None:
+            raise ValueError("Source does not contain any interactions.")
+
+        data = copy(self._buffer)
+        self._background_data, _ = self._background_splitter.split(data)
+        self._compact(data, self.t)
+        self._close_windows()
+
+    def _read(self) -> bool:
+        """Append the next chunk of the source to the open interactions.
+
+        :raises TimestampAttributeMissingError: If the chunk has no timestamps.
+        :raises ValueError: If the chunk contains interactions earlier than
+            the interactions that were read before, or if the setting is
+            detached from its source after unpickling.
+        :return: False if the source has ended, True otherwise.
+        :rtype: bool
+        """
+        if self._source is None:
+            raise ValueError(f"{self.name} was restored from a pickle and is detached from its source, "
+                             "windows that were not closed before pickling cannot be read.")
+        try:
+            chunk = next(self._source)
+        except StopIteration:
+            logger.debug("Source has ended")
+            self._exhausted = True
+            return False
+        if not chunk.has_timestamps:
+            raise TimestampAttributeMissingError()
+        if len(chunk) == 0:
+            return True
+
+        timestamps = chunk._column(InteractionMatrix.TIMESTAMP_IX)
+        if timestamps[0] < self._max_timestamp or np.any(np.diff(timestamps) < 0):
+            raise ValueError("Interactions of the source must be in order of time.")
+
+        if self._buffer is None:
+            self._buffer = AppendOnlyInteractionMatrix(chunk)
+        else:
+            self._buffer.append(chunk)
+        self._max_timestamp = timestamps[-1]
+        self._num_full_interactions += len(chunk)
+        return True
+
+    def _compact(self, data: InteractionMatrix, t_open: int) -> None:
+        """Drop the interactions that are not needed for the open windows.
+
+        The interactions from `t_open` onwards and the last
+        :attr:`n_seq_data` interactions of every user before it are kept.
+
+        :param data: Snapshot of the open interactions.
+        :type data: InteractionMatrix
+        :param t_open: Start timestamp of the first window that is not closed.
+        :type t_open: int
+        """
+        history = data.get_users_n_last_interaction(self.n_seq_data, t_open)
+        positions = np.union1d(history._positions(), data.timestamps_gte(t_open)._positions())
+        self._buffer = AppendOnlyInteractionMatrix(InteractionMatrix._from_columns(data._data, positions))
+        logger.debug(f"Keeping {len(positions)} of {len(data)} interactions for the open windows")
+
+    def _close_windows(self) -> None:
+        """Build the windows of which the ground truth and incremental data have passed.
+
+        A window is closed when an interaction at or after the end of its
+        ground truth and incremental data is read, or when the source has ended.
+        """
+        t_windows = []
+        t_next = self.t + self._num_split_set * self.window_size
+        t_window_end = max(self.t_ground_truth_window or np.inf, self.window_size)
+        while t_next <= self._max_timestamp and (self._exhausted or t_next + t_window_end <= self._max_timestamp):
+            t_windows.append(t_next)
+            t_next += self.window_size
+        if not t_windows:
+            return
+
+        data = copy(self._buffer)
+        windows = _build_windows(data, self._window_splitter, self.prediction_data_processor,
+                                 self.top_K, t_windows)
+        for window in windows:
+            self._window_cache[self._num_split_set] = window
+            self._num_split_set += 1
+        self._t_window.extend(t_windows)
+        self._compact(data, t_next)
+        logger.info(f"Closed windows up to time {t_windows[-1]}. Number of splits: {self._num_split_set} so far.")
+
+    def _window_available(self, idx: int) -> bool:
+        with self._source_lock:
+            while idx >= self._num_split_set and not self._exhausted:
+                self._read()
+                self._close_windows()
+        return idx < self._num_split_set
+
+    def _window(self, idx: int) -> Window:
+        """Get the data of window `idx`, waiting for it to be closed.
+
+        The windows before the window preceding `idx`, of which the
+        incremental data is released after the evaluation of window `idx`,
+        are released.
+
+        :param idx: Index of the window.
+        :type idx: int
+        :raises IndexError: If there is no window `idx` or it was released.
+        :return: Tuple of unlabeled data, ground truth data and incremental data.
+        :rtype: Window
+        """
+        if idx < 0:
+            idx += self._num_split_set
+        if idx < 0 or not self._window_available(idx):
+            raise IndexError(f"Window index {idx} out of range for {self._num_split_set} windows")
+
+        with self._source_lock:
+            if idx not in self._window_cache:
+                raise IndexError(f"Window {idx} was already released by {self.name}")
+            for cached_idx in list(self._window_cache):
+                if cached_idx < idx - 1:
+                    del self._window_cache[cached_idx]
+            return self._window_cache[idx]
+
+    def _check_size(self):
+        # windows are only known once they are read from the source
+        logger.debug("Size of streamed windows is not checked.")
+
+    def __getstate__(self) -> dict:
+        # the source, e.g. a generator tailing a file, cannot be pickled
+        state = self.__dict__.copy()
+        state.pop("_source_lock", None)
+        state.pop("_source", None)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """Restore a pickled setting, which is detached from its source.
+
+        The windows that were closed before pickling can be accessed, reading
+        a window that needs interactions from the source raises an error.
+        """
+        self.__dict__.update(state)
+        self._source_lock = Lock()
+        self._source = None
+
+    @property
+    def params(self):
+        """Parameters of the setting."""
+        return {
+            "background_t": self.t,
+            "window_size": self.window_size,
+            "n_seq_data": self.n_seq_data,
+            "top_K": self.top_K,
+            "t_ground_truth_window": self.t_ground_truth_window
+        }
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+from scipy.sparse import csr_matrix, random
+
+from streamsight.algorithms import ItemKNN
+from streamsight.algorithms.itemknn import (compute_cosine_similarity,
+                                            compute_top_K_cosine_similarity)
+from streamsight.algorithms.utils import get_top_K_values
+
+
+@pytest.mark.parametrize("block_size, n_jobs", [(1, 1), (7, 1), (7, 3), (1024, 1)])
+def test_compute_top_K_cosine_similarity(block_size: int, n_jobs: int):
+    X = random(100, 60, density=0.1, format="csr", random_state=42)
+    X.data[:] = 1
+    expected = get_top_K_values(compute_cosine_similarity(X), K=5)
+    similarities = compute_top_K_cosine_similarity(X, K=5, block_size=block_size, n_jobs=n_jobs)
+    assert similarities.shape == expected.shape
+    assert (similarities != expected).nnz == 0
+    assert np.all(similarities.diagonal() == 0)
+
+
+def test_ItemKNN_blocks(setting):
+    setting.background_data.mask_shape()
+    X = csr_matrix(setting.background_data.binary_values)
+    algo = ItemKNN(K=2, block_size=1).fit(setting.background_data)
+    assert (algo.similarity_matrix_ != get_top_K_values(compute_cosine_similarity(X), K=2)).nnz == 0
@@ -1,4 +1,9 @@
+import numpy as np
+from scipy.sparse import csr_matrix, random
+
 from streamsight.algorithms import ItemKNNIncremental
+from streamsight.algorithms.itemknn import compute_cosine_similarity
+from streamsight.algorithms.itemknn_incremental import _positions
 
 def test_ItemKNNIncremental(setting):
     algo = ItemKNNIncremental(K=10)
@@ -6,4 +11,57 @@ def test_ItemKNNIncremental(setting):
     algo.fit(setting.background_data)
     unlabeled_data = setting.unlabeled_data[0]
     unlabeled_data.mask_shape(setting.background_data.shape, True, True)
-    X_pred = algo.predict(unlabeled_data)
\ No newline at end of file
+    X_pred = algo.predict(unlabeled_data)
+
+
+def test_ItemKNNIncremental_updates(setting):
+    windows = [setting.background_data] + [setting.incremental_data[idx] for idx in range(setting.num_split)]
+    shape = (max(window.max_user_id for window in windows) + 1, max(window.max_item_id for window in windows) + 1)
+    algo = ItemKNNIncremental(K=None)
+    X = csr_matrix(shape)
+    for window in windows:
+        window.mask_shape(shape)
+        algo.fit(window)
+        X = X + window.binary_values
+    X.data[:] = 1
+
+    assert (algo.history_ != X).nnz == 0
+    assert (algo.cooccurrence_ != X.T @ X).nnz == 0
+    assert np.allclose(algo.similarity_matrix_.toarray(), compute_cosine_similarity(X).toarray())
+
+
+def test_ItemKNNIncremental_windows_equal_single_fit():
+    X = random(300, 80, density=0.05, format="csr", random_state=42)
+    X.data[:] = 1
+    windows = ItemKNNIncremental(K=5, block_size=7)
+    # windows grow in users and items, and repeat interactions of earlier windows
+    for users, items in [(100, 40), (200, 80), (300, 80)]:
+        windows._fit(X[:users, :items])
+    single = ItemKNNIncremental(K=5)
+    single._fit(X)
+    assert (windows.similarity_matrix_ != single.similarity_matrix_).nnz == 0
+    assert (windows.cooccurrence_ != X.T @ X).nnz == 0
+
+
+def test_ItemKNNIncremental_only_recomputes_rows_failing_bound(monkeypatch):
+    X = random(500, 60, density=0.1, format="csr", random_state=1)
+    X.data[:] = 1
+    algo = ItemKNNIncremental(K=5)
+    algo._fit(X[:450])
+    recomputed = []
+    compute_similarities = algo._compute_similarities
+    monkeypatch.setattr(algo, "_compute_similarities",
+                        lambda items: recomputed.append(items) or compute_similarities(items))
+    algo._fit(X)
+    single = ItemKNNIncremental(K=5)
+    single._fit(X)
+    assert (algo.similarity_matrix_ != single.similarity_matrix_).nnz == 0
+    assert sum(len(items) for items in recomputed) < X.shape[1]
+
+
+def test_positions():
+    X = random(30, 40, density=0.2, format="csr", random_state=3)
+    rows, columns = np.divmod(np.arange(30 * 40), 40)
+    positions = _positions(X, rows, columns)
+    values = np.where(positions >= 0, X.data[positions], 0)
+    assert np.array_equal(values, X.toarray().ravel())
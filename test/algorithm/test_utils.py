@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from scipy.sparse import csr_matrix, random
+
+from streamsight.algorithms.utils import get_top_K_ranks, get_top_K_values
+
+
+@pytest.fixture()
+def scores() -> csr_matrix:
+    return csr_matrix(np.array([
+        [0.5, 0.0, 0.9, 0.1, 0.7],
+        [0.0, 0.0, 0.0, 0.0, 0.0],
+        [0.2, 0.4, 0.0, 0.0, 0.0],
+        [1.0, 1.0, 0.0, 1.0, 1.0],
+    ]))
+
+
+def test_get_top_K_ranks(scores: csr_matrix):
+    ranks = get_top_K_ranks(scores, 3).toarray()
+    np.testing.assert_array_equal(ranks, [
+        [3, 0, 1, 0, 2],
+        [0, 0, 0, 0, 0],
+        [2, 1, 0, 0, 0],
+        # ties are ranked by the largest index first
+        [0, 3, 0, 2, 1],
+    ])
+
+
+def test_get_top_K_ranks_all(scores: csr_matrix):
+    ranks = get_top_K_ranks(scores).toarray()
+    np.testing.assert_array_equal(ranks[0], [3, 0, 1, 4, 2])
+    np.testing.assert_array_equal(ranks[3], [4, 3, 0, 2, 1])
+
+
+def test_get_top_K_values(scores: csr_matrix):
+    values = get_top_K_values(scores, 2).toarray()
+    np.testing.assert_array_equal(values, [
+        [0, 0, 0.9, 0, 0.7],
+        [0, 0, 0, 0, 0],
+        [0.2, 0.4, 0, 0, 0],
+        [0, 0, 0, 1.0, 1.0],
+    ])
+
+
+@pytest.mark.parametrize("K", [1, 5, 50])
+def test_get_top_K_ranks_random(K: int):
+    X = random(200, 300, density=0.1, format="csr", random_state=42)
+    X.data[::7] = 0.5  # ties within rows
+    ranks = get_top_K_ranks(X, K)
+    for row in range(X.shape[0]):
+        start, end = X.indptr[row], X.indptr[row + 1]
+        expected = sorted(zip(X.data[start:end], X.indices[start:end]), reverse=True)[:K]
+        ranked = ranks[row].indices[np.argsort(ranks[row].data)]
+        assert ranked.tolist() == [col for _, col in expected]
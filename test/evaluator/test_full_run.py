@@ -1,7 +1,9 @@
+import threading
+
 import pytest
 from streamsight.datasets import TestDataset
 from streamsight.settings import SlidingWindowSetting, SingleTimePointSetting
-from streamsight.evaluators import EvaluatorPipelineBuilder, EvaluatorStreamerBuilder
+from streamsight.evaluators import EvaluatorPipelineBuilder, EvaluatorStreamerBuilder, MetricLevelEnum
 
 @pytest.fixture()
 def sliding_window():
@@ -81,4 +83,24 @@ class TestFullRun:
         prediction = algo.predict(unlabeled_data)
         
         evaluator.submit_prediction(algo_id, prediction)
-        
\ No newline at end of file
+        
+    def test_evaluators_share_setting(self, sliding_window):
+        def build():
+            b = EvaluatorPipelineBuilder(False, False)
+            b.add_setting(sliding_window)
+            b.add_algorithm("ItemKNNIncremental", {"K": 1})
+            b.add_metric("PrecisionK")
+            return b.build()
+
+        expected = build()
+        expected.run()
+        first, second = build(), build()
+        threads = [threading.Thread(target=evaluator.run) for evaluator in (first, second)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for evaluator in (first, second):
+            assert evaluator.metric_results(MetricLevelEnum.WINDOW).equals(
+                expected.metric_results(MetricLevelEnum.WINDOW))
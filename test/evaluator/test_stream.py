@@ -1,7 +1,10 @@
 import pytest
+from streamsight.settings import StreamingSetting
 from streamsight.settings.sliding_window_setting import SlidingWindowSetting
 from test.conftest import BACKGROUND_T, WINDOW_SIZE, SEED, N_SEQ_DATA, SEED
 from streamsight.evaluators import EvaluatorStreamerBuilder
+from streamsight.evaluators.util import MetricLevelEnum
+from streamsight.registries import AlgorithmStateEnum
 from streamsight.algorithms import ItemKNNIncremental
 
 
@@ -62,4 +65,33 @@ class TestStreamer():
 
         to_validate_data = evaluator.get_data(external_model_id)
 
-        assert(to_validate_data == data)
\ No newline at end of file
+        assert(to_validate_data == data)
+
+
+def test_streaming_setting_equals_sliding_window_setting(setting, test_dataset, k):
+    data = test_dataset.load()
+    streaming_setting = StreamingSetting(background_t=BACKGROUND_T,
+                                         window_size=WINDOW_SIZE,
+                                         n_seq_data=N_SEQ_DATA,
+                                         seed=SEED)
+    streaming_setting.split(data.query().timestamps_gte(t).timestamps_lt(t + 1).collect()
+                            for t in range(data.min_timestamp, data.max_timestamp + 1))
+
+    results = []
+    for evaluated_setting in [setting, streaming_setting]:
+        builder = EvaluatorStreamerBuilder()
+        builder.add_setting(evaluated_setting)
+        builder.set_metric_K(k)
+        builder.add_metric("PrecisionK")
+        evaluator = builder.build()
+        algo = ItemKNNIncremental(K=10)
+        algo_id = evaluator.register_algorithm(algo)
+        evaluator.start_stream()
+
+        while evaluator.get_algorithm_state(algo_id) != AlgorithmStateEnum.COMPLETED:
+            algo.fit(evaluator.get_data(algo_id))
+            evaluator.submit_prediction(algo_id, algo.predict(evaluator.get_unlabeled_data(algo_id)))
+        results.append(evaluator.metric_results(MetricLevelEnum.WINDOW))
+
+    assert len(results[0]) == setting.num_split
+    assert results[0].equals(results[1])
@@ -0,0 +1,13 @@
+import pytest
+
+from streamsight.matrix import InteractionMatrix
+from test.conftest import test_dataframe, TIMESTAMP_IX, ITEM_IX, USER_IX
+
+@pytest.fixture()
+def matrix(test_dataframe):
+    return InteractionMatrix(test_dataframe, ITEM_IX, USER_IX, TIMESTAMP_IX)
+
+@pytest.fixture()
+def unsorted_matrix(test_dataframe):
+    shuffled = test_dataframe.sample(frac=1, random_state=42)
+    return InteractionMatrix(shuffled, ITEM_IX, USER_IX, TIMESTAMP_IX)
@@ -0,0 +1,81 @@
+import pickle
+
+import numpy as np
+
+from streamsight.matrix import AppendOnlyInteractionMatrix, InteractionMatrix
+
+
+def windows(matrix: InteractionMatrix):
+    return [matrix.timestamps_lt(4), matrix.timestamps_gte(4).timestamps_lt(8), matrix.timestamps_gte(8)]
+
+
+def test_append(matrix: InteractionMatrix):
+    first, *rest = windows(matrix)
+    history = AppendOnlyInteractionMatrix(first)
+    for window in rest:
+        history.append(window)
+    assert history == matrix
+    assert history.user_ids == matrix.user_ids
+    assert history.max_timestamp == 10
+
+
+def test_values_updated_incrementally(matrix: InteractionMatrix):
+    first, *rest = windows(matrix)
+    first.mask_shape((4, 4))
+    history = AppendOnlyInteractionMatrix(first)
+    assert history.values.nnz == 4
+    for window in rest:
+        window.mask_shape((6, 4))
+        history.append(window)
+    matrix.mask_shape((6, 4))
+    assert "values" in history._cache
+    assert history.shape == (6, 4)
+    assert (history.values != matrix.values).nnz == 0
+    assert (history.binary_values != matrix.binary_values).nnz == 0
+
+
+def test_derived_matrices_are_snapshots(matrix: InteractionMatrix):
+    first, *rest = windows(matrix)
+    history = AppendOnlyInteractionMatrix(first)
+    snapshot = history.copy()
+    users = history.users_in({1, 2})
+    for window in rest:
+        history.append(window)
+    assert type(snapshot) is InteractionMatrix
+    assert snapshot == first
+    assert len(users) == 3
+    users.concat(first)
+    assert len(history) == len(matrix)
+
+
+def test_derived_matrices_share_data_until_append(matrix: InteractionMatrix):
+    first, *rest = windows(matrix)
+    history = AppendOnlyInteractionMatrix(first)
+    history.append(rest[0])
+    past, future = history.timestamps_lt(4), history.timestamps_gte(4)
+    assert history._data is history._data
+    assert past._data is future._data is history._data
+    history.append(rest[1])
+    assert history._data is not past._data
+    assert len(history._data[InteractionMatrix.USER_IX]) == len(matrix)
+    assert len(past._data[InteractionMatrix.USER_IX]) == len(matrix) - len(rest[1])
+
+
+def test_append_after_inplace_filter(matrix: InteractionMatrix):
+    first, *rest = windows(matrix)
+    history = AppendOnlyInteractionMatrix(first)
+    history.users_in({1, 2}, inplace=True)
+    history.append(rest[0])
+    assert len(history) == 3 + len(rest[0])
+
+
+def test_pickle(matrix: InteractionMatrix):
+    first, *rest = windows(matrix)
+    history = AppendOnlyInteractionMatrix(first)
+    history.append(rest[0])
+    restored = pickle.loads(pickle.dumps(history))
+    assert restored == history
+    assert len(restored._buffers[InteractionMatrix.USER_IX]) == len(history)
+    restored.append(rest[1])
+    assert restored == matrix
+    assert np.array_equal(restored._column(InteractionMatrix.INTERACTION_IX), np.arange(len(matrix)))
@@ -0,0 +1,282 @@
+import operator
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from streamsight.matrix import InteractionMatrix
+from test.conftest import USER_IX
+
+
+@pytest.mark.parametrize("method, op", [
+    ("timestamps_lt", operator.lt),
+    ("timestamps_lte", operator.le),
+    ("timestamps_gt", operator.gt),
+    ("timestamps_gte", operator.ge),
+])
+@pytest.mark.parametrize("timestamp", [-1, 0, 4, 9, 10, 11])
+class TestTimestampFilter():
+    def test_sorted_matrix(self, matrix: InteractionMatrix, method, op, timestamp):
+        expected = matrix.to_dataframe()[op(matrix.to_dataframe()[InteractionMatrix.TIMESTAMP_IX], timestamp)]
+        actual = getattr(matrix, method)(timestamp)
+        assert actual.to_dataframe().equals(expected)
+
+    def test_unsorted_matrix(self, unsorted_matrix: InteractionMatrix, method, op, timestamp):
+        df = unsorted_matrix.to_dataframe()
+        expected = df[op(df[InteractionMatrix.TIMESTAMP_IX], timestamp)]
+        actual = getattr(unsorted_matrix, method)(timestamp)
+        assert actual.to_dataframe().equals(expected)
+
+    def test_inplace(self, matrix: InteractionMatrix, method, op, timestamp):
+        expected = getattr(matrix, method)(timestamp)
+        getattr(matrix, method)(timestamp, inplace=True)
+        assert matrix.to_dataframe().equals(expected.to_dataframe())
+
+
+def test_chained_timestamp_filter(matrix: InteractionMatrix):
+    ts = matrix.to_dataframe()[InteractionMatrix.TIMESTAMP_IX]
+    expected = matrix.to_dataframe()[(ts >= 4) & (ts < 9)]
+    actual = matrix.timestamps_gte(4).timestamps_lt(9)
+    assert actual.to_dataframe().equals(expected)
+    assert len(matrix) == 13
+
+
+class TestCopyOnWrite():
+    def test_filter_shares_data(self, matrix: InteractionMatrix):
+        filtered = matrix.users_in({1, 2})
+        assert filtered._data is matrix._data
+        assert len(filtered) == 5
+
+    def test_modified_copy_does_not_change_parent(self, matrix: InteractionMatrix):
+        expected = matrix.copy_df()
+        copied = matrix.copy()
+        modified = copied.to_dataframe()
+        modified[InteractionMatrix.ITEM_IX] = InteractionMatrix.MASKED_LABEL
+        copied._df = modified
+        assert copied.to_dataframe().equals(modified)
+        assert matrix.to_dataframe().equals(expected)
+
+    def test_modified_parent_does_not_change_view(self, matrix: InteractionMatrix):
+        view = matrix.timestamps_lt(4)
+        expected = view.copy_df()
+        modified = matrix.to_dataframe()
+        modified[InteractionMatrix.ITEM_IX] = InteractionMatrix.MASKED_LABEL
+        matrix._df = modified
+        assert view.to_dataframe().equals(expected)
+
+    def test_inplace_filter_on_owner(self, matrix: InteractionMatrix):
+        matrix.mask_shape((3, 3), drop_unknown_user=True)
+        assert len(matrix.to_dataframe()) == len(matrix) == 5
+        assert matrix.to_dataframe()[InteractionMatrix.USER_IX].max() == 2
+
+
+class TestStatistics():
+    def test_user_item_ids(self, matrix: InteractionMatrix):
+        assert matrix.user_ids == {1, 2, 3, 4, 5}
+        assert matrix.item_ids == {1, 2, 3}
+        assert matrix.max_user_id == 5
+        assert matrix.max_item_id == 3
+        assert matrix.num_users == 5
+        assert matrix.num_items == 3
+
+    def test_statistics_are_memoized(self, matrix: InteractionMatrix):
+        assert matrix.user_ids is matrix.user_ids
+
+    def test_masked_label_excluded(self, matrix: InteractionMatrix):
+        masked = matrix.copy_df()
+        masked[InteractionMatrix.ITEM_IX] = InteractionMatrix.MASKED_LABEL
+        matrix.timestamps_lt(4, inplace=True)
+        matrix.concat(masked)
+        assert matrix.item_ids == {1, 2, 3}
+        assert matrix.user_ids == {1, 2, 3, 4, 5}
+
+    def test_empty_matrix(self, matrix: InteractionMatrix):
+        empty = matrix.timestamps_lt(0)
+        assert empty.user_ids == set()
+        assert empty.max_user_id == -1
+        assert empty.max_item_id == -1
+
+    def test_invalidated_on_inplace_filter(self, matrix: InteractionMatrix):
+        assert matrix.max_user_id == 5
+        matrix.users_in({1, 2}, inplace=True)
+        assert matrix.max_user_id == 2
+        assert matrix.user_ids == {1, 2}
+
+    def test_invalidated_on_concat(self, matrix: InteractionMatrix):
+        future = matrix.timestamps_gte(9)
+        past = matrix.timestamps_lt(9)
+        assert past.max_user_id == 4
+        past.concat(future)
+        assert past.max_user_id == 5
+        assert past.user_ids == matrix.user_ids
+
+
+class TestSparseValues():
+    def test_values_are_cached(self, matrix: InteractionMatrix):
+        matrix.mask_shape((6, 4))
+        assert matrix.values is matrix.values
+        assert matrix.binary_values is matrix.binary_values
+        assert matrix.values.sum() == len(matrix)
+
+    def test_grown_shape_extends_cache(self, matrix: InteractionMatrix):
+        matrix.mask_shape((6, 4))
+        values = matrix.values
+        matrix.mask_shape((8, 6))
+        assert matrix.values.shape == (8, 6)
+        assert np.shares_memory(matrix.values.data, values.data)
+        assert (matrix.values[:6, :4] != values).nnz == 0
+
+    def test_shrunk_shape_rebuilds_cache(self, matrix: InteractionMatrix):
+        matrix.users_in({1, 2}, inplace=True)
+        matrix.mask_shape((8, 6))
+        matrix.values
+        matrix.mask_shape((3, 4))
+        assert matrix.values.shape == (3, 4)
+        assert matrix.values.sum() == len(matrix)
+
+    def test_invalidated_on_inplace_filter(self, matrix: InteractionMatrix):
+        matrix.mask_shape((6, 4))
+        assert matrix.values.nnz == 13
+        matrix.users_in({1, 2}, inplace=True)
+        assert matrix.values.nnz == 5
+        assert matrix.binary_values.nnz == 5
+        assert set(zip(*matrix.nonzero())) == {(1, 1), (1, 3), (2, 1), (2, 2), (2, 3)}
+
+
+class TestSetOperations():
+    def test_difference(self, matrix: InteractionMatrix):
+        future = matrix.timestamps_gte(9)
+        past = matrix - future
+        assert past._data is matrix._data
+        assert past == matrix.timestamps_lt(9)
+
+    def test_difference_keeps_largest_shape(self, matrix: InteractionMatrix):
+        matrix.mask_shape((6, 4))
+        other = matrix.users_in({1})
+        other.mask_shape((8, 4))
+        assert (matrix - other).shape == (8, 4)
+
+    def test_difference_without_shape(self, matrix: InteractionMatrix):
+        matrix.mask_shape((6, 4))
+        other = InteractionMatrix(matrix.copy_df(), InteractionMatrix.ITEM_IX, InteractionMatrix.USER_IX, InteractionMatrix.TIMESTAMP_IX)
+        assert not hasattr(matrix - other, "shape")
+        assert len(matrix - other) == 0
+
+    def test_union_without_duplicates(self, matrix: InteractionMatrix):
+        past = matrix.timestamps_lt(6)
+        future = matrix.timestamps_gte(4)
+        union = past.union(future)
+        assert len(union) == len(matrix)
+        assert union.user_ids == matrix.user_ids
+
+    def test_intersection(self, matrix: InteractionMatrix):
+        past = matrix.timestamps_lt(6)
+        future = matrix.timestamps_gte(4)
+        assert past.intersection(future) == matrix.timestamps_lt(6).timestamps_gte(4)
+
+
+@pytest.mark.parametrize("n", [1, 2, 5])
+@pytest.mark.parametrize("timestamp", [0, 4, 9, 11])
+class TestNInteractions():
+    def test_last_n_interactions(self, matrix: InteractionMatrix, n, timestamp):
+        df = matrix.copy_df()
+        df = df[df[InteractionMatrix.TIMESTAMP_IX] < timestamp]
+        expected = df[df[InteractionMatrix.USER_IX].isin({1, 3, 5})].groupby(InteractionMatrix.USER_IX).tail(n)
+        result = matrix.get_users_n_last_interaction(n, timestamp, {1, 3, 5})
+        assert result.to_dataframe().equals(expected)
+
+    @pytest.mark.parametrize("data", ["matrix", "unsorted_matrix"])
+    def test_last_n_interactions_windows(self, data, request, n, timestamp):
+        data: InteractionMatrix = request.getfixturevalue(data)
+        t_upper = [timestamp, timestamp + 3, timestamp]
+        users = [np.array([1, 3, 3, 5, 99]), np.array([], dtype=np.int64), np.array([2])]
+        results = data.get_users_n_last_interaction_windows(n, t_upper, users)
+        for t, user_in, result in zip(t_upper, users, results):
+            assert result == data.get_users_n_last_interaction(n, t, set(user_in.tolist()) or None)
+
+    def test_first_n_interactions(self, matrix: InteractionMatrix, n, timestamp):
+        df = matrix.copy_df()
+        expected = df[df[InteractionMatrix.TIMESTAMP_IX] >= timestamp].groupby(InteractionMatrix.ITEM_IX).head(n)
+        result = matrix.get_items_n_first_interaction(n, timestamp)
+        assert result.to_dataframe().equals(expected)
+
+    def test_unsorted_matrix(self, unsorted_matrix: InteractionMatrix, n, timestamp):
+        df = unsorted_matrix.copy_df()
+        expected = df[df[InteractionMatrix.TIMESTAMP_IX] < timestamp].groupby(InteractionMatrix.USER_IX).tail(n)
+        result = unsorted_matrix.get_users_n_last_interaction(n, timestamp)
+        assert result.to_dataframe().equals(expected)
+
+
+class TestColumnarStorage():
+    def test_compact_dtypes(self, matrix: InteractionMatrix):
+        assert matrix._data[InteractionMatrix.USER_IX].dtype == np.int32
+        assert matrix._data[InteractionMatrix.ITEM_IX].dtype == np.int32
+        assert InteractionMatrix.INTERACTION_IX not in matrix._data
+
+    def test_to_dataframe(self, matrix: InteractionMatrix, test_dataframe):
+        df = matrix.users_in({2, 3}).to_dataframe()
+        assert list(df.columns) == [InteractionMatrix.INTERACTION_IX, InteractionMatrix.USER_IX, InteractionMatrix.ITEM_IX, InteractionMatrix.TIMESTAMP_IX]
+        assert (df.dtypes == np.int64).all()
+        assert df.index.equals(pd.Index([1, 2, 4, 5, 7, 8]))
+        assert df[InteractionMatrix.USER_IX].equals(test_dataframe.loc[df.index, USER_IX])
+
+    def test_pickle_view(self, matrix: InteractionMatrix):
+        view = matrix.timestamps_gte(9)
+        restored = pickle.loads(pickle.dumps(view))
+        assert restored == view
+        assert len(restored._data[InteractionMatrix.USER_IX]) == len(view) == 4
+
+    def test_concat_keeps_interaction_ids(self, matrix: InteractionMatrix):
+        past = matrix.timestamps_lt(4)
+        future = matrix.timestamps_gte(9)
+        past.concat(future)
+        assert past._column(InteractionMatrix.INTERACTION_IX).tolist() == [0, 1, 2, 3, 9, 10, 11, 12]
+        assert past._data[InteractionMatrix.USER_IX].dtype == np.int32
+
+
+class TestQuery():
+    def test_time_range(self, unsorted_matrix: InteractionMatrix):
+        result = unsorted_matrix.query().timestamps_gte(4).timestamps_lt(9).timestamps_lte(10).collect()
+        assert result == unsorted_matrix.timestamps_gte(4).timestamps_lt(9)
+
+    def test_fused_filters(self, matrix: InteractionMatrix):
+        result = matrix.query().timestamps_gt(2).users_in({2, 3, 5}).items_not_in({3}).collect()
+        assert result == matrix.timestamps_gt(2).users_in({2, 3, 5}).items_not_in({3})
+        assert result._data is matrix._data
+
+    def test_exclude_masked(self, matrix: InteractionMatrix):
+        masked = matrix.timestamps_gte(9).copy_df()
+        masked[InteractionMatrix.ITEM_IX] = InteractionMatrix.MASKED_LABEL
+        matrix.concat(masked)
+        assert matrix.query().exclude_masked().collect() == matrix.get_interaction_data()
+
+    def test_empty_range(self, matrix: InteractionMatrix):
+        assert len(matrix.query().timestamps_gte(9).timestamps_lt(4).users_in({5}).collect()) == 0
+
+    def test_inplace(self, matrix: InteractionMatrix):
+        expected = matrix.users_in({1, 2}).timestamps_lt(5)
+        assert matrix.query().timestamps_lt(5).users_in({1, 2}).collect(inplace=True) is None
+        assert matrix == expected
+
+
+@pytest.mark.parametrize("users", [
+    {2, 3},
+    [2, 3],
+    np.array([2, 3]),
+    np.array([False, False, True, True]),
+    np.array([2, 3, 10**9]),
+])
+def test_users_in_id_collections(matrix: InteractionMatrix, users):
+    expected = matrix.to_dataframe()
+    expected = expected[expected[InteractionMatrix.USER_IX].isin({2, 3})]
+    assert matrix.users_in(users).to_dataframe().equals(expected)
+    assert len(matrix.users_not_in(users)) == len(matrix) - len(expected)
+
+
+def test_masked_label_membership(matrix: InteractionMatrix):
+    masked = matrix.timestamps_gte(10).copy_df()
+    masked[InteractionMatrix.ITEM_IX] = InteractionMatrix.MASKED_LABEL
+    matrix.concat(masked)
+    assert len(matrix.get_prediction_data()) == 2
+    assert len(matrix.items_in(np.array([-1, 1]))) == 6
@@ -36,6 +36,6 @@ class TestMinItemsPerUser:
         filtered_data["uid"] = filtered_data["uid"] - 1
         filtered_data["iid"] = filtered_data["iid"] - 1
         
-        assert m._df[["ts","uid","iid"]].values.tolist() == filtered_data.values.tolist()
-        assert m._df.value_counts(InteractionMatrix.USER_IX).min() >= MIN_ITEM_USER
+        assert m.to_dataframe()[["ts","uid","iid"]].values.tolist() == filtered_data.values.tolist()
+        assert m.to_dataframe().value_counts(InteractionMatrix.USER_IX).min() >= MIN_ITEM_USER
     
\ No newline at end of file
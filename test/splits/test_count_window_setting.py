@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from streamsight.matrix import InteractionMatrix
+from streamsight.settings import CountWindowSetting
+
+BACKGROUND_T = 4
+WINDOW_INTERACTIONS = 2
+SEED = 42
+N_SEQ_DATA = 1
+
+
+@pytest.fixture()
+def setting():
+    return CountWindowSetting(BACKGROUND_T, WINDOW_INTERACTIONS, N_SEQ_DATA, seed=SEED)
+
+
+def test_windows_bounded(setting: CountWindowSetting, matrix: InteractionMatrix):
+    setting.split(matrix)
+    assert setting.t_window[0] == BACKGROUND_T
+    for ground_truth, incremental in zip(setting.ground_truth_data, setting.incremental_data):
+        assert 0 < len(incremental) <= WINDOW_INTERACTIONS
+        assert len(ground_truth) <= len(incremental)
+
+    released = np.concatenate([incremental._column(InteractionMatrix.INTERACTION_IX)
+                               for incremental in setting.incremental_data])
+    expected = matrix.timestamps_gte(BACKGROUND_T)._column(InteractionMatrix.INTERACTION_IX)
+    assert released.tolist() == expected.tolist()
+
+
+def test_equal_timestamps_not_split(matrix: InteractionMatrix):
+    setting = CountWindowSetting(BACKGROUND_T, 1, N_SEQ_DATA, seed=SEED)
+    setting.split(matrix)
+    timestamps = matrix.timestamps_gte(BACKGROUND_T)._column(InteractionMatrix.TIMESTAMP_IX)
+    assert setting.t_window == np.unique(timestamps).tolist()
+    for t, incremental in zip(setting.t_window, setting.incremental_data):
+        assert len(incremental) == np.sum(timestamps == t)
+
+
+@pytest.mark.parametrize("t_extend", [6, 9])
+def test_extend_equals_full_split(matrix: InteractionMatrix, t_extend: int):
+    expected = CountWindowSetting(BACKGROUND_T, WINDOW_INTERACTIONS, N_SEQ_DATA, seed=SEED)
+    expected.split(matrix)
+
+    setting = CountWindowSetting(BACKGROUND_T, WINDOW_INTERACTIONS, N_SEQ_DATA, seed=SEED)
+    setting.split(matrix.timestamps_lt(t_extend))
+    setting.extend(matrix.timestamps_gte(t_extend))
+    assert setting.t_window == expected.t_window
+    for attribute in ["unlabeled_data", "ground_truth_data", "incremental_data"]:
+        for window, expected_window in zip(getattr(setting, attribute), getattr(expected, attribute)):
+            assert window == expected_window
+
+
+def test_window_interactions_positive():
+    with pytest.raises(ValueError):
+        CountWindowSetting(BACKGROUND_T, 0)
@@ -28,5 +28,5 @@ class TestLeaveNOut():
         
         setting.split(matrix)
         assert setting.background_data is not None
-        actual_background_data = setting.background_data._df[["ts","uid","iid"]].reset_index(drop=True)
+        actual_background_data = setting.background_data.to_dataframe()[["ts","uid","iid"]].reset_index(drop=True)
         assert actual_background_data.equals(expected_background_data)
\ No newline at end of file
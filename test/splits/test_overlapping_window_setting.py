@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from streamsight.matrix import InteractionMatrix
+from streamsight.settings import OverlappingWindowSetting, SlidingWindowSetting
+
+BACKGROUND_T = 4
+WINDOW_SIZE = 3
+STRIDE = 1
+SEED = 42
+N_SEQ_DATA = 1
+
+
+@pytest.fixture()
+def setting():
+    return OverlappingWindowSetting(BACKGROUND_T, WINDOW_SIZE, STRIDE, N_SEQ_DATA, seed=SEED)
+
+
+def test_windows(setting: OverlappingWindowSetting, matrix: InteractionMatrix):
+    setting.split(matrix)
+    assert setting.t_window == list(range(BACKGROUND_T, matrix.max_timestamp + 1, STRIDE))
+    for t, ground_truth, incremental in zip(setting.t_window, setting.ground_truth_data, setting.incremental_data):
+        assert ground_truth.min_timestamp >= t and ground_truth.max_timestamp < t + WINDOW_SIZE
+        if len(incremental):
+            assert incremental.min_timestamp >= t and incremental.max_timestamp < t + STRIDE
+
+
+def test_incremental_data_released_once(setting: OverlappingWindowSetting, matrix: InteractionMatrix):
+    setting.split(matrix)
+    released = np.concatenate([incremental._column(InteractionMatrix.INTERACTION_IX)
+                               for incremental in setting.incremental_data])
+    expected = matrix.timestamps_gte(BACKGROUND_T)._column(InteractionMatrix.INTERACTION_IX)
+    assert released.tolist() == expected.tolist()
+
+
+def test_equals_sliding_window_setting(setting: OverlappingWindowSetting, matrix: InteractionMatrix):
+    setting.split(matrix)
+    expected = SlidingWindowSetting(BACKGROUND_T, STRIDE, N_SEQ_DATA, t_ground_truth_window=WINDOW_SIZE, seed=SEED)
+    expected.split(matrix)
+    assert setting.num_split == expected.num_split
+    for attribute in ["unlabeled_data", "ground_truth_data", "incremental_data"]:
+        for window, expected_window in zip(getattr(setting, attribute), getattr(expected, attribute)):
+            assert window == expected_window
+
+
+def test_stride_larger_than_window():
+    with pytest.raises(ValueError):
+        OverlappingWindowSetting(BACKGROUND_T, WINDOW_SIZE, WINDOW_SIZE + 1)
@@ -0,0 +1,37 @@
+import pytest
+
+from streamsight.matrix import InteractionMatrix
+from streamsight.settings import PredictionDataProcessor, SlidingWindowSplitter
+from test.conftest import ITEM_IX, TIMESTAMP_IX, USER_IX
+
+
+@pytest.fixture(params=["sorted", "unsorted"])
+def data(request, test_dataframe):
+    if request.param == "unsorted":
+        test_dataframe = test_dataframe.sample(frac=1, random_state=42)
+    matrix = InteractionMatrix(test_dataframe, ITEM_IX, USER_IX, TIMESTAMP_IX)
+    matrix.mask_shape((6, 4))
+    return matrix
+
+
+@pytest.mark.parametrize("n_seq_data", [1, 2])
+@pytest.mark.parametrize("top_K", [1, 2])
+def test_process_windows_equals_process(data: InteractionMatrix, n_seq_data, top_K):
+    splitter = SlidingWindowSplitter(2, 3, None, n_seq_data)
+    past_interactions, future_interactions = splitter.split(data)
+    processor = PredictionDataProcessor()
+    unlabeled_data, ground_truth_data = processor.process_windows(past_interactions, future_interactions, top_K)
+
+    # process() concatenates in place, so the expected windows are split again
+    past_interactions, future_interactions = splitter.split(data)
+    for i, (past_interaction, future_interaction) in enumerate(zip(past_interactions, future_interactions)):
+        expected_unlabeled, expected_ground_truth = processor.process(past_interaction, future_interaction, top_K)
+        assert unlabeled_data[i] == expected_unlabeled
+        assert unlabeled_data[i].shape == expected_unlabeled.shape
+        assert ground_truth_data[i] == expected_ground_truth
+
+    # the unlabeled data of all windows is stored once, although the
+    # future interactions of the windows overlap
+    assert all(unlabeled._data is unlabeled_data[0]._data for unlabeled in unlabeled_data)
+    assert len(unlabeled_data[0]._data[InteractionMatrix.USER_IX]) <= 2 * len(data)
+    assert all(ground_truth._data is data._data for ground_truth in ground_truth_data)
@@ -30,7 +30,7 @@ class TestSingleTimePointSetting():
                           ):
             setting_temp.split(matrix)
         assert setting_temp.background_data is not None
-        assert setting_temp.background_data._df.empty
+        assert setting_temp.background_data.to_dataframe().empty
         
     def test_no_n_seq_data(self, matrix:InteractionMatrix):
         setting_temp = SingleTimePointSetting(background_t=BACKGROUND_T,
@@ -39,8 +39,8 @@ class TestSingleTimePointSetting():
         assert setting_temp.t == BACKGROUND_T
         setting_temp.split(matrix)
         assert setting_temp.unlabeled_data is not None
-        assert setting_temp.unlabeled_data._df["iid"].nunique() == 1
-        assert setting_temp.unlabeled_data._df["iid"].unique()[0] == -1
+        assert setting_temp.unlabeled_data.to_dataframe()["iid"].nunique() == 1
+        assert setting_temp.unlabeled_data.to_dataframe()["iid"].unique()[0] == -1
     
     def test_background_t_value(self, setting):
         assert setting.t == BACKGROUND_T
@@ -50,7 +50,7 @@ class TestSingleTimePointSetting():
         
         setting.split(matrix)
         assert setting.background_data is not None
-        assert setting.background_data._df.equals(expected_background_data._df)
+        assert setting.background_data.to_dataframe().equals(expected_background_data.to_dataframe())
     
     def test_ground_truth_data(self, setting:Setting, matrix:InteractionMatrix):
         expected_ground_truth = pd.DataFrame({
@@ -62,7 +62,7 @@ class TestSingleTimePointSetting():
         assert setting.ground_truth_data is not None
         actual_ground_truth = setting.ground_truth_data
         assert type(actual_ground_truth) is InteractionMatrix
-        actual_ground_truth = actual_ground_truth._df[["ts","uid","iid"]].reset_index(drop=True)
+        actual_ground_truth = actual_ground_truth.to_dataframe()[["ts","uid","iid"]].reset_index(drop=True)
         assert actual_ground_truth.equals(expected_ground_truth)
 
     def test_unlabeled_data(self, setting:Setting, matrix:InteractionMatrix):
@@ -75,5 +75,15 @@ class TestSingleTimePointSetting():
         assert setting.unlabeled_data is not None
         actual_unlabeled_data = setting.unlabeled_data
         assert type(actual_unlabeled_data) is InteractionMatrix
-        actual_unlabeled_data = actual_unlabeled_data._df[["ts","uid","iid"]].reset_index(drop=True)
-        assert actual_unlabeled_data.equals(expected_unlabeled_data)
\ No newline at end of file
+        actual_unlabeled_data = actual_unlabeled_data.to_dataframe()[["ts","uid","iid"]].reset_index(drop=True)
+        assert actual_unlabeled_data.equals(expected_unlabeled_data)
+
+    def test_window(self, setting: Setting, matrix: InteractionMatrix):
+        setting.split(matrix)
+        window = setting.window(0)
+        assert window.unlabeled_data is setting.unlabeled_data
+        assert window.ground_truth_data is setting.ground_truth_data
+        assert window.incremental_data is None
+        assert window.t_window == BACKGROUND_T
+        with pytest.raises(IndexError):
+            setting.window(1)
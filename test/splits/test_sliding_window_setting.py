@@ -1,7 +1,10 @@
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
 from streamsight.matrix import InteractionMatrix
-from streamsight.settings.base import Setting
+from streamsight.settings.base import EOWSetting, Setting
 from streamsight.settings.sliding_window_setting import SlidingWindowSetting
 
 BACKGROUND_T = 4
@@ -44,18 +47,210 @@ class TestSlidingWindowSetting():
 
         setting.split(matrix)
         assert setting.background_data is not None
-        assert setting.background_data._df.equals(
-            expected_background_data._df)
+        assert setting.background_data.to_dataframe().equals(
+            expected_background_data.to_dataframe())
 
     def test_incremental_data(self, setting: Setting, matrix: InteractionMatrix):
         expected_incremental_data_0 = matrix.timestamps_gte(BACKGROUND_T).timestamps_lt(BACKGROUND_T + WINDOW_SIZE)
         expected_incremental_data_1 = matrix.timestamps_gte(BACKGROUND_T + WINDOW_SIZE).timestamps_lt(BACKGROUND_T + 2*WINDOW_SIZE)
         setting.split(matrix)
-        assert setting.incremental_data[0]._df.equals(
-            expected_incremental_data_0._df)
-        assert setting.incremental_data[1]._df.equals(
-            expected_incremental_data_1._df)
+        assert setting.incremental_data[0].to_dataframe().equals(
+            expected_incremental_data_0.to_dataframe())
+        assert setting.incremental_data[1].to_dataframe().equals(
+            expected_incremental_data_1.to_dataframe())
         
     def test_t_window(self, setting: Setting, matrix: InteractionMatrix):
         setting.split(matrix)
         assert setting.t_window == [4, 7, 10]
+
+
+class TestLazySlidingWindowSetting():
+    @pytest.fixture()
+    def settings(self, matrix: InteractionMatrix):
+        eager = SlidingWindowSetting(BACKGROUND_T, WINDOW_SIZE, N_SEQ_DATA, seed=SEED)
+        eager.split(matrix)
+        lazy = SlidingWindowSetting(BACKGROUND_T, WINDOW_SIZE, N_SEQ_DATA, seed=SEED, lazy=True, prefetch=1)
+        lazy.split(matrix)
+        return eager, lazy
+
+    def test_windows_equal_eager_split(self, settings):
+        eager, lazy = settings
+        assert lazy.num_split == eager.num_split
+        assert lazy.t_window == eager.t_window
+        for attribute in ["unlabeled_data", "ground_truth_data", "incremental_data"]:
+            assert len(getattr(lazy, attribute)) == eager.num_split
+            for lazy_window, eager_window in zip(getattr(lazy, attribute), getattr(eager, attribute)):
+                assert lazy_window == eager_window
+
+    def test_generators(self, settings):
+        eager, lazy = settings
+        for _ in range(eager.num_split):
+            assert lazy.next_unlabeled_data() == eager.next_unlabeled_data()
+            assert lazy.next_ground_truth_data() == eager.next_ground_truth_data()
+            assert lazy.next_incremental_data() == eager.next_incremental_data()
+        with pytest.raises(EOWSetting):
+            lazy.next_unlabeled_data()
+
+    def test_window_cache_is_bounded(self, settings):
+        _, lazy = settings
+        lazy.unlabeled_data[0]
+        assert list(lazy._window_cache) == [0, 1]
+        lazy.unlabeled_data[2]
+        assert list(lazy._window_cache) == [0, 1, 2]
+        lazy.unlabeled_data[0]
+        assert list(lazy._window_cache) == [2, 0, 1]
+        with pytest.raises(IndexError):
+            lazy.unlabeled_data[3]
+
+    def test_window_cache_grows_with_cursors(self, settings, monkeypatch):
+        _, lazy = settings
+        built = []
+        build_window = lazy._build_window
+        monkeypatch.setattr(lazy, "_build_window", lambda idx: built.append(idx) or build_window(idx))
+        first, second = lazy.cursor(), lazy.cursor(2)
+        second.next_unlabeled_data()
+        first.next_unlabeled_data()
+        second.restore_generators(2)
+        second.next_unlabeled_data()
+        lazy._executor.shutdown()
+        assert sorted(built) == [0, 1, 2]
+
+        del second
+        assert len(lazy._cursors) == 1
+
+    def test_failed_prefetch_is_built_again(self, settings, monkeypatch):
+        eager, lazy = settings
+        build_window = lazy._build_window
+        failures = [1]
+
+        def fail_once(idx):
+            if idx in failures:
+                failures.remove(idx)
+                raise MemoryError("transient")
+            return build_window(idx)
+
+        monkeypatch.setattr(lazy, "_build_window", fail_once)
+        lazy.unlabeled_data[0]
+        executor = lazy._executor
+        lazy._shutdown_prefetch()
+        executor.shutdown()
+        assert 1 not in lazy._window_cache
+        assert lazy.unlabeled_data[1] == eager.unlabeled_data[1]
+
+    def test_extend_shuts_down_prefetch(self, matrix: InteractionMatrix):
+        setting = SlidingWindowSetting(BACKGROUND_T, WINDOW_SIZE, N_SEQ_DATA, seed=SEED, lazy=True, prefetch=1)
+        setting.split(matrix.timestamps_lt(10))
+        setting.unlabeled_data[0]
+        executor = setting._executor
+        setting.extend(matrix.timestamps_gte(10))
+        assert executor._shutdown
+        assert getattr(setting, "_executor", None) is None
+
+    def test_windows_are_built_once_by_concurrent_threads(self, settings, monkeypatch):
+        eager, lazy = settings
+        built = []
+        build_window = lazy._build_window
+        monkeypatch.setattr(lazy, "_build_window", lambda idx: built.append(idx) or build_window(idx))
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            windows = list(executor.map(lambda idx: lazy.ground_truth_data[idx], [1] * 8))
+        assert built.count(1) == 1
+        assert all(window == eager.ground_truth_data[1] for window in windows)
+
+    def test_pickle(self, settings):
+        eager, lazy = settings
+        lazy.unlabeled_data[0]
+        restored = pickle.loads(pickle.dumps(lazy))
+        assert len(restored._window_cache) == 0
+        assert restored.ground_truth_data[1] == eager.ground_truth_data[1]
+
+
+def test_parallel_split_equals_serial_split(matrix: InteractionMatrix):
+    serial = SlidingWindowSetting(BACKGROUND_T, 2, N_SEQ_DATA, seed=SEED)
+    serial.split(matrix)
+    parallel = SlidingWindowSetting(BACKGROUND_T, 2, N_SEQ_DATA, seed=SEED, n_jobs=2)
+    parallel.split(matrix)
+
+    assert parallel.num_split == serial.num_split
+    assert parallel.t_window == serial.t_window
+    for attribute in ["unlabeled_data", "ground_truth_data", "incremental_data"]:
+        for parallel_window, serial_window in zip(getattr(parallel, attribute), getattr(serial, attribute)):
+            assert parallel_window == serial_window
+            assert getattr(parallel_window, "shape", None) == getattr(serial_window, "shape", None)
+
+
+def test_window(setting: SlidingWindowSetting, matrix: InteractionMatrix):
+    setting.split(matrix)
+    for idx in range(setting.num_split):
+        window = setting.window(idx)
+        assert window.unlabeled_data == setting.unlabeled_data[idx]
+        assert window.ground_truth_data == setting.ground_truth_data[idx]
+        assert window.incremental_data == setting.incremental_data[idx]
+        assert window.t_window == setting.t_window[idx]
+    assert setting.window(-1).t_window == setting.t_window[-1]
+    with pytest.raises(IndexError):
+        setting.window(setting.num_split)
+
+
+@pytest.mark.parametrize("n", [0, 1, 2])
+def test_restore_generators(setting: SlidingWindowSetting, matrix: InteractionMatrix, n):
+    setting.split(matrix)
+    setting.restore_generators(n)
+    assert setting.next_t_window() == setting.t_window[n]
+    assert setting.next_unlabeled_data() == setting.unlabeled_data[n]
+    assert setting.next_ground_truth_data() == setting.ground_truth_data[n]
+    assert setting.next_incremental_data() == setting.incremental_data[max(n - 1, 0)]
+
+
+def test_restore_lazy_generators_skips_windows(matrix: InteractionMatrix):
+    setting = SlidingWindowSetting(BACKGROUND_T, WINDOW_SIZE, N_SEQ_DATA, seed=SEED, lazy=True)
+    setting.split(matrix)
+    setting.restore_generators(2)
+    setting.next_unlabeled_data()
+    assert list(setting._window_cache) == [2]
+
+
+def test_cursors_are_independent(setting: SlidingWindowSetting, matrix: InteractionMatrix):
+    setting.split(matrix)
+    first, second = setting.cursor(), setting.cursor(1)
+    assert first.next_t_window() == setting.t_window[0]
+    assert second.next_t_window() == setting.t_window[1]
+    assert first.next_t_window() == setting.t_window[1]
+
+    unlabeled_data = first.next_unlabeled_data()
+    assert unlabeled_data == setting.unlabeled_data[0]
+    unlabeled_data.mask_shape((1, 1), drop_unknown_user=True, drop_unknown_item=True)
+    assert second.next_unlabeled_data() == setting.unlabeled_data[1]
+    assert first.next_unlabeled_data() == setting.unlabeled_data[1]
+    assert len(setting.unlabeled_data[0]) > len(unlabeled_data)
+
+    for _ in range(setting.num_split - 1):
+        second.next_ground_truth_data()
+    with pytest.raises(EOWSetting):
+        second.next_ground_truth_data()
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+@pytest.mark.parametrize("t_extend", [3, 6, 8])
+def test_extend_equals_full_split(matrix: InteractionMatrix, t_extend, lazy):
+    full = SlidingWindowSetting(BACKGROUND_T, WINDOW_SIZE, N_SEQ_DATA, seed=SEED)
+    full.split(matrix)
+    extended = SlidingWindowSetting(BACKGROUND_T, WINDOW_SIZE, N_SEQ_DATA, seed=SEED, lazy=lazy)
+    extended.split(matrix.timestamps_lt(t_extend))
+    num_split = extended.num_split
+    cursor = extended.cursor(num_split)
+
+    first = extended.extend(matrix.timestamps_gte(t_extend))
+    assert first == next(idx for idx, t in enumerate(full.t_window) if t + WINDOW_SIZE > t_extend)
+    assert extended.num_split == full.num_split
+    assert extended.t_window == full.t_window
+    assert extended.background_data == full.background_data
+    for attribute in ["unlabeled_data", "ground_truth_data", "incremental_data"]:
+        for extended_window, full_window in zip(getattr(extended, attribute), getattr(full, attribute)):
+            assert extended_window == full_window
+    assert [cursor.next_t_window() for _ in range(full.num_split - num_split)] == full.t_window[num_split:]
+
+
+def test_extend_with_earlier_interactions(setting: SlidingWindowSetting, matrix: InteractionMatrix):
+    setting.split(matrix.timestamps_lt(8))
+    with pytest.raises(ValueError):
+        setting.extend(matrix.timestamps_lt(5))
@@ -0,0 +1,51 @@
+import os
+
+import numpy as np
+import pytest
+
+from streamsight.matrix import InteractionMatrix
+from streamsight.settings import (SingleTimePointSetting, SlidingWindowSetting,
+                                  SplitCache)
+
+BACKGROUND_T = 4
+WINDOW_SIZE = 3
+
+
+def test_fingerprint(matrix: InteractionMatrix):
+    assert matrix.fingerprint() == matrix.copy().fingerprint()
+    assert matrix.fingerprint() != matrix.timestamps_lt(BACKGROUND_T).fingerprint()
+    matrix_with_shape = matrix.copy()
+    matrix_with_shape.mask_shape((6, 4))
+    assert matrix.fingerprint() != matrix_with_shape.fingerprint()
+
+
+@pytest.mark.parametrize("setting_factory", [
+    lambda: SlidingWindowSetting(BACKGROUND_T, WINDOW_SIZE, n_seq_data=1),
+    lambda: SingleTimePointSetting(BACKGROUND_T, n_seq_data=1),
+])
+def test_split_cache_hit(tmp_path, matrix: InteractionMatrix, setting_factory):
+    expected = setting_factory()
+    expected.split(matrix, cache_dir=str(tmp_path))
+    assert len(os.listdir(tmp_path)) == 1
+
+    cached = setting_factory()
+    cached._split = None  # a cache hit must not split the data again
+    cached.split(matrix, cache_dir=str(tmp_path))
+
+    assert cached.num_split == expected.num_split
+    assert cached.t_window == expected.t_window
+    assert cached.background_data == expected.background_data
+    attributes = ["unlabeled_data", "ground_truth_data"]
+    if expected.is_sliding_window_setting:
+        attributes.append("incremental_data")
+    for attribute in attributes:
+        assert getattr(cached, attribute) == getattr(expected, attribute)
+    assert isinstance(cached.background_data._data[InteractionMatrix.USER_IX], np.memmap)
+
+
+def test_split_cache_key(matrix: InteractionMatrix):
+    cache = SplitCache("unused")
+    setting = SlidingWindowSetting(BACKGROUND_T, WINDOW_SIZE)
+    assert cache.key(setting, matrix) == cache.key(SlidingWindowSetting(BACKGROUND_T, WINDOW_SIZE), matrix.copy())
+    assert cache.key(setting, matrix) != cache.key(SlidingWindowSetting(BACKGROUND_T, WINDOW_SIZE + 1), matrix)
+    assert cache.key(setting, matrix) != cache.key(setting, matrix.timestamps_lt(10))
@@ -0,0 +1,48 @@
+import pytest
+
+from streamsight.matrix import InteractionMatrix
+from streamsight.settings.splitters import (NLastInteractionSplitter,
+                                           NPastInteractionTimestampSplitter,
+                                           SlidingWindowSplitter)
+from test.conftest import ITEM_IX, TIMESTAMP_IX, USER_IX
+
+BACKGROUND_T = 4
+WINDOW_SIZE = 3
+
+
+@pytest.mark.parametrize("t_upper", [None, 2, WINDOW_SIZE])
+@pytest.mark.parametrize("n_seq_data", [1, 2])
+def test_sliding_window_splitter(matrix: InteractionMatrix, t_upper, n_seq_data):
+    splitter = SlidingWindowSplitter(BACKGROUND_T, WINDOW_SIZE, t_upper, n_seq_data)
+    past_interactions, future_interactions = splitter.split(matrix)
+    assert splitter.window_timestamps(matrix) == [4, 7, 10]
+    assert len(past_interactions) == len(future_interactions) == 3
+
+    for i, t in enumerate(splitter.window_timestamps(matrix)):
+        expected_past, expected_future = NPastInteractionTimestampSplitter(t, t_upper, n_seq_data).split(matrix)
+        assert past_interactions[i] == expected_past
+        assert future_interactions[i] == expected_future
+
+
+def test_sliding_window_splitter_unsorted(test_dataframe):
+    unsorted = InteractionMatrix(test_dataframe.sample(frac=1, random_state=42), ITEM_IX, USER_IX, TIMESTAMP_IX)
+    past_interactions, future_interactions = SlidingWindowSplitter(BACKGROUND_T, WINDOW_SIZE, WINDOW_SIZE).split(unsorted)
+    for t, past_interaction, future_interaction in zip([4, 7, 10], past_interactions, future_interactions):
+        expected_past, expected_future = NPastInteractionTimestampSplitter(t, WINDOW_SIZE).split(unsorted)
+        assert past_interaction == expected_past
+        assert future_interaction == expected_future
+
+
+@pytest.mark.parametrize("shuffle", [False, True])
+@pytest.mark.parametrize("n", [1, 2])
+@pytest.mark.parametrize("n_seq_data", [1, 3])
+def test_n_last_interaction_splitter(test_dataframe, shuffle, n, n_seq_data):
+    if shuffle:
+        test_dataframe = test_dataframe.sample(frac=1, random_state=42)
+    data = InteractionMatrix(test_dataframe, ITEM_IX, USER_IX, TIMESTAMP_IX)
+    past_interaction, future_interaction = NLastInteractionSplitter(n, n_seq_data).split(data)
+
+    expected_future = data.get_users_n_last_interaction(n)
+    expected_past = (data - expected_future).get_users_n_last_interaction(n_seq_data)
+    assert future_interaction == expected_future
+    assert past_interaction == expected_past
@@ -0,0 +1,110 @@
+import pickle
+
+import pytest
+
+from streamsight.datasets import InteractionStream
+from streamsight.matrix import InteractionMatrix
+from streamsight.settings import SlidingWindowSetting, StreamingSetting
+from streamsight.settings.base import EOWSetting
+from test.conftest import ITEM_IX, TIMESTAMP_IX, USER_IX
+
+BACKGROUND_T = 4
+WINDOW_SIZE = 3
+SEED = 42
+N_SEQ_DATA = 1
+
+
+def chunks(matrix: InteractionMatrix, boundaries):
+    bounds = [matrix.min_timestamp] + boundaries + [matrix.max_timestamp + 1]
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        yield matrix.query().timestamps_gte(start).timestamps_lt(end).collect()
+
+
+@pytest.mark.parametrize("boundaries", [[], [3, 6, 8], list(range(1, 11))])
+@pytest.mark.parametrize("t_ground_truth_window", [None, 2, 5])
+def test_windows_equal_sliding_window_setting(matrix: InteractionMatrix, boundaries, t_ground_truth_window):
+    expected = SlidingWindowSetting(BACKGROUND_T, WINDOW_SIZE, N_SEQ_DATA,
+                                    t_ground_truth_window=t_ground_truth_window, seed=SEED)
+    expected.split(matrix)
+    setting = StreamingSetting(BACKGROUND_T, WINDOW_SIZE, N_SEQ_DATA,
+                               t_ground_truth_window=t_ground_truth_window, seed=SEED)
+    setting.split(chunks(matrix, boundaries))
+
+    assert setting.background_data == expected.background_data
+    cursor, expected_cursor = setting.cursor(), expected.cursor()
+    for _ in range(expected.num_split):
+        assert cursor.next_t_window() == expected_cursor.next_t_window()
+        assert cursor.next_unlabeled_data() == expected_cursor.next_unlabeled_data()
+        assert cursor.next_ground_truth_data() == expected_cursor.next_ground_truth_data()
+        assert cursor.next_incremental_data() == expected_cursor.next_incremental_data()
+    with pytest.raises(EOWSetting):
+        cursor.next_unlabeled_data()
+    assert setting.num_split == expected.num_split
+
+
+def test_windows_are_read_when_accessed(matrix: InteractionMatrix):
+    setting = StreamingSetting(BACKGROUND_T, WINDOW_SIZE, N_SEQ_DATA, seed=SEED)
+    setting.split(chunks(matrix, list(range(1, 11))))
+    assert setting.num_split == 0
+    assert setting._buffer.max_timestamp == BACKGROUND_T
+
+    setting.unlabeled_data[1]
+    assert setting.num_split == 2
+    assert setting._buffer.max_timestamp == BACKGROUND_T + 2 * WINDOW_SIZE
+    # only the last interaction per user before the open window is kept
+    assert setting._buffer.timestamps_lt(BACKGROUND_T + 2 * WINDOW_SIZE).num_interactions <= len(matrix.user_ids)
+
+    setting.unlabeled_data[2]
+    assert list(setting._window_cache) == [1, 2]
+    with pytest.raises(IndexError):
+        setting.unlabeled_data[0]
+
+
+def test_pickle_detaches_source(matrix: InteractionMatrix):
+    setting = StreamingSetting(BACKGROUND_T, WINDOW_SIZE, N_SEQ_DATA, seed=SEED)
+    setting.split(chunks(matrix, list(range(1, 11))))
+    window = setting.unlabeled_data[1]
+
+    restored = pickle.loads(pickle.dumps(setting))
+    assert restored.num_split == setting.num_split == 2
+    assert restored.unlabeled_data[1] == window
+    with pytest.raises(ValueError, match="detached"):
+        restored.unlabeled_data[2]
+    # the original setting keeps reading its source
+    assert setting.unlabeled_data[2] is not None
+
+
+def test_unordered_source(matrix: InteractionMatrix):
+    setting = StreamingSetting(BACKGROUND_T, WINDOW_SIZE, N_SEQ_DATA, seed=SEED)
+    setting.split([matrix.timestamps_lt(8), matrix.timestamps_lt(5)])
+    with pytest.raises(ValueError):
+        setting.unlabeled_data[1]
+
+
+@pytest.mark.parametrize("file_format", ["csv", "jsonl"])
+def test_interaction_stream_from_file(tmp_path, test_dataframe, file_format):
+    path = tmp_path / f"interactions.{file_format}"
+    if file_format == "csv":
+        test_dataframe.to_csv(path, index=False)
+    else:
+        test_dataframe.to_json(path, orient="records", lines=True)
+    # the last interaction is still being written
+    content = path.read_text().rstrip("\n")
+    path.write_text(content)
+
+    stream = InteractionStream.from_file(str(path), ITEM_IX, USER_IX, TIMESTAMP_IX,
+                                         chunksize=4, poll_interval=0.01, timeout=0.05)
+    matrices = list(stream)
+    assert sum(len(im) for im in matrices) == len(test_dataframe)
+    assert max(len(im) for im in matrices) <= 4
+
+    data = matrices[0]
+    for im in matrices[1:]:
+        data = data.concat(im)
+    users = stream.user_id_mapping.set_index(InteractionMatrix.USER_IX)[USER_IX]
+    items = stream.item_id_mapping.set_index(InteractionMatrix.ITEM_IX)[ITEM_IX]
+    df = data.to_dataframe()
+    assert df[InteractionMatrix.INTERACTION_IX].tolist() == list(range(len(test_dataframe)))
+    assert users[df[InteractionMatrix.USER_IX]].tolist() == test_dataframe[USER_IX].tolist()
+    assert items[df[InteractionMatrix.ITEM_IX]].tolist() == test_dataframe[ITEM_IX].tolist()
+    assert df[InteractionMatrix.TIMESTAMP_IX].tolist() == test_dataframe[TIMESTAMP_IX].tolist()